@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api import admin, employee, project, task, time_tracking, screenshot, auth
+from app.api import admin, api_key, employee, project, task, time_tracking, screenshot, auth, metrics
 
 api_router = APIRouter()
 
@@ -10,6 +10,9 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 # Admin routes
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 
+# API key routes
+api_router.include_router(api_key.router, prefix="/api-keys", tags=["api-keys"])
+
 # Employee routes
 api_router.include_router(employee.router, prefix="/employee", tags=["employee"])
 
@@ -23,4 +26,7 @@ api_router.include_router(task.router, prefix="/task", tags=["task"])
 api_router.include_router(time_tracking.router, prefix="/time-tracking", tags=["time-tracking"])
 
 # Screenshot routes
-api_router.include_router(screenshot.router, prefix="/analytics/screenshot", tags=["screenshot"])
\ No newline at end of file
+api_router.include_router(screenshot.router, prefix="/analytics/screenshot", tags=["screenshot"])
+
+# Metrics routes
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
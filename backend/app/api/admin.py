@@ -2,34 +2,37 @@ import time
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user
-from app.core.security import get_password_hash
-from app.db.database import get_db
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.serialization import adapter_response
+from app.db.database import get_async_db
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Admin)
-def create_admin(
+async def create_admin(
     admin_in: schemas.AdminCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Create new admin.
     """
-    admin = db.query(models.Admin).filter(models.Admin.email == admin_in.email).first()
+    admin = await db.scalar(select(models.Admin).where(models.Admin.email == admin_in.email))
     if admin:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Admin with this email already exists",
         )
     
-    admin_data = admin_in.dict()
-    hashed_password = get_password_hash(admin_data.pop("password"))
+    admin_data = admin_in.model_dump()
+    hashed_password = await password_hasher.hash(admin_data.pop("password"))
     
     db_admin = models.Admin(
         **admin_data,
@@ -37,14 +40,14 @@ def create_admin(
         createdAt=int(time.time() * 1000)
     )
     db.add(db_admin)
-    db.commit()
-    db.refresh(db_admin)
+    await db.commit()
+    await db.refresh(db_admin)
     return db_admin
 
 
 @router.get("/", response_model=List[schemas.Admin])
-def read_admins(
-    db: Session = Depends(get_db),
+async def read_admins(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_admin: models.Admin = Depends(get_admin_user),
@@ -52,22 +55,22 @@ def read_admins(
     """
     Retrieve admins.
     """
-    admins = db.query(models.Admin).filter(
+    admins = (await db.scalars(select(models.Admin).where(
         models.Admin.organizationId == current_admin.organizationId
-    ).offset(skip).limit(limit).all()
-    return admins
+    ).offset(skip).limit(limit))).all()
+    return adapter_response(List[schemas.Admin], admins)
 
 
 @router.get("/{admin_id}", response_model=schemas.Admin)
-def read_admin(
+async def read_admin(
     admin_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Get admin by ID.
     """
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+    admin = await db.scalar(select(models.Admin).where(models.Admin.id == admin_id))
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,16 +88,17 @@ def read_admin(
 
 
 @router.put("/{admin_id}", response_model=schemas.Admin)
-def update_admin(
+async def update_admin(
     admin_id: str,
     admin_in: schemas.AdminUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Update admin.
     """
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+    admin = await db.scalar(select(models.Admin).where(models.Admin.id == admin_id))
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -108,30 +112,30 @@ def update_admin(
             detail="Not enough permissions to update this admin",
         )
     
-    update_data = admin_in.dict(exclude_unset=True)
+    update_data = admin_in.model_dump(exclude_unset=True)
     
     if "password" in update_data:
-        hashed_password = get_password_hash(update_data.pop("password"))
+        hashed_password = await password_hasher.hash(update_data.pop("password"))
         update_data["hashed_password"] = hashed_password
     
     for field, value in update_data.items():
         setattr(admin, field, value)
     
-    db.commit()
-    db.refresh(admin)
+    await db.commit()
+    await db.refresh(admin)
     return admin
 
 
 @router.delete("/{admin_id}", response_model=schemas.Admin)
-def delete_admin(
+async def delete_admin(
     admin_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Delete admin.
     """
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+    admin = await db.scalar(select(models.Admin).where(models.Admin.id == admin_id))
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,6 +156,6 @@ def delete_admin(
             detail="Cannot delete yourself",
         )
     
-    db.delete(admin)
-    db.commit()
+    await db.delete(admin)
+    await db.commit()
     return admin
\ No newline at end of file
@@ -0,0 +1,73 @@
+import time
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.auth.api_keys import invalidate_api_keys, new_api_key
+from app.auth.dependencies import get_admin_user
+from app.core.serialization import adapter_response
+from app.db.database import get_async_db
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.ApiKeyWithSecret)
+async def create_api_key(
+    api_key_in: schemas.ApiKeyCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Create an API key for the current admin. The key is only returned here.
+    """
+    api_key, key = new_api_key(
+        current_admin,
+        name=api_key_in.name,
+        scopes=api_key_in.scopes,
+        expires_in_days=api_key_in.expiresInDays,
+    )
+    db.add(api_key)
+    await db.commit()
+    return {**schemas.ApiKey.model_validate(api_key).model_dump(), "key": key}
+
+
+@router.get("/", response_model=List[schemas.ApiKey])
+async def read_api_keys(
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Retrieve the organization's API keys, revoked ones included.
+    """
+    api_keys = (await db.scalars(
+        select(models.ApiKey)
+        .where(models.ApiKey.organizationId == current_admin.organizationId)
+        .order_by(models.ApiKey.id)
+    )).all()
+    return adapter_response(List[schemas.ApiKey], api_keys)
+
+
+@router.delete("/{api_key_id}", response_model=schemas.ApiKey)
+async def revoke_api_key(
+    api_key_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Revoke an API key.
+    """
+    api_key = await db.get(models.ApiKey, api_key_id)
+    if not api_key or api_key.organizationId != current_admin.organizationId:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found",
+        )
+    
+    if api_key.revokedAt is None:
+        api_key.revokedAt = int(time.time() * 1000)
+        await db.commit()
+    invalidate_api_keys([api_key.id])
+    return api_key
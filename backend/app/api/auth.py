@@ -3,25 +3,29 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas
+from app.auth.api_keys import new_api_key
 from app.auth.auth import authenticate_user
 from app.core.config import settings
-from app.core.security import create_access_token, create_api_key
-from app.db.database import get_db
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.security import create_access_token
+from app.db.database import get_async_db
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=schemas.Token)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password, password_hasher=password_hasher)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,20 +35,24 @@ def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, organization_id=user.organizationId
         ),
         "token_type": "bearer",
     }
 
 
 @router.post("/admin/login", response_model=schemas.Token)
-def login_admin_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_admin_access_token(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> Any:
     """
     OAuth2 compatible token login for admin users, get an access token for future requests.
     """
-    user = authenticate_user(db, form_data.username, form_data.password, is_admin=True)
+    user = await authenticate_user(
+        db, form_data.username, form_data.password, is_admin=True, password_hasher=password_hasher
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,32 +62,34 @@ def login_admin_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, organization_id=user.organizationId
         ),
         "token_type": "bearer",
     }
 
 
 @router.post("/admin/api-key", response_model=schemas.AdminWithApiKey)
-def generate_admin_api_key(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def generate_admin_api_key(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> Any:
     """
     Generate an API key for admin users.
     """
-    user = authenticate_user(db, form_data.username, form_data.password, is_admin=True)
+    user = await authenticate_user(
+        db, form_data.username, form_data.password, is_admin=True, password_hasher=password_hasher
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
     
-    # Generate API key
-    api_key = create_api_key(user.id)
+    # Generate API key; only its hash is stored, and no plaintext key is kept
+    api_key, key = new_api_key(user)
+    db.add(api_key)
+    user.api_key = None
+    await db.commit()
     
-    # Update user with API key
-    user.api_key = api_key
-    db.commit()
-    db.refresh(user)
-    
-    return user
\ No newline at end of file
+    return {**schemas.Admin.model_validate(user).model_dump(), "api_key": key}
\ No newline at end of file
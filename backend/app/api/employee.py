@@ -2,26 +2,40 @@ import time
 from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user, get_employee_user, check_employee_access
-from app.core.security import get_password_hash
-from app.db.database import get_db
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.serialization import adapter_response
+from app.db.database import get_async_db
 
 router = APIRouter()
 
+# Relationships serialized in employee responses
+EMPLOYEE_RELATIONSHIPS = ["projects"]
+
+
+async def _get_employee(db: AsyncSession, employee_id: str) -> Optional[models.Employee]:
+    return await db.scalar(
+        select(models.Employee).options(selectinload(models.Employee.projects)).where(
+            models.Employee.id == employee_id
+        )
+    )
+
 
 @router.post("/", response_model=schemas.Employee)
-def create_employee(
+async def create_employee(
     employee_in: schemas.EmployeeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Create new employee.
     """
-    employee = db.query(models.Employee).filter(models.Employee.email == employee_in.email).first()
+    employee = await db.scalar(select(models.Employee).where(models.Employee.email == employee_in.email))
     if employee:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,7 +49,7 @@ def create_employee(
             detail="Cannot create employee for different organization",
         )
     
-    employee_data = employee_in.dict(exclude={"projects"})
+    employee_data = employee_in.model_dump(exclude={"projects"})
     
     # Create employee
     db_employee = models.Employee(
@@ -44,18 +58,18 @@ def create_employee(
         createdAt=int(time.time() * 1000)
     )
     db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
+    await db.commit()
+    await db.refresh(db_employee, EMPLOYEE_RELATIONSHIPS)
     
     # Add projects if specified
     if employee_in.projects:
         for project_id in employee_in.projects:
-            project = db.query(models.Project).filter(models.Project.id == project_id).first()
+            project = await db.scalar(select(models.Project).where(models.Project.id == project_id))
             if project and project.organizationId == current_admin.organizationId:
                 db_employee.projects.append(project)
         
-        db.commit()
-        db.refresh(db_employee)
+        await db.commit()
+        await db.refresh(db_employee, EMPLOYEE_RELATIONSHIPS)
     
     # TODO: Send email verification link to employee
     
@@ -63,8 +77,8 @@ def create_employee(
 
 
 @router.get("/", response_model=List[schemas.Employee])
-def read_employees(
-    db: Session = Depends(get_db),
+async def read_employees(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_admin: models.Admin = Depends(get_admin_user),
@@ -72,16 +86,18 @@ def read_employees(
     """
     Retrieve employees.
     """
-    employees = db.query(models.Employee).filter(
-        models.Employee.organizationId == current_admin.organizationId
-    ).offset(skip).limit(limit).all()
-    return employees
+    employees = (await db.scalars(
+        select(models.Employee).options(selectinload(models.Employee.projects)).where(
+            models.Employee.organizationId == current_admin.organizationId
+        ).offset(skip).limit(limit)
+    )).all()
+    return adapter_response(List[schemas.Employee], employees)
 
 
 @router.get("/{employee_id}", response_model=schemas.Employee)
-def read_employee(
+async def read_employee(
     employee_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(check_employee_access),
 ) -> Any:
     """
@@ -92,16 +108,16 @@ def read_employee(
 
 
 @router.put("/{employee_id}", response_model=schemas.Employee)
-def update_employee(
+async def update_employee(
     employee_id: str,
     employee_in: schemas.EmployeeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Update employee.
     """
-    employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+    employee = await _get_employee(db, employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,7 +131,7 @@ def update_employee(
             detail="Not enough permissions to update this employee",
         )
     
-    update_data = employee_in.dict(exclude_unset=True, exclude={"projects"})
+    update_data = employee_in.model_dump(exclude_unset=True, exclude={"projects"})
     
     # Update employee fields
     for field, value in update_data.items():
@@ -128,20 +144,21 @@ def update_employee(
         
         # Add new projects
         for project_id in employee_in.projects:
-            project = db.query(models.Project).filter(models.Project.id == project_id).first()
+            project = await db.scalar(select(models.Project).where(models.Project.id == project_id))
             if project and project.organizationId == current_admin.organizationId:
                 employee.projects.append(project)
     
-    db.commit()
-    db.refresh(employee)
+    await db.commit()
+    await db.refresh(employee, EMPLOYEE_RELATIONSHIPS)
     return employee
 
 
 @router.post("/{employee_id}/set-password", response_model=schemas.Employee)
-def set_employee_password(
+async def set_employee_password(
     employee_id: str,
     password_in: schemas.EmployeeSetPassword,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
     current_user: Any = Depends(check_employee_access),
 ) -> Any:
     """
@@ -151,24 +168,24 @@ def set_employee_password(
     employee = current_user
     
     # Set password
-    hashed_password = get_password_hash(password_in.password)
+    hashed_password = await password_hasher.hash(password_in.password)
     employee.hashed_password = hashed_password
     
-    db.commit()
-    db.refresh(employee)
+    await db.commit()
+    await db.refresh(employee, EMPLOYEE_RELATIONSHIPS)
     return employee
 
 
 @router.put("/deactivate/{employee_id}", response_model=schemas.Employee)
-def deactivate_employee(
+async def deactivate_employee(
     employee_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Deactivate employee.
     """
-    employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+    employee = await _get_employee(db, employee_id)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -192,6 +209,6 @@ def deactivate_employee(
     # Deactivate employee
     employee.deactivated = int(time.time() * 1000)
     
-    db.commit()
-    db.refresh(employee)
+    await db.commit()
+    await db.refresh(employee, EMPLOYEE_RELATIONSHIPS)
     return employee
\ No newline at end of file
@@ -0,0 +1,62 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends
+
+from app import models, schemas
+from app.auth.api_keys import get_api_key_cache
+from app.auth.cache import get_principal_cache
+from app.auth.dependencies import get_admin_user
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.security import get_token_cache
+from app.db.database import async_engine, engine, get_replica_engine, pool_status
+from app.db.writer import IngestWriter, get_ingest_writer
+
+router = APIRouter()
+
+
+@router.get("/database", response_model=schemas.DatabaseMetrics)
+async def get_database_metrics(
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Connection pool utilization of this worker process.
+    """
+    replica_engine = get_replica_engine()
+    return {
+        "api": pool_status(async_engine),
+        "background": pool_status(engine),
+        "replica": pool_status(replica_engine) if replica_engine is not None else None,
+    }
+
+
+@router.get("/ingest", response_model=schemas.IngestMetrics)
+async def get_ingest_metrics(
+    ingest_writer: Optional[IngestWriter] = Depends(get_ingest_writer),
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Group commit batch sizes and flush latencies of this worker process.
+    """
+    if ingest_writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **ingest_writer.stats()}
+
+
+@router.get("/auth", response_model=schemas.AuthMetrics)
+async def get_auth_metrics(
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    current_admin: models.Admin = Depends(get_admin_user),
+) -> Any:
+    """
+    Hit rates of the token, principal and API key caches, and password
+    hashing load, of this worker process.
+    """
+    token_cache = get_token_cache()
+    principal_cache = get_principal_cache()
+    api_key_cache = get_api_key_cache()
+    return {
+        "tokens": token_cache.stats() if token_cache is not None else None,
+        "principals": principal_cache.stats() if principal_cache is not None else None,
+        "apiKeys": api_key_cache.stats() if api_key_cache is not None else None,
+        "passwordHashing": password_hasher.stats(),
+    }
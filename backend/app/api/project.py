@@ -2,19 +2,31 @@ import time
 from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user, get_employee_user, check_project_access
-from app.db.database import get_db
+from app.core.serialization import adapter_response
+from app.db.database import get_async_db
 
 router = APIRouter()
 
+# Relationships serialized in project responses
+PROJECT_RELATIONSHIPS = ["employees", "teams"]
+
+
+def _select_projects():
+    return select(models.Project).options(
+        selectinload(models.Project.employees), selectinload(models.Project.teams)
+    )
+
 
 @router.post("/", response_model=schemas.Project)
-def create_project(
+async def create_project(
     project_in: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
@@ -27,7 +39,7 @@ def create_project(
             detail="Cannot create project for different organization",
         )
     
-    project_data = project_in.dict(exclude={"employees", "teams"})
+    project_data = project_in.model_dump(exclude={"employees", "teams"})
     
     # Create project
     db_project = models.Project(
@@ -35,31 +47,31 @@ def create_project(
         createdAt=int(time.time() * 1000)
     )
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project, PROJECT_RELATIONSHIPS)
     
     # Add employees if specified
     if project_in.employees:
         for employee_id in project_in.employees:
-            employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+            employee = await db.scalar(select(models.Employee).where(models.Employee.id == employee_id))
             if employee and employee.organizationId == current_admin.organizationId:
                 db_project.employees.append(employee)
     
     # Add teams if specified
     if project_in.teams:
         for team_id in project_in.teams:
-            team = db.query(models.Team).filter(models.Team.id == team_id).first()
+            team = await db.scalar(select(models.Team).where(models.Team.id == team_id))
             if team and team.organizationId == current_admin.organizationId:
                 db_project.teams.append(team)
     
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project, PROJECT_RELATIONSHIPS)
     return db_project
 
 
 @router.get("/", response_model=List[schemas.Project])
-def read_projects(
-    db: Session = Depends(get_db),
+async def read_projects(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_user: Any = Depends(get_employee_user),
@@ -69,20 +81,24 @@ def read_projects(
     """
     # If admin, return all projects in the organization
     if hasattr(current_user, 'api_key'):
-        projects = db.query(models.Project).filter(
-            models.Project.organizationId == current_user.organizationId
-        ).offset(skip).limit(limit).all()
+        projects = (await db.scalars(
+            _select_projects().where(
+                models.Project.organizationId == current_user.organizationId
+            ).offset(skip).limit(limit)
+        )).all()
     # If employee, return only projects they are assigned to
     else:
-        projects = current_user.projects
+        projects = (await db.scalars(
+            _select_projects().where(models.Project.employees.any(models.Employee.id == current_user.id))
+        )).all()
     
-    return projects
+    return adapter_response(List[schemas.Project], projects)
 
 
 @router.get("/{project_id}", response_model=schemas.Project)
-def read_project(
+async def read_project(
     project_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(check_project_access),
 ) -> Any:
     """
@@ -93,16 +109,16 @@ def read_project(
 
 
 @router.put("/{project_id}", response_model=schemas.Project)
-def update_project(
+async def update_project(
     project_id: str,
     project_in: schemas.ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Update project.
     """
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = await db.scalar(_select_projects().where(models.Project.id == project_id))
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -116,7 +132,7 @@ def update_project(
             detail="Not enough permissions to update this project",
         )
     
-    update_data = project_in.dict(exclude_unset=True, exclude={"employees", "teams"})
+    update_data = project_in.model_dump(exclude_unset=True, exclude={"employees", "teams"})
     
     # Update project fields
     for field, value in update_data.items():
@@ -129,7 +145,7 @@ def update_project(
         
         # Add new employees
         for employee_id in project_in.employees:
-            employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+            employee = await db.scalar(select(models.Employee).where(models.Employee.id == employee_id))
             if employee and employee.organizationId == current_admin.organizationId:
                 project.employees.append(employee)
     
@@ -140,25 +156,25 @@ def update_project(
         
         # Add new teams
         for team_id in project_in.teams:
-            team = db.query(models.Team).filter(models.Team.id == team_id).first()
+            team = await db.scalar(select(models.Team).where(models.Team.id == team_id))
             if team and team.organizationId == current_admin.organizationId:
                 project.teams.append(team)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project, PROJECT_RELATIONSHIPS)
     return project
 
 
 @router.delete("/{project_id}", response_model=schemas.Project)
-def delete_project(
+async def delete_project(
     project_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: models.Admin = Depends(get_admin_user),
 ) -> Any:
     """
     Delete project.
     """
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    project = await db.scalar(_select_projects().where(models.Project.id == project_id))
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -173,10 +189,10 @@ def delete_project(
         )
     
     # Delete associated tasks
-    tasks = db.query(models.Task).filter(models.Task.projectId == project_id).all()
+    tasks = (await db.scalars(select(models.Task).where(models.Task.projectId == project_id))).all()
     for task in tasks:
-        db.delete(task)
+        await db.delete(task)
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     return project
\ No newline at end of file
@@ -1,30 +1,55 @@
+import base64
+import binascii
 import time
 import hashlib
 import json
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import orjson
+from fastapi import APIRouter, Body, Depends, File, Form, Header, HTTPException, UploadFile, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user, get_employee_user
-from app.db.database import get_db
+from app.core.config import settings
+from app.core.serialization import dump_trusted
+from app.core.storage import BlobStore, get_blob_store
+from app.core.thumbnails import ThumbnailPipeline, get_thumbnail_pipeline
+from app.db.database import get_async_db, get_read_db
+from app.db.projection import RowProjection, rows_response
+from app.db.writer import IngestWriter, add_instance, get_ingest_writer, insert_rows, run_write
+from app.utils.id_generator import generate_ids
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.timezones import get_zone, translate_timestamps
 
 router = APIRouter()
 
+# Size of the chunks streamed from an upload into the blob store
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Allowance for the metadata part and multipart framing when an upload's
+# Content-Length is checked against SCREENSHOT_MAX_UPLOAD_BYTES
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
 
-@router.post("/", response_model=schemas.Screenshot)
-def create_screenshot(
-    screenshot_in: schemas.ScreenshotCreate,
-    db: Session = Depends(get_db),
-    current_user: Any = Depends(get_employee_user),
-) -> Any:
+# Rows fetched from the database per round trip when streaming NDJSON
+NDJSON_CHUNK_SIZE = 500
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Columns read for screenshot lists
+SCREENSHOT_PROJECTION = RowProjection(models.Screenshot, schemas.Screenshot)
+
+
+async def _check_screenshot_create(db: AsyncSession, screenshot_in: schemas.ScreenshotCreate, current_user: Any) -> None:
     """
-    Create new screenshot.
+    Check that the current user may create the screenshot and its shift exists.
     """
     # Ensure the screenshot is for the current user or admin has permission
     if hasattr(current_user, 'api_key'):  # Admin
-        employee = db.query(models.Employee).filter(models.Employee.id == screenshot_in.employeeId).first()
+        employee = await db.scalar(select(models.Employee).where(models.Employee.id == screenshot_in.employeeId))
         if not employee or employee.organizationId != current_user.organizationId:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -38,58 +63,322 @@ def create_screenshot(
             )
     
     # Check if shift exists
-    shift = db.query(models.Shift).filter(models.Shift.id == screenshot_in.shiftId).first()
+    shift = await db.scalar(select(models.Shift).where(models.Shift.id == screenshot_in.shiftId))
     if not shift:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shift not found",
         )
+
+
+def _decode_image(data: str) -> bytes:
+    try:
+        return base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Screenshot image is not valid base64",
+        )
+
+
+def _read_upload(upload: UploadFile, max_size: int) -> Iterator[bytes]:
+    """
+    Yield an uploaded file in chunks, enforcing a maximum total size.
+    """
+    size = 0
+    while True:
+        chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Screenshot image is too large",
+            )
+        yield chunk
+
+
+async def _stream_screenshots(
+    db: AsyncSession, statement: Select, limit: int, timezone: Optional[str]
+) -> AsyncIterator[bytes]:
+    """
+    Encode the screenshots of a paginated statement as NDJSON, one per line,
+    followed by a ``{"next": ...}`` line with the cursor of the next page.
+
+    Rows are fetched in chunks of :data:`NDJSON_CHUNK_SIZE` and written as
+    they are encoded, without building ORM objects or Pydantic models.
+    """
+    fields = list(schemas.Screenshot.model_fields)
+    rows = await db.stream(
+        statement.with_only_columns(
+            *[getattr(models.Screenshot, field) for field in fields]
+        ).limit(limit + 1).execution_options(yield_per=NDJSON_CHUNK_SIZE)
+    )
+    
+    def encode(chunk: List[Any]) -> bytes:
+        items = [dict(zip(fields, row)) for row in chunk]
+        if timezone:
+            translated = translate_timestamps(timezone, [item["timestamp"] for item in items])
+            for item, timestamp_translated in zip(items, translated.tolist()):
+                item["timestampTranslated"] = timestamp_translated
+        return b"".join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in items)
+    
+    has_more = False
+    last = None
+    chunk = []
+    count = 0
+    try:
+        async for row in rows:
+            if count == limit:
+                # A row past the page means there is a next page
+                has_more = True
+                break
+            count += 1
+            chunk.append(row)
+            if len(chunk) == NDJSON_CHUNK_SIZE:
+                yield encode(chunk)
+                last, chunk = chunk[-1], []
+    finally:
+        await rows.close()
+    if chunk:
+        yield encode(chunk)
+        last = chunk[-1]
+    
+    next_token = None
+    if has_more and last is not None:
+        next_token = encode_cursor(last.timestamp, last.id)
+    yield orjson.dumps({"next": next_token}, option=orjson.OPT_APPEND_NEWLINE)
+
+
+@router.post("/", response_model=schemas.Screenshot)
+async def create_screenshot(
+    screenshot_in: schemas.ScreenshotCreate,
+    db: AsyncSession = Depends(get_async_db),
+    blob_store: BlobStore = Depends(get_blob_store),
+    thumbnail_pipeline: ThumbnailPipeline = Depends(get_thumbnail_pipeline),
+    ingest_writer: Optional[IngestWriter] = Depends(get_ingest_writer),
+    current_user: Any = Depends(get_employee_user),
+) -> Any:
+    """
+    Create new screenshot.
+
+    The base64 ``screenshot`` image, if sent, is kept in the blob store and
+    referenced from the row by its content hash.
+    """
+    await _check_screenshot_create(db, screenshot_in, current_user)
+    
+    screenshot_data = screenshot_in.model_dump(exclude={"screenshot"})
+    
+    # Store the image bytes; identical uploads share one blob
+    if screenshot_in.screenshot:
+        image = _decode_image(screenshot_in.screenshot)
+        screenshot_data["blobKey"] = await run_in_threadpool(blob_store.put, image)
+        screenshot_data["blobSize"] = len(image)
     
     # Create screenshot
-    db_screenshot = models.Screenshot(**screenshot_in.dict())
-    db.add(db_screenshot)
-    db.commit()
-    db.refresh(db_screenshot)
+    db_screenshot = models.Screenshot(**screenshot_data)
+    await run_write(db, ingest_writer, add_instance, db_screenshot)
+    
+    # Thumbnails are generated in the background
+    thumbnail_pipeline.notify()
     return db_screenshot
 
 
+@router.post("/upload", response_model=schemas.Screenshot)
+async def upload_screenshot(
+    metadata: str = Form(..., description="Screenshot fields as JSON, without the image"),
+    file: UploadFile = File(..., description="Screenshot image"),
+    db: AsyncSession = Depends(get_async_db),
+    blob_store: BlobStore = Depends(get_blob_store),
+    thumbnail_pipeline: ThumbnailPipeline = Depends(get_thumbnail_pipeline),
+    ingest_writer: Optional[IngestWriter] = Depends(get_ingest_writer),
+    current_user: Any = Depends(get_employee_user),
+) -> Any:
+    """
+    Create new screenshot from a multipart upload.
+
+    The image is sent as a binary file part and streamed into the blob store
+    in chunks, so memory use does not grow with the image size; the
+    screenshot fields travel as a small JSON part.
+    """
+    try:
+        screenshot_in = schemas.ScreenshotCreate.model_validate_json(metadata)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    
+    await _check_screenshot_create(db, screenshot_in, current_user)
+    
+    blob_key, blob_size = await run_in_threadpool(
+        blob_store.put_stream, _read_upload(file, settings.SCREENSHOT_MAX_UPLOAD_BYTES)
+    )
+    if not blob_size:
+        await run_in_threadpool(thumbnail_pipeline.discard, [blob_key])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Screenshot image is empty",
+        )
+    
+    # Create screenshot
+    db_screenshot = models.Screenshot(
+        **screenshot_in.model_dump(exclude={"screenshot"}),
+        blobKey=blob_key,
+        blobSize=blob_size,
+    )
+    await run_write(db, ingest_writer, add_instance, db_screenshot)
+    
+    # Thumbnails are generated in the background
+    thumbnail_pipeline.notify()
+    return db_screenshot
+
+
+@router.post("/batch", response_model=schemas.ScreenshotBatchResponse)
+async def create_screenshots_batch(
+    screenshots_in: List[Dict[str, Any]] = Body(..., description="Screenshots to create, each as for POST /"),
+    db: AsyncSession = Depends(get_async_db),
+    blob_store: BlobStore = Depends(get_blob_store),
+    thumbnail_pipeline: ThumbnailPipeline = Depends(get_thumbnail_pipeline),
+    ingest_writer: Optional[IngestWriter] = Depends(get_ingest_writer),
+    current_user: Any = Depends(get_employee_user),
+) -> Any:
+    """
+    Create many screenshots in one request.
+
+    Every item is validated and checked on its own; the valid ones are then
+    inserted together in one transaction. ``results`` reports the outcome of
+    each item in request order, with the status code and error detail it
+    would have had as a single request.
+    """
+    if len(screenshots_in) > settings.SCREENSHOT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.SCREENSHOT_BATCH_MAX_ITEMS} screenshots can be created per batch",
+        )
+    
+    results: List[Optional[schemas.ScreenshotBatchResult]] = [None] * len(screenshots_in)
+    items = []
+    for index, item in enumerate(screenshots_in):
+        try:
+            items.append((index, schemas.ScreenshotCreate.model_validate(item)))
+        except ValidationError as e:
+            results[index] = schemas.ScreenshotBatchResult(
+                index=index,
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=e.errors(include_url=False, include_context=False, include_input=False),
+            )
+    
+    # Look up the referenced shifts (and employees, for admins) at once
+    shifts = {
+        shift.id: shift
+        for shift in await db.execute(
+            select(models.Shift.id, models.Shift.employeeId).where(
+                models.Shift.id.in_({item.shiftId for _, item in items})
+            )
+        )
+    }
+    is_admin = hasattr(current_user, 'api_key')
+    if is_admin:
+        organization_employees = {
+            employee_id
+            for (employee_id,) in await db.execute(
+                select(models.Employee.id).where(
+                    models.Employee.id.in_({item.employeeId for _, item in items}),
+                    models.Employee.organizationId == current_user.organizationId,
+                )
+            )
+        }
+    
+    rows = []
+    ids = iter(generate_ids("wsc", len(items)))
+    for index, item in items:
+        try:
+            # Same checks as a single create, plus shift ownership
+            if is_admin and item.employeeId not in organization_employees:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not enough permissions to create screenshot for this employee",
+                )
+            if not is_admin and item.employeeId != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Cannot create screenshot for another employee",
+                )
+            shift = shifts.get(item.shiftId)
+            if not shift:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Shift not found",
+                )
+            if shift.employeeId != item.employeeId:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Shift belongs to another employee",
+                )
+            
+            row = item.model_dump(exclude={"screenshot"})
+            row["id"] = next(ids)
+            row["blobKey"] = None
+            row["blobSize"] = None
+            if item.screenshot:
+                image = _decode_image(item.screenshot)
+                row["blobKey"] = await run_in_threadpool(blob_store.put, image)
+                row["blobSize"] = len(image)
+        except HTTPException as e:
+            results[index] = schemas.ScreenshotBatchResult(index=index, status=e.status_code, detail=e.detail)
+            continue
+        rows.append(row)
+        results[index] = schemas.ScreenshotBatchResult(index=index, status=status.HTTP_200_OK, id=row["id"])
+    
+    # One executemany for all accepted rows
+    if rows:
+        await run_write(db, ingest_writer, insert_rows, models.Screenshot, rows)
+        thumbnail_pipeline.notify()
+    
+    return {
+        "created": len(rows),
+        "failed": len(results) - len(rows),
+        "results": results,
+    }
+
+
 @router.get("/", response_model=List[schemas.Screenshot])
-def read_screenshots(
+async def read_screenshots(
     start: int = Query(..., description="Start time in milliseconds"),
     end: int = Query(..., description="End time in milliseconds"),
     limit: int = Query(15, description="Maximum number of screenshots to return"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Retrieve screenshots.
     """
-    query = db.query(models.Screenshot).filter(
+    statement = SCREENSHOT_PROJECTION.select().where(
         models.Screenshot.timestamp >= start,
         models.Screenshot.timestamp <= end
     )
     
     # If admin, filter by organization
     if hasattr(current_user, 'api_key'):
-        query = query.filter(models.Screenshot.organizationId == current_user.organizationId)
+        statement = statement.where(models.Screenshot.organizationId == current_user.organizationId)
     # If employee, only show their screenshots
     else:
-        query = query.filter(models.Screenshot.employeeId == current_user.id)
+        statement = statement.where(models.Screenshot.employeeId == current_user.id)
     
-    screenshots = query.limit(limit).all()
-    return screenshots
+    screenshots = await SCREENSHOT_PROJECTION.fetch(db, statement.limit(limit))
+    return rows_response(screenshots)
 
 
 @router.delete("/{screenshot_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_screenshot(
+async def delete_screenshot(
     screenshot_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    thumbnail_pipeline: ThumbnailPipeline = Depends(get_thumbnail_pipeline),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Delete screenshot.
     """
-    screenshot = db.query(models.Screenshot).filter(models.Screenshot.id == screenshot_id).first()
+    screenshot = await db.scalar(select(models.Screenshot).where(models.Screenshot.id == screenshot_id))
     if not screenshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,33 +400,63 @@ def delete_screenshot(
             )
     
     # Update shift to increment deletedScreenshots counter
-    shift = db.query(models.Shift).filter(models.Shift.id == screenshot.shiftId).first()
+    shift = await db.scalar(select(models.Shift).where(models.Shift.id == screenshot.shiftId))
     if shift:
         shift.deletedScreenshots = (shift.deletedScreenshots or 0) + 1
     
-    db.delete(screenshot)
-    db.commit()
+    blob_key = screenshot.blobKey
+    thumbnail_keys = list((screenshot.thumbnails or {}).values())
+    await db.delete(screenshot)
+    await db.commit()
+    
+    # Remove the image and its thumbnails once no other screenshot
+    # references it; screenshots sharing an image share its thumbnails
+    if blob_key:
+        still_referenced = await db.scalar(
+            select(models.Screenshot.id).where(models.Screenshot.blobKey == blob_key).limit(1)
+        )
+        if not still_referenced:
+            await run_in_threadpool(thumbnail_pipeline.discard, [blob_key, *thumbnail_keys])
     return None
 
 
 @router.get("/paginate", response_model=schemas.ScreenshotResponse)
-def paginate_screenshots(
+async def paginate_screenshots(
     start: int = Query(..., description="Start time in milliseconds"),
     end: int = Query(..., description="End time in milliseconds"),
-    timezone: Optional[str] = None,
+    timezone: Optional[str] = Query(None, description="IANA timezone for timestampTranslated"),
     task_id: Optional[str] = None,
     shift_id: Optional[str] = None,
     project_id: Optional[str] = None,
     sort_by: Optional[str] = None,
     limit: int = Query(10000, description="Maximum number of screenshots to return"),
     next: Optional[str] = None,
-    db: Session = Depends(get_db),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Paginate screenshots.
+
+    Pages are ordered by (timestamp, id) and ``next`` is an opaque cursor
+    for the page after the last screenshot returned, in either direction.
+    When ``timezone`` is given, ``timestampTranslated`` is returned as the
+    local ISO 8601 time of each screenshot in that zone.
+
+    With ``Accept: application/x-ndjson`` the page is streamed as one JSON
+    screenshot per line while it is read from the database, and the last
+    line is ``{"next": ...}``.
     """
-    query = db.query(models.Screenshot).filter(
+    if timezone:
+        try:
+            get_zone(timezone)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+    
+    statement = select(models.Screenshot).where(
         models.Screenshot.timestamp >= start,
         models.Screenshot.timestamp <= end
     )
@@ -146,56 +465,76 @@ def paginate_screenshots(
     if task_id:
         # Handle comma-separated task IDs
         task_ids = task_id.split(",")
-        query = query.filter(models.Screenshot.taskId.in_(task_ids))
+        statement = statement.where(models.Screenshot.taskId.in_(task_ids))
     
     if shift_id:
         # Handle comma-separated shift IDs
         shift_ids = shift_id.split(",")
-        query = query.filter(models.Screenshot.shiftId.in_(shift_ids))
+        statement = statement.where(models.Screenshot.shiftId.in_(shift_ids))
     
     if project_id:
         # Handle comma-separated project IDs
         project_ids = project_id.split(",")
-        query = query.filter(models.Screenshot.projectId.in_(project_ids))
+        statement = statement.where(models.Screenshot.projectId.in_(project_ids))
     
     # If admin, filter by organization
     if hasattr(current_user, 'api_key'):
-        query = query.filter(models.Screenshot.organizationId == current_user.organizationId)
+        statement = statement.where(models.Screenshot.organizationId == current_user.organizationId)
     # If employee, only show their screenshots
     else:
-        query = query.filter(models.Screenshot.employeeId == current_user.id)
-    
-    # Apply sorting
-    if sort_by:
-        if sort_by == "timestamp":
-            query = query.order_by(models.Screenshot.timestamp)
-        elif sort_by == "timestamp_desc":
-            query = query.order_by(models.Screenshot.timestamp.desc())
+        statement = statement.where(models.Screenshot.employeeId == current_user.id)
+    
+    # Apply sorting (by timestamp by default); the id breaks ties so the
+    # order is total and matches the cursor
+    descending = sort_by == "timestamp_desc"
+    if descending:
+        statement = statement.order_by(models.Screenshot.timestamp.desc(), models.Screenshot.id.desc())
     else:
-        # Default sorting by timestamp
-        query = query.order_by(models.Screenshot.timestamp)
+        statement = statement.order_by(models.Screenshot.timestamp, models.Screenshot.id)
     
-    # Apply pagination
+    # Apply pagination: continue after the (timestamp, id) of the last row
     if next:
-        # Decode the next token to get the last timestamp
         try:
-            last_timestamp = int(next)
-            query = query.filter(models.Screenshot.timestamp > last_timestamp)
-        except ValueError:
-            pass
+            last_position = decode_cursor(next)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        # The plain timestamp bound keeps this an index range scan on
+        # databases that do not plan row-value comparisons
+        last_timestamp = last_position[0]
+        position = tuple_(models.Screenshot.timestamp, models.Screenshot.id)
+        if descending:
+            statement = statement.where(models.Screenshot.timestamp <= last_timestamp, position < tuple_(*last_position))
+        else:
+            statement = statement.where(models.Screenshot.timestamp >= last_timestamp, position > tuple_(*last_position))
+    
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            _stream_screenshots(db, statement, limit, timezone),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
     
     # Get screenshots
-    screenshots = query.limit(limit + 1).all()
+    screenshots = (await db.scalars(statement.limit(limit + 1))).all()
     
     # Check if there are more results
     has_more = len(screenshots) > limit
     if has_more:
         screenshots = screenshots[:limit]
-        next_token = str(screenshots[-1].timestamp)
+        next_token = encode_cursor(screenshots[-1].timestamp, screenshots[-1].id)
     else:
         next_token = None
     
-    return {
-        "data": screenshots,
+    # Rows come straight from our database, so skip re-validating them
+    data = dump_trusted(schemas.Screenshot, screenshots)
+    if timezone and data:
+        translated = translate_timestamps(timezone, [item["timestamp"] for item in data])
+        for item, timestamp_translated in zip(data, translated.tolist()):
+            item["timestampTranslated"] = timestamp_translated
+    
+    return ORJSONResponse({
+        "data": data,
         "next": next_token
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -2,26 +2,42 @@ import time
 from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user, get_employee_user, check_task_access
-from app.db.database import get_db
+from app.db.database import get_async_db
+from app.db.projection import RowProjection, collect_related, rows_response
 
 router = APIRouter()
 
+# Columns read for task lists; employees and teams come from their
+# association tables
+TASK_PROJECTION = RowProjection(models.Task, schemas.Task)
+
+# Relationships serialized in task responses
+TASK_RELATIONSHIPS = ["employees", "teams"]
+
+
+def _select_tasks():
+    return select(models.Task).options(
+        selectinload(models.Task.employees), selectinload(models.Task.teams)
+    )
+
 
 @router.post("/", response_model=schemas.Task)
-def create_task(
+async def create_task(
     task_in: schemas.TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Create new task.
     """
     # Check if project exists and user has access to it
-    project = db.query(models.Project).filter(models.Project.id == task_in.projectId).first()
+    project = await db.scalar(select(models.Project).where(models.Project.id == task_in.projectId))
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,14 +53,14 @@ def create_task(
             )
         creator_id = current_user.id
     else:  # Employee
-        if project not in current_user.projects:
+        if project not in await current_user.awaitable_attrs.projects:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions to create task in this project",
             )
         creator_id = current_user.id
     
-    task_data = task_in.dict(exclude={"employees", "teams"})
+    task_data = task_in.model_dump(exclude={"employees", "teams"})
     task_data["creatorId"] = creator_id
     
     # Create task
@@ -53,31 +69,31 @@ def create_task(
         createdAt=int(time.time() * 1000)
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task, TASK_RELATIONSHIPS)
     
     # Add employees if specified
     if task_in.employees:
         for employee_id in task_in.employees:
-            employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+            employee = await db.scalar(select(models.Employee).where(models.Employee.id == employee_id))
             if employee and employee.organizationId == project.organizationId:
                 db_task.employees.append(employee)
     
     # Add teams if specified
     if task_in.teams:
         for team_id in task_in.teams:
-            team = db.query(models.Team).filter(models.Team.id == team_id).first()
+            team = await db.scalar(select(models.Team).where(models.Team.id == team_id))
             if team and team.organizationId == project.organizationId:
                 db_task.teams.append(team)
     
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task, TASK_RELATIONSHIPS)
     return db_task
 
 
 @router.get("/", response_model=List[schemas.Task])
-def read_tasks(
-    db: Session = Depends(get_db),
+async def read_tasks(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     project_id: Optional[str] = None,
@@ -86,27 +102,39 @@ def read_tasks(
     """
     Retrieve tasks.
     """
-    query = db.query(models.Task)
+    statement = TASK_PROJECTION.select()
     
     # Filter by project if specified
     if project_id:
-        query = query.filter(models.Task.projectId == project_id)
+        statement = statement.where(models.Task.projectId == project_id)
     
     # If admin, return all tasks in the organization
     if hasattr(current_user, 'api_key'):
-        query = query.filter(models.Task.organizationId == current_user.organizationId)
+        statement = statement.where(models.Task.organizationId == current_user.organizationId)
     # If employee, return only tasks they are assigned to
     else:
-        query = query.filter(models.Task.employees.any(models.Employee.id == current_user.id))
+        statement = statement.where(models.Task.employees.any(models.Employee.id == current_user.id))
+    
+    tasks = await TASK_PROJECTION.fetch(db, statement.offset(skip).limit(limit))
     
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    # One query per association for the whole page
+    task_ids = [task["id"] for task in tasks]
+    employees = await collect_related(
+        db, models.employee_task, models.employee_task.c.task_id, models.employee_task.c.employee_id, task_ids
+    )
+    teams = await collect_related(
+        db, models.team_task, models.team_task.c.task_id, models.team_task.c.team_id, task_ids
+    )
+    for task in tasks:
+        task["employees"] = employees.get(task["id"], [])
+        task["teams"] = teams.get(task["id"], [])
+    return rows_response(tasks)
 
 
 @router.get("/{task_id}", response_model=schemas.Task)
-def read_task(
+async def read_task(
     task_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(check_task_access),
 ) -> Any:
     """
@@ -117,16 +145,16 @@ def read_task(
 
 
 @router.put("/{task_id}", response_model=schemas.Task)
-def update_task(
+async def update_task(
     task_id: str,
     task_in: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Update task.
     """
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await db.scalar(_select_tasks().where(models.Task.id == task_id))
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,14 +169,14 @@ def update_task(
                 detail="Not enough permissions to update this task",
             )
     else:  # Employee
-        project = db.query(models.Project).filter(models.Project.id == task.projectId).first()
-        if project not in current_user.projects and current_user not in task.employees:
+        project = await db.scalar(select(models.Project).where(models.Project.id == task.projectId))
+        if project not in await current_user.awaitable_attrs.projects and current_user not in task.employees:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions to update this task",
             )
     
-    update_data = task_in.dict(exclude_unset=True, exclude={"employees"})
+    update_data = task_in.model_dump(exclude_unset=True, exclude={"employees"})
     
     # Update task fields
     for field, value in update_data.items():
@@ -161,25 +189,25 @@ def update_task(
         
         # Add new employees
         for employee_id in task_in.employees:
-            employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+            employee = await db.scalar(select(models.Employee).where(models.Employee.id == employee_id))
             if employee and employee.organizationId == task.organizationId:
                 task.employees.append(employee)
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task, TASK_RELATIONSHIPS)
     return task
 
 
 @router.delete("/{task_id}", response_model=schemas.Task)
-def delete_task(
+async def delete_task(
     task_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Delete task.
     """
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await db.scalar(_select_tasks().where(models.Task.id == task_id))
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,6 +229,6 @@ def delete_task(
                 detail="Not enough permissions to delete this task",
             )
     
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return task
\ No newline at end of file
@@ -1,20 +1,61 @@
 import time
 from typing import Any, List, Optional
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.auth.dependencies import get_admin_user, get_employee_user
-from app.db.database import get_db
+from app.core.config import settings
+from app.db.database import get_async_db, get_read_db
+from app.db.projection import RowProjection, rows_response
+from app.db.rollups import record_shift_change, rollups_built, shift_snapshot
+from app.db.writer import IngestWriter, get_ingest_writer, run_write
+from app.utils.payroll import compute_payroll, get_payroll_cache, invalidate_payroll
+from app.utils.timezones import DAY_MS, get_zone, split_by_local_day
 
 router = APIRouter()
 
+# Grouping keys accepted by the project time analytics endpoint
+PROJECT_TIME_GROUPS = ("project", "task", "employee", "team", "day")
+
+# Grouping keys accepted by the payroll endpoint
+PAYROLL_GROUPS = ("employee", "project")
+# Most payroll rows returned per page
+PAYROLL_MAX_LIMIT = 1000
+
+# Columns read for shift lists
+SHIFT_PROJECTION = RowProjection(models.Shift, schemas.Shift)
+
+
+def _translate_shift_times(shift: models.Shift) -> None:
+    """
+    Fill the local-time (*Translated) fields from the shift's timezone offset.
+    """
+    offset = shift.timezoneOffset or 0
+    shift.startTranslated = shift.start + offset if shift.start is not None else None
+    shift.endTranslated = shift.end + offset if shift.end is not None else None
+    shift.overtimeStartTranslated = (
+        shift.overtimeStart + offset if shift.overtimeStart is not None else None
+    )
+
+
+def _add_shift(session: Session, shift: models.Shift) -> None:
+    """
+    Write job for a new shift and its rollup changes.
+    """
+    session.add(shift)
+    record_shift_change(session, shift)
+
 
 @router.post("/shift", response_model=schemas.Shift)
-def create_shift(
+async def create_shift(
     shift_in: schemas.ShiftCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    ingest_writer: Optional[IngestWriter] = Depends(get_ingest_writer),
     current_user: models.Employee = Depends(get_employee_user),
 ) -> Any:
     """
@@ -22,7 +63,7 @@ def create_shift(
     """
     # Ensure the employee is creating a shift for themselves
     if hasattr(current_user, 'api_key'):  # Admin
-        employee = db.query(models.Employee).filter(models.Employee.id == shift_in.employeeId).first()
+        employee = await db.scalar(select(models.Employee).where(models.Employee.id == shift_in.employeeId))
         if not employee or employee.organizationId != current_user.organizationId:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -37,7 +78,7 @@ def create_shift(
     
     # Check if project and task exist and are accessible
     if shift_in.projectId:
-        project = db.query(models.Project).filter(models.Project.id == shift_in.projectId).first()
+        project = await db.scalar(select(models.Project).where(models.Project.id == shift_in.projectId))
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -46,14 +87,14 @@ def create_shift(
         
         # Check if employee has access to the project
         if not hasattr(current_user, 'api_key'):  # Employee
-            if project not in current_user.projects:
+            if project not in await current_user.awaitable_attrs.projects:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions to track time for this project",
                 )
     
     if shift_in.taskId:
-        task = db.query(models.Task).filter(models.Task.id == shift_in.taskId).first()
+        task = await db.scalar(select(models.Task).where(models.Task.id == shift_in.taskId))
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -62,31 +103,31 @@ def create_shift(
         
         # Check if employee has access to the task
         if not hasattr(current_user, 'api_key'):  # Employee
-            if current_user not in task.employees:
+            if current_user not in await task.awaitable_attrs.employees:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions to track time for this task",
                 )
     
     # Create shift
-    db_shift = models.Shift(**shift_in.dict())
-    db.add(db_shift)
-    db.commit()
-    db.refresh(db_shift)
+    db_shift = models.Shift(**shift_in.model_dump())
+    _translate_shift_times(db_shift)
+    await run_write(db, ingest_writer, _add_shift, db_shift)
+    invalidate_payroll(db_shift.organizationId)
     return db_shift
 
 
 @router.put("/shift/{shift_id}", response_model=schemas.Shift)
-def update_shift(
+async def update_shift(
     shift_id: str,
     shift_in: schemas.ShiftUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Update shift (end time tracking or change project/task).
     """
-    shift = db.query(models.Shift).filter(models.Shift.id == shift_id).first()
+    shift = await db.scalar(select(models.Shift).where(models.Shift.id == shift_id))
     if not shift:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,7 +150,7 @@ def update_shift(
     
     # Check if project and task exist and are accessible
     if shift_in.projectId:
-        project = db.query(models.Project).filter(models.Project.id == shift_in.projectId).first()
+        project = await db.scalar(select(models.Project).where(models.Project.id == shift_in.projectId))
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -118,14 +159,14 @@ def update_shift(
         
         # Check if employee has access to the project
         if not hasattr(current_user, 'api_key'):  # Employee
-            if project not in current_user.projects:
+            if project not in await current_user.awaitable_attrs.projects:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions to track time for this project",
                 )
     
     if shift_in.taskId:
-        task = db.query(models.Task).filter(models.Task.id == shift_in.taskId).first()
+        task = await db.scalar(select(models.Task).where(models.Task.id == shift_in.taskId))
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -134,26 +175,41 @@ def update_shift(
         
         # Check if employee has access to the task
         if not hasattr(current_user, 'api_key'):  # Employee
-            if current_user not in task.employees:
+            if current_user not in await task.awaitable_attrs.employees:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions to track time for this task",
                 )
     
-    update_data = shift_in.dict(exclude_unset=True)
+    update_data = shift_in.model_dump(exclude_unset=True)
+    
+    # Window-overlap queries only look back MAX_SHIFT_DURATION_MS for shifts
+    # overlapping a window, so longer shifts would be left out
+    end = update_data.get("end")
+    if end is not None and end - shift.start > settings.MAX_SHIFT_DURATION_MS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Shifts cannot last longer than {settings.MAX_SHIFT_DURATION_MS // 3600000} hours",
+        )
+    
+    previous = shift_snapshot(shift)
     
     # Update shift fields
     for field, value in update_data.items():
         setattr(shift, field, value)
+    _translate_shift_times(shift)
     
-    db.commit()
-    db.refresh(shift)
+    # Keep the daily rollups in step within the same transaction
+    await db.run_sync(record_shift_change, shift, previous)
+    await db.commit()
+    invalidate_payroll(shift.organizationId)
+    await db.refresh(shift)
     return shift
 
 
 @router.get("/shift", response_model=List[schemas.Shift])
-def read_shifts(
-    db: Session = Depends(get_db),
+async def read_shifts(
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     employee_id: Optional[str] = None,
@@ -164,41 +220,41 @@ def read_shifts(
     """
     Retrieve shifts.
     """
-    query = db.query(models.Shift)
+    statement = SHIFT_PROJECTION.select()
     
     # Filter by employee if specified
     if employee_id:
-        query = query.filter(models.Shift.employeeId == employee_id)
+        statement = statement.where(models.Shift.employeeId == employee_id)
     
     # Filter by project if specified
     if project_id:
-        query = query.filter(models.Shift.projectId == project_id)
+        statement = statement.where(models.Shift.projectId == project_id)
     
     # Filter by task if specified
     if task_id:
-        query = query.filter(models.Shift.taskId == task_id)
+        statement = statement.where(models.Shift.taskId == task_id)
     
     # If admin, return all shifts in the organization
     if hasattr(current_user, 'api_key'):
-        query = query.filter(models.Shift.organizationId == current_user.organizationId)
+        statement = statement.where(models.Shift.organizationId == current_user.organizationId)
     # If employee, return only their shifts
     else:
-        query = query.filter(models.Shift.employeeId == current_user.id)
+        statement = statement.where(models.Shift.employeeId == current_user.id)
     
-    shifts = query.offset(skip).limit(limit).all()
-    return shifts
+    shifts = await SHIFT_PROJECTION.fetch(db, statement.offset(skip).limit(limit))
+    return rows_response(shifts)
 
 
 @router.get("/shift/{shift_id}", response_model=schemas.Shift)
-def read_shift(
+async def read_shift(
     shift_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Get shift by ID.
     """
-    shift = db.query(models.Shift).filter(models.Shift.id == shift_id).first()
+    shift = await db.scalar(select(models.Shift).where(models.Shift.id == shift_id))
     if not shift:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -222,82 +278,352 @@ def read_shift(
     return shift
 
 
+def _project_time_group_columns(source: Any, group_keys: List[str]) -> List[Any]:
+    """
+    Select the grouping columns (and their display names) for each key.
+    Day buckets of raw shifts are computed by :func:`_sum_by_local_day`.
+    """
+    group_columns = []
+    if "project" in group_keys:
+        group_columns += [
+            source.projectId.label("projectId"),
+            models.Project.name.label("projectName"),
+        ]
+    if "task" in group_keys:
+        group_columns += [
+            source.taskId.label("taskId"),
+            models.Task.name.label("taskName"),
+        ]
+    if "employee" in group_keys:
+        group_columns += [
+            source.employeeId.label("employeeId"),
+            models.Employee.name.label("employeeName"),
+        ]
+    if "team" in group_keys:
+        group_columns += [
+            source.teamId.label("teamId"),
+            models.Team.name.label("teamName"),
+        ]
+    if "day" in group_keys and source is models.ShiftDailyRollup:
+        group_columns.append(source.day.label("day"))
+    return group_columns
+
+
+def _sum_by_local_day(rows: List[Any], zone_name: str) -> List[dict]:
+    """
+    Sum shift rows into (group, local day) buckets in one vectorized pass.
+
+    Each row holds the grouping columns followed by the clipped ``start``
+    and ``end`` of one shift. Shifts are split at local midnight, so time
+    lands on the day it was worked; a shift is counted on the day it starts.
+    """
+    if not rows:
+        return []
+    
+    group_names = [name for name in rows[0]._fields if name not in ("start", "end")]
+    group_codes = {}
+    codes = np.empty(len(rows), dtype=np.int64)
+    starts = np.empty(len(rows), dtype=np.int64)
+    ends = np.empty(len(rows), dtype=np.int64)
+    for i, row in enumerate(rows):
+        codes[i] = group_codes.setdefault(tuple(row[:-2]), len(group_codes))
+        starts[i] = row[-2]
+        ends[i] = row[-1]
+    
+    index, days, durations = split_by_local_day(zone_name, starts, ends)
+    piece_starts = np.maximum(starts[index], days)
+    first_pieces = np.ones(index.size, dtype=np.int64)
+    first_pieces[1:] = index[1:] != index[:-1]
+    
+    # Buckets come out ordered by group (in query order), then day
+    buckets, inverse = np.unique(np.stack([codes[index], days]), axis=1, return_inverse=True)
+    inverse = inverse.ravel()
+    time_spent = np.zeros(buckets.shape[1], dtype=np.int64)
+    np.add.at(time_spent, inverse, durations)
+    shift_counts = np.zeros(buckets.shape[1], dtype=np.int64)
+    np.add.at(shift_counts, inverse, first_pieces)
+    dates = np.full(buckets.shape[1], np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(dates, inverse, piece_starts)
+    
+    groups = list(group_codes)
+    result = []
+    for bucket in range(buckets.shape[1]):
+        item = dict(zip(group_names, groups[buckets[0, bucket]]))
+        item["day"] = int(buckets[1, bucket])
+        item["time"] = int(time_spent[bucket])
+        item["date"] = int(dates[bucket])
+        item["shifts"] = int(shift_counts[bucket])
+        result.append(item)
+    return result
+
+
 @router.get("/analytics/project-time", response_model=List[schemas.ProjectTime])
-def get_project_time(
+async def get_project_time(
     start: int = Query(..., description="Start time in milliseconds"),
     end: int = Query(..., description="End time in milliseconds"),
-    timezone: Optional[str] = None,
+    timezone: Optional[str] = Query(None, description="IANA timezone used for day buckets (default UTC)"),
     employee_id: Optional[str] = None,
     team_id: Optional[str] = None,
     project_id: Optional[str] = None,
     task_id: Optional[str] = None,
     shift_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    group_by: str = Query(
+        "project,task,employee",
+        description="Comma-separated grouping keys: project, task, employee, team, day",
+    ),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Any = Depends(get_employee_user),
 ) -> Any:
     """
     Get project time analytics.
+
+    Shifts are summed in a single grouped query, one row per combination of
+    the requested ``group_by`` keys. Every completed shift overlapping the
+    window counts, clipped to the window. Grouping by ``day`` splits shifts
+    at midnight in ``timezone``. Windows aligned to whole UTC days are
+    answered from the daily rollups instead of raw shifts when no team or
+    shift breakdown (or non-UTC day) is requested, once the organization's
+    rollups have been rebuilt from raw shifts.
     """
-    # Base query for shifts
-    query = db.query(models.Shift).filter(
-        models.Shift.start >= start,
-        models.Shift.end <= end,
-        models.Shift.end.isnot(None)  # Only include completed shifts
+    group_keys = [key.strip() for key in group_by.split(",") if key.strip()]
+    invalid_keys = [key for key in group_keys if key not in PROJECT_TIME_GROUPS]
+    if not group_keys or invalid_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid group_by, expected any of: {', '.join(PROJECT_TIME_GROUPS)}",
+        )
+    
+    zone_name = timezone or "UTC"
+    try:
+        get_zone(zone_name)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    split_days = "day" in group_keys
+    use_rollups = (
+        settings.PROJECT_TIME_ROLLUPS
+        and start % DAY_MS == 0
+        and end % DAY_MS == 0
+        and not team_id
+        and not shift_id
+        and "team" not in group_keys
+        and (not split_days or zone_name == "UTC")
+        # Until rebuilt, rollups miss shifts closed before they were maintained
+        and await rollups_built(db, current_user.organizationId)
     )
+    source = models.ShiftDailyRollup if use_rollups else models.Shift
+    group_columns = _project_time_group_columns(source, group_keys)
+    
+    # Clip shifts that straddle the window edges to the window. The bounds are
+    # rendered inline so the grouped expressions match on every dialect.
+    window_start = literal(start, literal_execute=True)
+    window_end = literal(end, literal_execute=True)
+    clipped_start = case((models.Shift.start < window_start, window_start), else_=models.Shift.start)
+    clipped_end = case((models.Shift.end > window_end, window_end), else_=models.Shift.end)
+    overlap_filters = [
+        # Overlap with the window; the lower bound on start keeps this a
+        # bounded range scan over the start/end indexes
+        models.Shift.start >= start - settings.MAX_SHIFT_DURATION_MS,
+        models.Shift.start < end,
+        models.Shift.end > start,
+        models.Shift.end.isnot(None),  # Only include completed shifts
+    ]
+    
+    if use_rollups:
+        statement = select(
+            *group_columns,
+            func.sum(source.time).label("time"),
+            func.min(source.firstStart).label("date"),
+            # Shifts count on their first day in the window, as for raw
+            # shifts: all those overlapping the first day, then new ones
+            func.sum(
+                case((source.day == start, source.shifts), else_=source.shifts - source.carried)
+            ).label("shifts"),
+        ).select_from(source).where(
+            source.day >= start,
+            source.day < end,
+        )
+    elif split_days:
+        # One row per shift; day buckets are summed in NumPy below
+        statement = select(
+            *group_columns,
+            clipped_start.label("start"),
+            clipped_end.label("end"),
+        ).select_from(source).where(*overlap_filters)
+    else:
+        statement = select(
+            *group_columns,
+            func.sum(clipped_end - clipped_start).label("time"),
+            func.min(clipped_start).label("date"),
+            func.count(source.id).label("shifts"),
+        ).select_from(source).where(*overlap_filters)
+    
+    # Join only the tables whose names are needed
+    if "project" in group_keys:
+        statement = statement.outerjoin(models.Project, models.Project.id == source.projectId)
+    if "task" in group_keys:
+        statement = statement.outerjoin(models.Task, models.Task.id == source.taskId)
+    if "employee" in group_keys:
+        statement = statement.outerjoin(models.Employee, models.Employee.id == source.employeeId)
+    if "team" in group_keys:
+        statement = statement.outerjoin(models.Team, models.Team.id == source.teamId)
+    
+    statement = statement.where(source.projectId.isnot(None))
     
     # Apply filters
     if employee_id:
-        query = query.filter(models.Shift.employeeId == employee_id)
+        statement = statement.where(source.employeeId == employee_id)
     
     if team_id:
-        query = query.filter(models.Shift.teamId == team_id)
+        statement = statement.where(source.teamId == team_id)
     
     if project_id:
-        query = query.filter(models.Shift.projectId == project_id)
+        statement = statement.where(source.projectId == project_id)
     
     if task_id:
-        query = query.filter(models.Shift.taskId == task_id)
+        statement = statement.where(source.taskId == task_id)
     
     if shift_id:
-        query = query.filter(models.Shift.id == shift_id)
+        statement = statement.where(source.id == shift_id)
     
     # If admin, filter by organization
     if hasattr(current_user, 'api_key'):
-        query = query.filter(models.Shift.organizationId == current_user.organizationId)
+        statement = statement.where(source.organizationId == current_user.organizationId)
     # If employee, only show their shifts
     else:
-        query = query.filter(models.Shift.employeeId == current_user.id)
+        statement = statement.where(source.employeeId == current_user.id)
     
-    shifts = query.all()
+    if split_days and not use_rollups:
+        rows = (await db.execute(statement.order_by(*group_columns))).all()
+        result = _sum_by_local_day(rows, zone_name)
+    else:
+        statement = statement.group_by(*group_columns).order_by(*group_columns)
+        result = [row._asdict() for row in await db.execute(statement)]
     
-    # Process shifts into project time data
-    result = []
-    for shift in shifts:
-        if not shift.projectId:
-            continue
+    for item in result:
+        if "project" in group_keys and item["projectName"] is None:
+            item["projectName"] = "Unknown Project"
+        if "employee" in group_keys and item["employeeName"] is None:
+            item["employeeName"] = "Unknown Employee"
+    
+    return result
+
+
+@router.get("/analytics/payroll", response_model=schemas.PayrollResponse)
+async def get_payroll(
+    start: int = Query(..., description="Pay period start in milliseconds"),
+    end: int = Query(..., description="Pay period end in milliseconds"),
+    group_by: str = Query("employee", description="Comma-separated grouping keys: employee, project"),
+    employee_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAYROLL_MAX_LIMIT, description="Maximum number of rows to return"),
+    next: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Any = Depends(get_employee_user),
+) -> Any:
+    """
+    Compute regular and overtime pay for a pay period.
+
+    Completed shifts overlapping the period are clipped to it and loaded as
+    columns, and earnings are summed per group with NumPy. Results for
+    periods that have already ended are cached until a shift of the
+    organization changes, or for up to PAYROLL_CACHE_TTL_SECONDS when it
+    changes through another worker.
+    """
+    group_keys = [key.strip() for key in group_by.split(",") if key.strip()]
+    invalid_keys = [key for key in group_keys if key not in PAYROLL_GROUPS]
+    if not group_keys or invalid_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid group_by, expected any of: {', '.join(PAYROLL_GROUPS)}",
+        )
+    
+    try:
+        offset = int(next) if next else 0
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid next token",
+        )
+    
+    is_admin = hasattr(current_user, 'api_key')
+    cache_key = (
+        current_user.organizationId,
+        None if is_admin else current_user.id,
+        start,
+        end,
+        tuple(group_keys),
+        employee_id,
+        project_id,
+    )
+    period_closed = end <= int(time.time() * 1000)
+    payroll_cache = get_payroll_cache() if period_closed else None
+    result = payroll_cache.get(cache_key) if payroll_cache is not None else None
+    
+    if result is None:
+        group_columns = []
+        if "employee" in group_keys:
+            group_columns += [
+                models.Shift.employeeId.label("employeeId"),
+                models.Employee.name.label("employeeName"),
+            ]
+        if "project" in group_keys:
+            group_columns += [
+                models.Shift.projectId.label("projectId"),
+                models.Project.name.label("projectName"),
+            ]
+        
+        # Clip shifts to the pay period, as for project time analytics
+        window_start = literal(start, literal_execute=True)
+        window_end = literal(end, literal_execute=True)
+        statement = select(
+            *group_columns,
+            case((models.Shift.start < window_start, window_start), else_=models.Shift.start).label("start"),
+            case((models.Shift.end > window_end, window_end), else_=models.Shift.end).label("end"),
+            models.Shift.payRate,
+            models.Shift.overtimePayRate,
+            models.Shift.overtimeStart,
+            models.Shift.paid,
+        ).select_from(models.Shift).where(
+            models.Shift.start >= start - settings.MAX_SHIFT_DURATION_MS,
+            models.Shift.start < end,
+            models.Shift.end > start,
+            models.Shift.end.isnot(None),  # Only include completed shifts
+        )
+        
+        if "employee" in group_keys:
+            statement = statement.outerjoin(models.Employee, models.Employee.id == models.Shift.employeeId)
+        if "project" in group_keys:
+            statement = statement.outerjoin(models.Project, models.Project.id == models.Shift.projectId)
         
-        # Get project and task names
-        project = db.query(models.Project).filter(models.Project.id == shift.projectId).first()
-        task = None
-        if shift.taskId:
-            task = db.query(models.Task).filter(models.Task.id == shift.taskId).first()
+        # Apply filters
+        if employee_id:
+            statement = statement.where(models.Shift.employeeId == employee_id)
         
-        # Get employee name
-        employee = db.query(models.Employee).filter(models.Employee.id == shift.employeeId).first()
+        if project_id:
+            statement = statement.where(models.Shift.projectId == project_id)
         
-        # Calculate time spent
-        time_spent = shift.end - shift.start
+        # If admin, filter by organization
+        if is_admin:
+            statement = statement.where(models.Shift.organizationId == current_user.organizationId)
+        # If employee, only show their shifts
+        else:
+            statement = statement.where(models.Shift.employeeId == current_user.id)
         
-        # Add to result
-        result.append({
-            "projectId": shift.projectId,
-            "projectName": project.name if project else "Unknown Project",
-            "taskId": shift.taskId,
-            "taskName": task.name if task else None,
-            "employeeId": shift.employeeId,
-            "employeeName": employee.name if employee else "Unknown Employee",
-            "time": time_spent,
-            "date": shift.start
-        })
-    
-    return result
\ No newline at end of file
+        rows = (await db.execute(statement.order_by(*group_columns))).all()
+        result = compute_payroll(rows, [column.name for column in group_columns])
+        if payroll_cache is not None:
+            payroll_cache.set(cache_key, result)
+    
+    page = result[offset:offset + limit]
+    next_token = str(offset + limit) if offset + limit < len(result) else None
+    
+    return {
+        "data": page,
+        "next": next_token
+    }
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Opaque, revocable API keys for admin integrations.
+
+A key reads ``<id>.<secret>``. The ID (``wk...``) is the primary key of its
+``api_keys`` row, and only a SHA-256 digest of the secret is stored. The
+secret is 32 random bytes, so a fast digest is as safe as a slow password
+hash here, and checking a key costs one primary key lookup, or none once its
+row is cached. Revoking a key drops it from this process's cache; other
+worker processes stop accepting it when their entry expires.
+
+API keys issued as JWTs before these, which cannot be revoked, are refused.
+Clear the plaintext copies of them that ``admins.api_key`` kept with:
+
+    python -m app.auth.api_keys --clear-legacy
+"""
+import argparse
+import hashlib
+import hmac
+import secrets
+import time
+from datetime import timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.admin import Admin
+from app.models.api_key import ApiKey
+from app.utils.id_generator import generate_id
+
+API_KEY_PREFIX = "wk"
+API_KEY_SCOPES = ("read", "write")
+# Methods a key with only the "read" scope may use
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class CachedApiKey(NamedTuple):
+    keyHash: str
+    adminId: str
+    organizationId: str
+    scopes: Tuple[str, ...]
+    expiresAt: Optional[int]
+    revokedAt: Optional[int]
+
+
+def hash_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def is_opaque_api_key(api_key: str) -> bool:
+    """
+    Tell keys from this module apart from the JWT keys issued before them.
+    """
+    return api_key.startswith(API_KEY_PREFIX) and api_key.count(".") == 1
+
+
+def new_api_key(
+    admin: Admin,
+    name: Optional[str] = None,
+    scopes: Sequence[str] = API_KEY_SCOPES,
+    expires_in_days: Optional[int] = None,
+) -> Tuple[ApiKey, str]:
+    """
+    Make an API key row for an admin. Returns it with the key, which is not
+    stored anywhere and can only be shown now.
+    """
+    secret = secrets.token_urlsafe(32)
+    now = int(time.time() * 1000)
+    expires_at = None
+    if expires_in_days is not None:
+        expires_at = now + int(timedelta(days=expires_in_days).total_seconds() * 1000)
+    api_key = ApiKey(
+        id=generate_id(API_KEY_PREFIX),
+        adminId=admin.id,
+        organizationId=admin.organizationId,
+        name=name,
+        keyHash=hash_secret(secret),
+        scopes=list(dict.fromkeys(scopes)),
+        createdAt=now,
+        expiresAt=expires_at,
+    )
+    return api_key, f"{api_key.id}.{secret}"
+
+
+@lru_cache()
+def get_api_key_cache() -> Optional[TTLCache]:
+    """
+    Return the process-wide API key cache, or None when it is disabled.
+    """
+    if settings.API_KEY_CACHE_TTL_SECONDS <= 0:
+        return None
+    return TTLCache(settings.API_KEY_CACHE_MAX_SIZE, settings.API_KEY_CACHE_TTL_SECONDS)
+
+
+def _is_valid(record: CachedApiKey, secret: str) -> bool:
+    if not hmac.compare_digest(record.keyHash, hash_secret(secret)):
+        return False
+    if record.revokedAt is not None:
+        return False
+    return record.expiresAt is None or record.expiresAt > time.time() * 1000
+
+
+def cached_api_key(api_key: str) -> Optional[CachedApiKey]:
+    """
+    Return the cached row of a valid key without going to the database, or
+    None if it is not cached (or not valid); scopes are not checked.
+    """
+    cache = get_api_key_cache()
+    if cache is None:
+        return None
+    key_id, _, secret = api_key.partition(".")
+    record = cache.get(key_id)
+    if record is None or not _is_valid(record, secret):
+        return None
+    return record
+
+
+async def verify_opaque_api_key(db: AsyncSession, api_key: str, method: str) -> Optional[str]:
+    """
+    Return the admin ID of a valid, unrevoked and unexpired key, or None.
+    Raises 403 when the key is valid but lacks the scope for ``method``.
+    """
+    key_id, _, secret = api_key.partition(".")
+    cache = get_api_key_cache()
+    record = cache.get(key_id) if cache is not None else None
+    if record is None:
+        row = await db.get(ApiKey, key_id)
+        if row is None:
+            return None
+        record = CachedApiKey(
+            row.keyHash, row.adminId, row.organizationId, tuple(row.scopes or ()), row.expiresAt, row.revokedAt
+        )
+        if cache is not None:
+            cache.set(key_id, record)
+
+    if not _is_valid(record, secret):
+        return None
+
+    scope = "read" if method in READ_METHODS else "write"
+    if scope not in record.scopes:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"API key does not have the {scope} scope",
+        )
+    return record.adminId
+
+
+def invalidate_api_keys(key_ids: List[str]) -> None:
+    """
+    Drop keys from this process's cache, after revoking them.
+    """
+    cache = get_api_key_cache()
+    if cache is not None:
+        cache.invalidate(key_ids)
+
+
+def clear_legacy_api_keys(db: Session) -> int:
+    """
+    Null the plaintext keys that ``admins.api_key`` held before keys were
+    hashed into ``api_keys``, and commit. Returns the number of admins
+    cleared.
+    """
+    result = db.execute(
+        update(Admin).where(Admin.api_key.isnot(None)).values(api_key=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain admin API keys.")
+    parser.add_argument(
+        "--clear-legacy",
+        action="store_true",
+        help="Clear the plaintext keys kept in admins.api_key before keys were hashed",
+    )
+    args = parser.parse_args()
+    if not args.clear_legacy:
+        parser.error("nothing to do; pass --clear-legacy")
+
+    db = SessionLocal()
+    try:
+        count = clear_legacy_api_keys(db)
+    finally:
+        db.close()
+    print(f"Cleared {count} legacy API keys")
@@ -1,14 +1,18 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.api_keys import cached_api_key, is_opaque_api_key, verify_opaque_api_key
+from app.auth.cache import get_principal_cache, load_principal
 from app.core.config import settings
-from app.core.security import verify_password, verify_api_key
-from app.db.database import get_db
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.security import decode_token
+from app.db.database import get_async_db
 from app.models.employee import Employee
 from app.models.admin import Admin
 
@@ -16,21 +20,35 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
 
-def authenticate_user(db: Session, email: str, password: str, is_admin: bool = False):
+async def authenticate_user(
+    db: AsyncSession,
+    email: str,
+    password: str,
+    is_admin: bool = False,
+    password_hasher: Optional[PasswordHasher] = None,
+):
     if is_admin:
-        user = db.query(Admin).filter(Admin.email == email).first()
+        user = await db.scalar(select(Admin).where(Admin.email == email))
     else:
-        user = db.query(Employee).filter(Employee.email == email).first()
+        user = await db.scalar(select(Employee).where(Employee.email == email))
     
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    # Hash checks are CPU-bound; keep them off the event loop and the
+    # shared threadpool
+    password_hasher = password_hasher or get_password_hasher()
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Hashed with an older BCRYPT_ROUNDS
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,9 +56,7 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -50,17 +66,12 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Check if user is admin
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if admin:
-        return admin
-    
-    # Check if user is employee
-    employee = db.query(Employee).filter(Employee.id == user_id).first()
-    if employee is None:
+    # Admin or employee, usually from the principal cache
+    user = await load_principal(db, user_id)
+    if user is None:
         raise credentials_exception
     
-    return employee
+    return user
 
 
 def get_current_admin(
@@ -85,21 +96,64 @@ def get_current_employee(
     return current_user
 
 
-def get_api_key_user(
-    db: Session = Depends(get_db), api_key: str = Depends(api_key_header)
+async def get_api_key_user(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    api_key: str = Depends(api_key_header),
 ):
     if not api_key or not api_key.startswith("Bearer "):
         return None
     
     api_key = api_key.replace("Bearer ", "")
-    user_id = verify_api_key(api_key)
+    # JWT keys issued before the api_keys table cannot be revoked, so they
+    # are refused
+    if not is_opaque_api_key(api_key):
+        return None
     
+    user_id = await verify_opaque_api_key(db, api_key, request.method)
     if not user_id:
         return None
     
-    # Check if user is admin
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if admin:
-        return admin
+    # API keys belong to admins
+    return await load_principal(db, user_id, (Admin,))
+
+
+def rate_limit_identity(request: Request) -> Tuple[str, Optional[str]]:
+    """
+    Name the principal and organization a request is rate limited as.
+
+    Rate limiting runs before authentication, so this only uses verified
+    token claims and the API key and principal caches. Requests without
+    verified credentials (anonymous ones, bad tokens, and API keys not
+    cached yet) share their client address's bucket, so sending made-up
+    credentials does not buy a bucket per request. The organization comes
+    from the token's ``org`` claim or the API key's row; for tokens issued
+    without the claim it is only known while the principal is cached, and
+    until then only the principal's bucket applies.
+    """
+    client = "client:" + (request.client.host if request.client else "unknown")
+    authorization = request.headers.get("Authorization", "")
+    if not authorization.startswith("Bearer "):
+        return client, None
+    credential = authorization.replace("Bearer ", "")
+    
+    if is_opaque_api_key(credential):
+        record = cached_api_key(credential)
+        if record is None:
+            return client, None
+        return credential.partition(".")[0], record.organizationId
     
-    return None
\ No newline at end of file
+    try:
+        claims = decode_token(credential)
+    except JWTError:
+        return client, None
+    user_id = claims.get("sub")
+    if user_id is None or claims.get("type", "access") != "access":
+        return client, None
+    organization_id = claims.get("org")
+    if organization_id is None:
+        principal_cache = get_principal_cache()
+        cached = principal_cache.get(user_id) if principal_cache is not None else None
+        if cached is not None:
+            organization_id = cached[1].get("organizationId")
+    return user_id, organization_id
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Cache of the admins and employees named by access tokens and API keys.
+
+Clients poll on a fixed tick, so nearly every authenticated request looks up
+a principal that was looked up moments ago. Entries hold the row's column
+values rather than ORM instances, which belong to one session; a hit is put
+into the request's session with ``merge(load=False)``, without a query, and
+relationships such as ``projects`` still load lazily from there.
+
+Entries are dropped when a session flushes a change to, or deletes, their
+admin or employee, and again once that session commits. Other worker
+processes only see the change when their entry expires, so ``ttl`` bounds
+how stale a principal can be.
+"""
+import copy
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.cache import TTLCache
+from app.models.admin import Admin
+from app.models.employee import Employee
+
+Principal = Union[Admin, Employee]
+
+# Key of the principal IDs a session has changed but not yet committed
+PENDING_KEY = "principal_cache_pending"
+
+
+class PrincipalCache(TTLCache):
+    """
+    LRU of principal column values by ID, each entry expiring ``ttl``
+    seconds after it was stored.
+    """
+
+    def get(self, user_id: str) -> Optional[Tuple[Type[Principal], Dict[str, Any]]]:
+        return super().get(user_id)
+
+    def put(self, principal: Principal) -> None:
+        """
+        Store the column values of a principal just loaded from the database.
+        """
+        state = inspect(principal)
+        values = {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict
+        }
+        self.set(principal.id, (type(principal), values))
+
+
+@lru_cache()
+def get_principal_cache() -> Optional[PrincipalCache]:
+    """
+    Return the process-wide principal cache, or None when it is disabled.
+    """
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return None
+    return PrincipalCache(settings.PRINCIPAL_CACHE_MAX_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def candidate_models(user_id: str) -> Tuple[Type[Principal], ...]:
+    """
+    Tables that can hold a principal ID, going by its prefix.
+    """
+    if user_id.startswith("wa"):
+        return (Admin,)
+    if user_id.startswith("we"):
+        return (Employee,)
+    return (Admin, Employee)
+
+
+async def load_principal(
+    db: AsyncSession, user_id: str, models: Tuple[Type[Principal], ...] = (Admin, Employee)
+) -> Optional[Principal]:
+    """
+    Return the admin or employee with ``user_id`` from ``models``, attached
+    to ``db``: from the cache when it is there, otherwise by primary key.
+    """
+    models = tuple(model for model in candidate_models(user_id) if model in models)
+    cache = get_principal_cache()
+    if cache is not None:
+        cached = cache.get(user_id)
+        if cached is not None:
+            model, values = cached
+            if model not in models:
+                return None
+            # JSON columns are mutable; give each request its own copy
+            principal = model(**copy.deepcopy(values))
+            make_transient_to_detached(principal)
+            return await db.merge(principal, load=False)
+
+    for model in models:
+        principal = await db.get(model, user_id)
+        if principal is not None:
+            if cache is not None:
+                cache.put(principal)
+            return principal
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context: Any) -> None:
+    cache = get_principal_cache()
+    if cache is None:
+        return
+    changed = {
+        instance.id
+        for instance in chain(session.dirty, session.deleted)
+        if isinstance(instance, (Admin, Employee))
+    }
+    if changed:
+        cache.invalidate(changed)
+        # Readers may cache the old row again until the change commits
+        session.info.setdefault(PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    changed = session.info.pop(PENDING_KEY, None)
+    cache = get_principal_cache()
+    if changed and cache is not None:
+        cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(PENDING_KEY, None)
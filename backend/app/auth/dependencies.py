@@ -1,24 +1,28 @@
 from typing import Optional, Union
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.auth.auth import get_current_admin, get_current_employee, get_api_key_user
-from app.db.database import get_db
+from app.auth.auth import get_current_admin, get_current_employee, get_current_user, get_api_key_user, oauth2_scheme
+from app.db.database import get_async_db
 from app.models.admin import Admin
 from app.models.employee import Employee
 
 
-def get_admin_user(
-    current_admin: Admin = Depends(get_current_admin),
+async def get_admin_user(
     api_key_user: Optional[Admin] = Depends(get_api_key_user),
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
 ) -> Admin:
     """
     Get the current admin user from either JWT token or API key.
     """
     if api_key_user:
         return api_key_user
-    return current_admin
+    # Only an access token is left to check; an API key is not one
+    return get_current_admin(await get_current_user(db, token))
 
 
 def get_employee_user(
@@ -30,10 +34,10 @@ def get_employee_user(
     return current_employee
 
 
-def check_employee_access(
+async def check_employee_access(
     employee_id: str,
     current_user: Union[Admin, Employee] = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Employee:
     """
     Check if the current user has access to the employee data.
@@ -41,7 +45,9 @@ def check_employee_access(
     Employee users only have access to their own data.
     """
     if isinstance(current_user, Admin):
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        employee = await db.scalar(
+            select(Employee).options(selectinload(Employee.projects)).where(Employee.id == employee_id)
+        )
         if not employee:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -55,4 +61,5 @@ def check_employee_access(
             detail="Not enough permissions to access this employee data",
         )
     
+    await current_user.awaitable_attrs.projects
     return current_user
\ No newline at end of file
@@ -13,6 +13,112 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str
+    # Defaults to DATABASE_URL with its async driver (aiosqlite, asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Read-only GET handlers use this replica when set (async driver derived
+    # as for DATABASE_URL). After a write, a client's reads stay on the
+    # primary for READ_AFTER_WRITE_PIN_SECONDS.
+    READ_REPLICA_URL: Optional[str] = None
+    READ_AFTER_WRITE_PIN_SECONDS: int = 5
+    # Connection pool, per engine (the API and background jobs each have one)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement timeout (PostgreSQL, MySQL); None disables it
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    # Connections the database allows this app across all worker processes;
+    # when set, pools are shrunk so WEB_CONCURRENCY workers stay within it.
+    DB_MAX_CONNECTIONS: Optional[int] = None
+    WEB_CONCURRENCY: int = 1
+    # Opt-in SQLite profile: WAL journal and cache/mmap pragmas on every
+    # connection; also turns on ingest group commit
+    SQLITE_PERFORMANCE_PROFILE: bool = False
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    
+    # Ingest group commit: screenshot and shift inserts are collected for up
+    # to INGEST_FLUSH_WINDOW_MS (or INGEST_BATCH_SIZE jobs) and committed in
+    # one transaction by a writer thread
+    INGEST_GROUP_COMMIT: bool = False
+    INGEST_BATCH_SIZE: int = 256
+    INGEST_FLUSH_WINDOW_MS: float = 2.0
+    
+    # Principal cache: admins and employees named by tokens are kept for up
+    # to PRINCIPAL_CACHE_TTL_SECONDS (0 disables it), per worker process
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # Verified JWTs (access tokens and API keys) whose claims are kept, so
+    # repeat requests skip the signature check; 0 disables the cache
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Verified API key rows, per worker process; a revoked key is refused at
+    # once by the worker that revoked it and within the TTL by the others
+    API_KEY_CACHE_TTL_SECONDS: float = 60.0
+    API_KEY_CACHE_MAX_SIZE: int = 10000
+    
+    # Password hashing: bcrypt cost, and the dedicated threads it runs on.
+    # Logins beyond PASSWORD_HASH_MAX_QUEUE waiting get a 503 with a
+    # Retry-After of PASSWORD_HASH_RETRY_AFTER_SECONDS. Stored hashes made
+    # with another cost are updated on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    
+    # Rate limiting: token buckets per principal (API key, employee, admin,
+    # or client address) and per organization, for each route class. "rate"
+    # is in requests per second, "burst" the most allowed at once. The
+    # memory backend counts per worker process; the sqlite backend shares
+    # buckets between the workers of one host.
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "ingest": {"rate": 5, "burst": 60, "orgRate": 200, "orgBurst": 1000},
+        "analytics": {"rate": 2, "burst": 20, "orgRate": 20, "orgBurst": 100},
+        "auth": {"rate": 0.2, "burst": 10, "orgRate": 5, "orgBurst": 50},
+        "default": {"rate": 10, "burst": 100, "orgRate": 200, "orgBurst": 1000},
+    }
+    
+    # Analytics settings
+    # Answer project time over whole UTC days from shift_daily_rollups, for
+    # organizations whose rollups have been rebuilt (python -m app.db.rollups)
+    PROJECT_TIME_ROLLUPS: bool = True
+    # Upper bound on shift length, enforced when shifts are closed; lets
+    # window-overlap queries scan a bounded range of the
+    # (organizationId, start, end) index.
+    MAX_SHIFT_DURATION_MS: int = 7 * 24 * 60 * 60 * 1000
+    # Payroll of closed pay periods, per worker process; dropped by the
+    # worker that changes a shift of the organization, and within the TTL
+    # by the others (0 disables the cache)
+    PAYROLL_CACHE_TTL_SECONDS: float = 60.0
+    PAYROLL_CACHE_MAX_SIZE: int = 256
+    
+    # Screenshot storage settings
+    SCREENSHOT_STORAGE_BACKEND: str = "local"
+    SCREENSHOT_STORAGE_PATH: str = "./screenshots"
+    # Uploads declaring a larger body (plus room for their metadata) are
+    # refused before it is received
+    SCREENSHOT_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    SCREENSHOT_BATCH_MAX_ITEMS: int = 1000
+    # Thumbnails (longest side in pixels); 0 workers disables the in-process
+    # pipeline, e.g. when `python -m app.core.thumbnails` runs separately.
+    SCREENSHOT_THUMBNAIL_SIZES: List[int] = [160, 480, 960]
+    SCREENSHOT_THUMBNAIL_QUALITY: int = 80
+    SCREENSHOT_THUMBNAIL_WORKERS: int = 2
+    SCREENSHOT_THUMBNAIL_BATCH_SIZE: int = 64
+    SCREENSHOT_THUMBNAIL_POLL_SECONDS: float = 5.0
+    # Screenshots claimed by a pipeline that has not finished them within
+    # this many seconds (e.g. it crashed) are claimed again by another.
+    SCREENSHOT_THUMBNAIL_CLAIM_SECONDS: float = 600.0
+    # Screenshots whose dHash differs from the previous frame of the shift in
+    # at most this many of 64 bits reuse its image; -1 disables deduplication.
+    SCREENSHOT_DEDUP_MAX_DISTANCE: int = 4
+    # Images replaced by a near-duplicate are deleted only once they have
+    # not been stored for this long, the most an upload may take to commit.
+    SCREENSHOT_BLOB_DELETE_GRACE_SECONDS: float = 60.0
     
     # Admin settings
     ADMIN_EMAIL: EmailStr
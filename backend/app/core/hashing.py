@@ -0,0 +1,113 @@
+"""
+Dedicated executor for bcrypt work.
+
+Hashing and verifying passwords takes tens of milliseconds of CPU each. On
+the shared request threadpool, a burst of logins (the start of a working
+day, or a credential-stuffing run against the login routes) takes every
+thread and stalls the sync dependencies and blob IO of all other routes.
+:class:`PasswordHasher` runs this work on its own few threads instead, and
+refuses new work with :class:`PasswordHasherBusy` once ``max_queue`` calls
+are waiting, so a burst costs its own requests a fast 503 rather than
+everyone else's latency.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import LatencyRecorder
+from app.core.security import pwd_context
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password hashing queue is full.
+    """
+
+
+class PasswordHasher:
+    """
+    Bounded executor for password hashing and verification.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        # From submitting a call until its result, queue wait included
+        self.latency = LatencyRecorder()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run ``fn(*args)`` on a hashing thread and wait for it. Raises
+        :class:`PasswordHasherBusy` when every thread is busy and
+        ``max_queue`` calls are already waiting.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            executor = self._executor
+        started = time.perf_counter()
+        future = executor.submit(fn, *args)
+        # Counts as pending until it has run, even if its request goes away
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            self.latency.record(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password. When it matches a hash made with other settings
+        (such as an older ``BCRYPT_ROUNDS``), also return a new hash of it.
+        """
+        return await self.run(pwd_context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue and latency figures for the metrics endpoint.
+        """
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "pending": pending,
+            "rejected": self.rejected,
+            "latencyMs": self.latency.summary(),
+        }
+
+    def shutdown(self) -> None:
+        """
+        Wait for the calls in progress and stop the threads; they start
+        again with the next call.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    """
+    Return the application's password hasher (also a FastAPI dependency).
+    """
+    return PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
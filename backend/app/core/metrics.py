@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyRecorder:
+    """
+    Thread-safe record of a latency, summarized in milliseconds.
+
+    Count, mean and max cover every sample since startup; percentiles are
+    taken over the most recent ``window`` samples.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total, maximum = self._count, self._total, self._max
+        if not samples:
+            return {"count": 0}
+
+        def percentile(fraction: float) -> float:
+            return samples[min(int(fraction * len(samples)), len(samples) - 1)] * 1000
+
+        return {
+            "count": count,
+            "mean": total / count * 1000,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": maximum * 1000,
+        }
+
+
+class HitRate:
+    """
+    Thread-safe hit and miss counts of a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hitRate": hits / lookups if lookups else 0.0,
+        }
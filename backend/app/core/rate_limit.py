@@ -0,0 +1,207 @@
+"""
+Token-bucket rate limits per principal and per organization.
+
+Every request is put in a route class (ingest, analytics, auth or default)
+and takes a token from two buckets of that class: its principal's (API
+key, employee or admin, or the client address without verified
+credentials) and its organization's, which all of the organization's
+principals share. A bucket holds up to ``burst`` tokens and refills at
+``rate`` tokens per second.
+Requests finding either bucket empty get a 429 with a ``Retry-After``, so
+one script or misbehaving client only slows its own tenant.
+
+Buckets live in a :class:`BucketStore`: in process memory for a single
+worker, or in a SQLite file shared by the workers of one host.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# A bucket to take from: key, refill rate (tokens per second) and burst size
+Bucket = Tuple[str, float, float]
+
+# Route classes by method and path prefix, first match wins
+ROUTE_CLASSES: List[Tuple[Optional[Sequence[str]], str, str]] = [
+    (None, f"{settings.API_V1_STR}/auth/", "auth"),
+    (("POST", "PUT"), f"{settings.API_V1_STR}/analytics/screenshot", "ingest"),
+    (("POST", "PUT"), f"{settings.API_V1_STR}/time-tracking/shift", "ingest"),
+    (("GET",), f"{settings.API_V1_STR}/analytics/screenshot", "analytics"),
+    (("GET",), f"{settings.API_V1_STR}/time-tracking/analytics/", "analytics"),
+]
+
+
+def route_class(method: str, path: str) -> str:
+    for methods, prefix, name in ROUTE_CLASSES:
+        if (methods is None or method in methods) and path.startswith(prefix):
+            return name
+    return "default"
+
+
+def spend(
+    buckets: Sequence[Bucket], levels: Sequence[Tuple[float, float]], now: float
+) -> Tuple[float, List[float]]:
+    """
+    Refill buckets from their stored (tokens, updated) levels up to ``now``
+    and take a token from each, if all have one. Returns the seconds to
+    wait (0 if taken) and the new token counts.
+    """
+    tokens = [
+        min(burst, stored + max(now - updated, 0.0) * rate)
+        for (_, rate, burst), (stored, updated) in zip(buckets, levels)
+    ]
+    wait = max(
+        ((1 - available) / rate for available, (_, rate, _) in zip(tokens, buckets) if available < 1),
+        default=0.0,
+    )
+    if not wait:
+        tokens = [available - 1 for available in tokens]
+    return wait, tokens
+
+
+class BucketStore:
+    """
+    Storage for token buckets.
+    """
+
+    # Whether take() can block, so must run off the event loop
+    blocking = False
+
+    def take(self, buckets: Sequence[Bucket]) -> float:
+        """
+        Take one token from each bucket, all or none. Returns 0 when taken,
+        otherwise the seconds until every bucket has a token again.
+        """
+        raise NotImplementedError
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Buckets in process memory, for a single worker. The least recently
+    used buckets beyond ``max_buckets`` are dropped, which refills them.
+    """
+
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets: Sequence[Bucket]) -> float:
+        with self._lock:
+            now = time.monotonic()
+            levels = [self._buckets.get(key, (burst, now)) for key, _, burst in buckets]
+            wait, tokens = spend(buckets, levels, now)
+            for (key, _, _), available in zip(buckets, tokens):
+                self._buckets[key] = (available, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Buckets in a SQLite file, shared by the worker processes of one host.
+    Each take is one immediate transaction, so workers never both spend the
+    last token. Bucket state needs no durability, so commits skip fsync.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection per thread
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def take(self, buckets: Sequence[Bucket]) -> float:
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Wall clock time: monotonic clocks are not shared between processes
+            now = time.time()
+            levels = []
+            for key, _, burst in buckets:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                levels.append(row if row is not None else (burst, now))
+            wait, tokens = spend(buckets, levels, now)
+            connection.executemany(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, available, now) for (key, _, _), available in zip(buckets, tokens)],
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+BUCKET_STORE_BACKENDS: Dict[str, Callable[[], BucketStore]] = {
+    "memory": lambda: MemoryBucketStore(),
+    "sqlite": lambda: SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH),
+}
+
+
+class RateLimiter:
+    """
+    Applies the per-class budgets in ``limits`` (``rate`` and ``burst`` per
+    principal, ``orgRate`` and ``orgBurst`` per organization) using a
+    bucket store.
+    """
+
+    def __init__(self, store: BucketStore, limits: Dict[str, Dict[str, float]]):
+        self.store = store
+        self.limits = limits
+
+    def buckets(self, request: Request, principal: str, organization: Optional[str]) -> List[Bucket]:
+        name = route_class(request.method, request.url.path)
+        limits = self.limits.get(name) or self.limits["default"]
+        buckets = [(f"{name}:{principal}", limits["rate"], limits["burst"])]
+        if organization is not None:
+            buckets.append((f"{name}:org:{organization}", limits["orgRate"], limits["orgBurst"]))
+        return buckets
+
+    async def check(self, request: Request, principal: str, organization: Optional[str]) -> float:
+        """
+        Take a token for the request. Returns 0 if it may go ahead, otherwise
+        the seconds to wait.
+        """
+        buckets = self.buckets(request, principal, organization)
+        if self.store.blocking:
+            return await run_in_threadpool(self.store.take, buckets)
+        return self.store.take(buckets)
+
+
+@lru_cache()
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the configured rate limiter, or None when rate limiting is off.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    try:
+        backend = BUCKET_STORE_BACKENDS[settings.RATE_LIMIT_BACKEND]
+    except KeyError:
+        raise ValueError(f"Unknown rate limit backend: {settings.RATE_LIMIT_BACKEND}")
+    return RateLimiter(backend(), settings.RATE_LIMITS)
@@ -0,0 +1,60 @@
+"""
+JSON serialization helpers.
+
+Responses are encoded with orjson (the application's default response
+class). List endpoints returning ORM objects validate and encode them with
+a cached TypeAdapter for their response type (:func:`adapter_response`),
+which dumps JSON in pydantic-core in one pass. Hot endpoints can
+additionally opt into *trusted* serialization: data read from our own
+database already has the shape of its response schema, so its fields are
+copied out as they are instead of being validated again through
+``response_model``.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(type_: Any) -> TypeAdapter:
+    """
+    Return a TypeAdapter for a type, building its validator and serializer
+    only once per process.
+    """
+    return TypeAdapter(type_)
+
+
+def adapter_response(type_: Any, data: Any) -> Response:
+    """
+    Validate ORM objects as ``type_`` (e.g. ``List[schemas.Project]``) with
+    its cached TypeAdapter and encode them to JSON.
+
+    Routes keep ``response_model`` for their OpenAPI schema; FastAPI does
+    not validate a returned response again.
+    """
+    adapter = get_type_adapter(type_)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        media_type="application/json",
+    )
+
+
+@lru_cache(maxsize=None)
+def _schema_fields(schema: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(
+        (name, field.get_default(call_default_factory=True))
+        for name, field in schema.model_fields.items()
+    )
+
+
+def dump_trusted(schema: Type[BaseModel], items: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Read the fields of a response schema off trusted objects (ORM instances
+    or result rows from our own database) without validating them.
+
+    Fields an object lacks get their schema default.
+    """
+    fields = _schema_fields(schema)
+    return [{name: getattr(item, name, default) for name, default in fields} for item in items]
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+from app.core.config import settings
+
+
+class BlobStore:
+    """
+    Content-addressed storage for screenshot images.
+
+    Blobs are addressed by the SHA-256 hex digest of their content, so
+    storing identical bytes twice returns the same key and keeps one copy.
+    """
+
+    def put(self, data: bytes) -> str:
+        raise NotImplementedError
+
+    def put_stream(self, chunks: Iterable[bytes]) -> Tuple[str, int]:
+        """
+        Store a blob arriving in chunks, returning its key and size.
+        Only one chunk needs to be held in memory at a time.
+        """
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str, stored_before: Optional[float] = None) -> bool:
+        """
+        Delete a blob, unless it was last stored (by :meth:`put` or
+        :meth:`put_stream`, including of content already present) at or
+        after the Unix time ``stored_before``. Returns whether the blob is
+        gone.
+
+        A writer stores a blob before committing the row that references it,
+        so a caller that found no references should pass the time at which
+        every writer that stored the blob earlier must have committed.
+        """
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blob store on the local filesystem.
+
+    Blobs live under ``root/ab/cd/abcd...`` (sharded by the first two byte
+    pairs of the digest) and are written to a temporary file on the same
+    filesystem, then renamed into place so readers never see partial files.
+    Storing a blob that already exists refreshes its modification time,
+    which :meth:`delete` compares with ``stored_before``.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if self._refresh(path):
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return key
+
+    def put_stream(self, chunks: Iterable[bytes]) -> Tuple[str, int]:
+        # The digest is only known at the end, so spool to a temporary file
+        # under the root (same filesystem) and rename it into place.
+        tmp_directory = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_directory, prefix=".tmp-")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp_file.write(chunk)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+
+            key = digest.hexdigest()
+            path = self.path(key)
+            if self._refresh(path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return key, size
+
+    def get(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as blob_file:
+            return blob_file.read()
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def _refresh(self, path: str) -> bool:
+        """
+        Mark an existing blob as just stored. Returns False if it is missing.
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, key: str, stored_before: Optional[float] = None) -> bool:
+        path = self.path(key)
+        if stored_before is None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            return True
+
+        # Move the blob aside before checking when it was last stored: a
+        # writer refreshing it earlier shows in its modification time, and
+        # one storing it from now on writes a new copy.
+        aside = os.path.join(os.path.dirname(path), f".delete-{uuid.uuid4().hex}")
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            return True
+        if os.stat(aside).st_mtime >= stored_before:
+            os.replace(aside, path)
+            return False
+        os.unlink(aside)
+        return True
+
+
+# Storage backends selectable with SCREENSHOT_STORAGE_BACKEND
+BLOB_STORE_BACKENDS: Dict[str, Type[BlobStore]] = {
+    "local": LocalBlobStore,
+}
+
+
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    """
+    Return the configured screenshot blob store (also a FastAPI dependency).
+    """
+    try:
+        backend = BLOB_STORE_BACKENDS[settings.SCREENSHOT_STORAGE_BACKEND]
+    except KeyError:
+        raise ValueError(f"Unknown screenshot storage backend: {settings.SCREENSHOT_STORAGE_BACKEND}")
+    return backend(settings.SCREENSHOT_STORAGE_PATH)
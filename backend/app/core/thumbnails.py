@@ -0,0 +1,522 @@
+"""
+Thumbnail generation and deduplication for stored screenshots.
+
+Screenshots whose ``processed`` flag is unset are picked up in batches and
+their images are handled on a process pool (so Pillow never runs in a
+request thread):
+
+- A 64-bit difference hash (dHash) of each image is compared with the one
+  of the previous frame of the same shift. When they differ in at most
+  SCREENSHOT_DEDUP_MAX_DISTANCE bits the screenshot is repointed to the
+  earlier blob (``duplicateOf`` names the screenshot that owns it) and its
+  own image is deleted once nothing references it. An upload may have just
+  stored the same image without committing its row yet, so images stored
+  within the last SCREENSHOT_BLOB_DELETE_GRACE_SECONDS are kept until later.
+- Thumbnails of the remaining images are stored in the blob store and their
+  keys recorded in ``Screenshot.thumbnails``.
+
+The row is then marked processed. Images of deleted screenshots, and their
+thumbnails, are handed to :meth:`ThumbnailPipeline.discard` and deleted
+under the same grace period.
+
+Each batch is claimed first with a conditional ``UPDATE``, so pipelines in
+several API processes (or a separate one) never process the same rows.
+The API process runs the pipeline in the background unless
+SCREENSHOT_THUMBNAIL_WORKERS is 0. Catch up on a backlog (e.g. after an
+outage) and exit with:
+
+    python -m app.core.thumbnails --drain
+"""
+import argparse
+import io
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.storage import BlobStore, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+# dHash samples a (HASH_SIZE + 1) x HASH_SIZE grayscale image
+HASH_SIZE = 8
+
+
+class Frame(NamedTuple):
+    """
+    The processed state of a screenshot, as seen by the next frame.
+    """
+
+    id: str
+    blobKey: Optional[str]
+    phash: Optional[str]
+    duplicateOf: Optional[str]
+    thumbnails: Optional[Dict[str, str]]
+
+
+def _open_image(blob_store: BlobStore, blob_key: str, size: int) -> Optional[Any]:
+    from PIL import Image
+
+    try:
+        data = blob_store.get(blob_key)
+    except FileNotFoundError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Let the JPEG decoder downscale while decoding when it can
+            image.draft("RGB", (size, size))
+            return image.convert("RGB")
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def image_hash(blob_store: BlobStore, blob_key: str) -> Optional[str]:
+    """
+    Return the dHash of a blob as 16 hex digits.
+
+    Each bit records whether a pixel of a small grayscale copy of the image
+    is brighter than its right neighbour, so re-encoding, a moving clock or
+    a blinking cursor flip few bits while a different screen flips many.
+    Returns ``None`` when the blob is missing or is not a readable image.
+    Runs in a worker process.
+    """
+    from PIL import Image
+
+    image = _open_image(blob_store, blob_key, HASH_SIZE * 8)
+    if image is None:
+        return None
+    pixels = list(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + column
+            value = (value << 1) | (pixels[offset] > pixels[offset + 1])
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hamming_distance(first: str, second: str) -> int:
+    """
+    Number of differing bits between two hex image hashes.
+    """
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def render_thumbnails(blob_store: BlobStore, blob_key: str, sizes: Sequence[int]) -> Optional[Dict[str, str]]:
+    """
+    Store JPEG thumbnails of a blob, returning their keys by size.
+
+    Each size is the longest side of the thumbnail in pixels; the aspect
+    ratio is kept and images are never enlarged. Returns ``None`` when the
+    blob is missing or is not a readable image. Runs in a worker process.
+    """
+    source = _open_image(blob_store, blob_key, max(sizes))
+    if source is None:
+        return None
+
+    thumbnails = {}
+    # Resize from the previous (larger) thumbnail to keep each step cheap
+    for size in sorted(sizes, reverse=True):
+        source = source.copy()
+        source.thumbnail((size, size))
+        buffer = io.BytesIO()
+        source.save(buffer, "JPEG", quality=settings.SCREENSHOT_THUMBNAIL_QUALITY, optimize=True)
+        thumbnails[str(size)] = blob_store.put(buffer.getvalue())
+    return thumbnails
+
+
+class ThumbnailPipeline:
+    """
+    Deduplicate and generate thumbnails for unprocessed screenshots on a
+    process pool.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        blob_store: BlobStore,
+        workers: int,
+        sizes: Sequence[int],
+        batch_size: int = 64,
+        poll_interval: float = 5.0,
+        max_distance: int = -1,
+        claim_timeout: float = 600.0,
+        delete_grace: float = 0.0,
+    ):
+        self.session_factory = session_factory
+        self.blob_store = blob_store
+        self.workers = workers
+        self.sizes = list(sizes)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_distance = max_distance
+        self.claim_timeout = claim_timeout
+        self.delete_grace = delete_grace
+        # Replaced images waiting to be deleted
+        self._dropped: Set[str] = set()
+        # Deletes them when the background loop is not running
+        self._delete_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # Spawn rather than fork: the API process has threads of its own
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _map(self, function: Callable, blob_keys: Iterable[str], *args: Any) -> Dict[str, Any]:
+        """
+        Run ``function(blob_store, blob_key, *args)`` on the pool for each
+        blob, returning the results by blob key (``None`` on failure).
+        """
+        executor = self._get_executor()
+        futures = {
+            blob_key: executor.submit(function, self.blob_store, blob_key, *args)
+            for blob_key in blob_keys
+        }
+        results = {}
+        for blob_key, future in futures.items():
+            try:
+                results[blob_key] = future.result()
+            except BrokenProcessPool:
+                # A worker died; leave the whole batch for the next run
+                self._reset_executor()
+                raise
+            except Exception:
+                logger.exception("Failed to process blob %s", blob_key)
+                results[blob_key] = None
+        return results
+
+    def _previous_frame(self, db: Session, shift_id: str, timestamp: int) -> Optional[Frame]:
+        previous = db.query(
+            models.Screenshot.id,
+            models.Screenshot.blobKey,
+            models.Screenshot.phash,
+            models.Screenshot.duplicateOf,
+            models.Screenshot.thumbnails,
+        ).filter(
+            models.Screenshot.shiftId == shift_id,
+            models.Screenshot.timestamp < timestamp,
+            models.Screenshot.processed.is_(True),
+        ).order_by(models.Screenshot.timestamp.desc()).first()
+        return Frame(*previous) if previous else None
+
+    def _claim(self, db: Session, claim_id: str) -> List[Any]:
+        """
+        Claim a batch of unprocessed screenshots, oldest first, and return
+        them. Rows are only claimed if they are still unclaimed when the
+        ``UPDATE`` runs, so concurrent pipelines never share one; claims
+        older than ``claim_timeout`` are taken over.
+        """
+        now = int(time.time() * 1000)
+        unclaimed = [
+            models.Screenshot.processed.is_(False),
+            models.Screenshot.claimedAt.is_(None)
+            | (models.Screenshot.claimedAt < now - int(self.claim_timeout * 1000)),
+        ]
+        candidates = [
+            screenshot_id
+            for screenshot_id, in db.query(models.Screenshot.id).filter(*unclaimed).order_by(
+                models.Screenshot.timestamp, models.Screenshot.id
+            ).limit(self.batch_size)
+        ]
+        if not candidates:
+            return []
+        db.execute(
+            update(models.Screenshot)
+            .where(models.Screenshot.id.in_(candidates), *unclaimed)
+            .values(claimedBy=claim_id, claimedAt=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.query(
+            models.Screenshot.id,
+            models.Screenshot.shiftId,
+            models.Screenshot.timestamp,
+            models.Screenshot.blobKey,
+        ).filter(
+            models.Screenshot.claimedBy == claim_id
+        ).order_by(models.Screenshot.timestamp, models.Screenshot.id).all()
+
+    def process_batch(self) -> int:
+        """
+        Claim and process one batch of unprocessed screenshots, oldest first.
+
+        Returns the number of screenshots claimed.
+        """
+        db = self.session_factory()
+        try:
+            claim_id = uuid.uuid4().hex
+            rows = self._claim(db, claim_id)
+            if not rows:
+                self._delete_dropped(db)
+                return 0
+
+            # Identical images share a blob, so hash each blob once
+            hashes = {}
+            if self.max_distance >= 0:
+                hashes = self._map(image_hash, {row.blobKey for row in rows if row.blobKey})
+
+            # Compare each frame with the previous one of its shift, which
+            # is either earlier in this batch or already processed
+            frames = []
+            latest: Dict[str, Optional[Frame]] = {}
+            known_thumbnails: Dict[str, Optional[Dict[str, str]]] = {}
+            dropped = set()
+            for row in rows:
+                frame = Frame(row.id, row.blobKey, hashes.get(row.blobKey), None, None)
+                if frame.phash is not None:
+                    if row.shiftId not in latest:
+                        latest[row.shiftId] = self._previous_frame(db, row.shiftId, row.timestamp)
+                    previous = latest[row.shiftId]
+                    if (
+                        previous is not None
+                        and previous.phash is not None
+                        and previous.blobKey
+                        and hamming_distance(frame.phash, previous.phash) <= self.max_distance
+                    ):
+                        # Keep the earlier image and its hash, so a slowly
+                        # changing screen is compared with what is stored
+                        frame = Frame(
+                            row.id,
+                            previous.blobKey,
+                            previous.phash,
+                            previous.duplicateOf or previous.id,
+                            None,
+                        )
+                        if previous.thumbnails is not None:
+                            known_thumbnails[previous.blobKey] = previous.thumbnails
+                        if row.blobKey != previous.blobKey:
+                            dropped.add(row.blobKey)
+                frames.append(frame)
+                latest[row.shiftId] = frame
+
+            thumbnails = self._map(
+                render_thumbnails,
+                {frame.blobKey for frame in frames if frame.blobKey and frame.blobKey not in known_thumbnails},
+                self.sizes,
+            )
+            thumbnails.update(known_thumbnails)
+
+            # Only rows still claimed by this batch, in case a claim expired
+            # and another pipeline took the row over
+            table = models.Screenshot.__table__
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("frame_id"), table.c.claimedBy == claim_id)
+                .values(
+                    blobKey=bindparam("blob_key"),
+                    phash=bindparam("frame_phash"),
+                    duplicateOf=bindparam("duplicate_of"),
+                    thumbnails=bindparam("frame_thumbnails", type_=table.c.thumbnails.type),
+                    processed=True,
+                ),
+                [
+                    {
+                        "frame_id": frame.id,
+                        "blob_key": frame.blobKey,
+                        "frame_phash": frame.phash,
+                        "duplicate_of": frame.duplicateOf,
+                        "frame_thumbnails": thumbnails.get(frame.blobKey),
+                    }
+                    for frame in frames
+                ],
+            )
+            db.commit()
+
+            self._dropped.update(dropped)
+            self._delete_dropped(db)
+            return len(rows)
+        finally:
+            db.close()
+
+    def _delete_dropped(self, db: Session) -> None:
+        """
+        Delete the images replaced by earlier frames that nothing references.
+
+        Uploads store their image before committing their row, and are taken
+        to commit within ``delete_grace`` seconds. So an image is only deleted
+        if no committed row references it and it was last stored
+        ``delete_grace`` seconds before the check; others wait for a later
+        batch.
+        """
+        for blob_key in list(self._dropped):
+            stored_before = time.time() - self.delete_grace
+            still_referenced = db.query(models.Screenshot.id).filter(
+                models.Screenshot.blobKey == blob_key
+            ).first()
+            if still_referenced or self.blob_store.delete(blob_key, stored_before):
+                self._dropped.discard(blob_key)
+
+    def discard(self, blob_keys: Iterable[str]) -> None:
+        """
+        Delete images that no committed row references any more, e.g. those
+        of a deleted screenshot and its thumbnails.
+
+        Images stored within the last ``delete_grace`` seconds may belong to
+        an upload that has yet to commit, so they are deleted later, after
+        checking for references again.
+        """
+        stored_before = time.time() - self.delete_grace
+        kept = [blob_key for blob_key in blob_keys if not self.blob_store.delete(blob_key, stored_before)]
+        if not kept:
+            return
+        self._dropped.update(kept)
+        if self._thread is None:
+            self._schedule_delete()
+
+    def _schedule_delete(self) -> None:
+        with self._lock:
+            if self._delete_timer is not None:
+                return
+            self._delete_timer = threading.Timer(self.delete_grace, self._run_delete)
+            self._delete_timer.daemon = True
+            self._delete_timer.start()
+
+    def _run_delete(self) -> None:
+        with self._lock:
+            self._delete_timer = None
+        db = self.session_factory()
+        try:
+            self._delete_dropped(db)
+        except Exception:
+            logger.exception("Deleting discarded images failed")
+        finally:
+            db.close()
+        if self._dropped and self._thread is None and not self._stopping.is_set():
+            self._schedule_delete()
+
+    def drain(self) -> int:
+        """
+        Process batches until no unprocessed screenshots are left.
+
+        Returns the number of screenshots processed.
+        """
+        total = 0
+        while True:
+            count = self.process_batch()
+            total += count
+            if count < self.batch_size:
+                break
+
+        # Wait out the grace period of images still to be deleted
+        while self._dropped:
+            time.sleep(self.poll_interval)
+            db = self.session_factory()
+            try:
+                self._delete_dropped(db)
+            finally:
+                db.close()
+        return total
+
+    def run(self) -> None:
+        """
+        Process screenshots as they arrive until stopped.
+        """
+        while not self._stopping.is_set():
+            try:
+                count = self.process_batch()
+            except Exception:
+                logger.exception("Thumbnail batch failed")
+                count = 0
+            if count < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def notify(self) -> None:
+        """
+        Wake the background loop, e.g. after a screenshot is stored.
+        """
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """
+        Start processing in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name="thumbnail-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread and shut down the worker processes.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            if self._delete_timer is not None:
+                self._delete_timer.cancel()
+                self._delete_timer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+@lru_cache()
+def get_thumbnail_pipeline() -> ThumbnailPipeline:
+    """
+    Return the application's thumbnail pipeline (also a FastAPI dependency).
+    """
+    from app.db.database import SessionLocal
+
+    return ThumbnailPipeline(
+        SessionLocal,
+        get_blob_store(),
+        workers=max(settings.SCREENSHOT_THUMBNAIL_WORKERS, 1),
+        sizes=settings.SCREENSHOT_THUMBNAIL_SIZES,
+        batch_size=settings.SCREENSHOT_THUMBNAIL_BATCH_SIZE,
+        poll_interval=settings.SCREENSHOT_THUMBNAIL_POLL_SECONDS,
+        max_distance=settings.SCREENSHOT_DEDUP_MAX_DISTANCE,
+        claim_timeout=settings.SCREENSHOT_THUMBNAIL_CLAIM_SECONDS,
+        delete_grace=settings.SCREENSHOT_BLOB_DELETE_GRACE_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    from app.db.database import Base, engine
+
+    parser = argparse.ArgumentParser(description="Generate thumbnails for unprocessed screenshots.")
+    parser.add_argument("--drain", action="store_true", help="Process the backlog and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    pipeline = get_thumbnail_pipeline()
+    if args.drain:
+        try:
+            count = pipeline.drain()
+        finally:
+            pipeline.stop()
+        print(f"Processed {count} screenshots")
+    else:
+        try:
+            pipeline.run()
+        except KeyboardInterrupt:
+            pipeline.stop()
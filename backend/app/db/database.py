@@ -1,15 +1,181 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Union
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async drivers for the sync database URLs we support
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Return the async-driver form of a database URL, e.g.
+    ``sqlite:///./app.db`` -> ``sqlite+aiosqlite:///./app.db``.
+    URLs that already name a driver are returned unchanged.
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    try:
+        drivername = ASYNC_DRIVERS[parsed.drivername]
+    except KeyError:
+        raise ValueError(f"No async driver configured for {parsed.drivername} databases")
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Engines each worker process opens: the sync one and the async one
+ENGINES_PER_PROCESS = 2
+
+
+def pool_limits() -> Tuple[int, int]:
+    """
+    Return ``(pool_size, max_overflow)`` for one engine.
+
+    When ``DB_MAX_CONNECTIONS`` is set, the configured sizes are scaled down
+    so that every engine of all ``WEB_CONCURRENCY`` workers can be fully
+    checked out at once without going over it.
+    """
+    pool_size = settings.DB_POOL_SIZE
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if settings.DB_MAX_CONNECTIONS:
+        workers = max(settings.WEB_CONCURRENCY, 1)
+        budget = settings.DB_MAX_CONNECTIONS // (workers * ENGINES_PER_PROCESS)
+        if budget < 1:
+            raise ValueError(
+                f"DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS} is too low for {workers} workers"
+            )
+        pool_size = min(pool_size, budget)
+        max_overflow = min(max_overflow, budget - pool_size)
+    return pool_size, max_overflow
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``create_engine()`` or ``create_async_engine()``:
+    the pool settings plus the connect arguments of the URL's dialect.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    connect_args: Dict[str, Any] = {}
+    options["connect_args"] = connect_args
+    
+    if backend == "sqlite":
+        # Sessions are used from threadpool and background threads
+        connect_args["check_same_thread"] = False
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases share a single connection, there is no pool to size
+            return options
+        if parsed.get_driver_name() == "aiosqlite":
+            # The dialect defaults to opening a connection per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+    
+    pool_size, max_overflow = pool_limits()
+    options.update(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout:
+        if backend == "postgresql":
+            if parsed.get_driver_name() == "asyncpg":
+                connect_args["server_settings"] = {"statement_timeout": str(timeout)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={timeout}"
+        elif backend in ("mysql", "mariadb"):
+            connect_args["init_command"] = f"SET SESSION max_execution_time={timeout}"
+    return options
+
+
+def sqlite_profile_enabled(url: str) -> bool:
+    """
+    Whether the SQLite performance profile applies to a database URL.
+    """
+    return settings.SQLITE_PERFORMANCE_PROFILE and make_url(url).get_backend_name() == "sqlite"
+
+
+def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    Apply the SQLite performance profile to a new connection.
+
+    In WAL mode readers no longer block on the writer (or it on them), and
+    ``synchronous=NORMAL`` then only syncs at checkpoints instead of on every
+    commit. ``busy_timeout`` makes a second writer wait for the lock rather
+    than fail with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+    cursor.close()
+
+
+def create_database_engine(url: str) -> Engine:
+    engine = create_engine(url, **engine_options(url))
+    if sqlite_profile_enabled(url):
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def create_async_database_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(url))
+    if sqlite_profile_enabled(url):
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def pool_status(engine: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    """
+    Utilization of an engine's connection pool. Pools that do not keep
+    connections (e.g. ``NullPool``) only report their type.
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        max_overflow = max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        stats.update(
+            size=size,
+            maxOverflow=max_overflow,
+            checkedIn=pool.checkedin(),
+            checkedOut=checked_out,
+            overflow=max(pool.overflow(), 0),
+            utilization=checked_out / (size + max_overflow) if size + max_overflow else 0.0,
+        )
+    return stats
+
+
+# Sync engine, used by scripts and background jobs
+engine = create_database_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Async engine, used by the API routers
+async_engine = create_async_database_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+)
+# Objects stay loaded after commit so responses never trigger implicit IO
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# AsyncAttrs adds ``await obj.awaitable_attrs.<relationship>`` for lazy loads
+Base = declarative_base(cls=AsyncAttrs)
 
 
 # Dependency
@@ -18,4 +184,60 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Requests with this header, or the cookie set after a write, read from the
+# primary so that clients see their own writes despite replication lag
+READ_PRIMARY_HEADER = "X-Read-Primary"
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+@lru_cache()
+def get_replica_engine() -> Optional[AsyncEngine]:
+    """
+    Return the async engine of the read replica, or None when no
+    READ_REPLICA_URL is configured.
+    """
+    if not settings.READ_REPLICA_URL:
+        return None
+    return create_async_database_engine(get_async_database_url(settings.READ_REPLICA_URL))
+
+
+@lru_cache()
+def get_replica_sessionmaker() -> Optional[async_sessionmaker]:
+    """
+    Return the read replica's session factory (also a FastAPI dependency),
+    or None without a replica.
+    """
+    replica_engine = get_replica_engine()
+    if replica_engine is None:
+        return None
+    return async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+
+
+def read_pinned_to_primary(request: Request) -> bool:
+    return bool(request.headers.get(READ_PRIMARY_HEADER) or request.cookies.get(READ_PRIMARY_COOKIE))
+
+
+# Dependency
+async def get_read_db(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    replica_sessionmaker: Optional[async_sessionmaker] = Depends(get_replica_sessionmaker),
+):
+    """
+    Session for read-only handlers: on the read replica when there is one,
+    otherwise (or when the request is pinned to it) on the primary.
+    """
+    if replica_sessionmaker is None or read_pinned_to_primary(request):
+        yield db
+        return
+    async with replica_sessionmaker() as replica_db:
+        yield replica_db
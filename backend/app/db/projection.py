@@ -0,0 +1,97 @@
+"""
+Column projections for read-heavy list endpoints.
+
+Loading ORM objects for a list page builds an identity-mapped instance per
+row (with change tracking and relationship state) that the route only
+serializes and throws away, and ``response_model`` then validates every
+field again. A :class:`RowProjection` instead runs a Core ``select()`` over
+the columns a response schema needs and hands the resulting tuple-backed
+rows straight to the JSON encoder.
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Sequence, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Column, Select, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class RowProjection:
+    """
+    The columns of a model that back the fields of a response schema.
+
+    Schema fields without a column (e.g. relationship lists) are returned
+    with their schema default unless the caller fills them in.
+    """
+
+    def __init__(self, model: Any, schema: Type[BaseModel]):
+        table_columns = model.__table__.columns
+        self.fields = [name for name in schema.model_fields if name in table_columns]
+        self.columns = [table_columns[name] for name in self.fields]
+        self.defaults = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in schema.model_fields.items()
+            if name not in table_columns
+        }
+
+    def select(self) -> Select:
+        """
+        A ``select()`` of the projected columns, to add criteria to.
+        """
+        return select(*self.columns)
+
+    def rows(self, db: Session, statement: Select) -> List[Dict[str, Any]]:
+        """
+        Execute a statement built from :meth:`select` and return its rows as
+        dicts keyed by field name.
+        """
+        fields = self.fields
+        defaults = self.defaults
+        return [
+            {**dict(zip(fields, row)), **defaults} if defaults else dict(zip(fields, row))
+            for row in db.execute(statement)
+        ]
+
+    async def fetch(self, db: AsyncSession, statement: Select) -> List[Dict[str, Any]]:
+        """
+        :meth:`rows` on an async session.
+        """
+        fields = self.fields
+        defaults = self.defaults
+        return [
+            {**dict(zip(fields, row)), **defaults} if defaults else dict(zip(fields, row))
+            for row in await db.execute(statement)
+        ]
+
+
+async def collect_related(
+    db: AsyncSession,
+    table: Table,
+    key_column: Column,
+    value_column: Column,
+    keys: Iterable[Hashable],
+) -> Dict[Hashable, List[Any]]:
+    """
+    Load one-to-many values (e.g. the employee IDs of tasks from an
+    association table) for many rows with a single ``IN`` query.
+    """
+    related: Dict[Hashable, List[Any]] = {}
+    keys = list(keys)
+    if not keys:
+        return related
+    statement = select(key_column, value_column).select_from(table).where(key_column.in_(keys))
+    for key, value in await db.execute(statement):
+        related.setdefault(key, []).append(value)
+    return related
+
+
+def rows_response(rows: Sequence[Dict[str, Any]]) -> ORJSONResponse:
+    """
+    Serialize projected rows without going through ``response_model``.
+
+    The rows come from our own database through the response schema's
+    columns, so they are encoded as they are instead of being validated
+    field by field again.
+    """
+    return ORJSONResponse(content=list(rows))
@@ -0,0 +1,61 @@
+"""
+Keep a SQLite read replica in step with the primary database, for running
+the read/write session routing locally without a replicating server.
+
+The replica is refreshed with SQLite's online backup API, which copies a
+consistent snapshot of the primary while it keeps accepting writes:
+
+    python -m app.db.replica [--interval SECONDS]
+"""
+import argparse
+import sqlite3
+import time
+
+from sqlalchemy.engine import make_url
+
+
+def sqlite_path(url: str) -> str:
+    """
+    Return the database file of a SQLite URL.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        raise ValueError(f"Not a SQLite database file: {url}")
+    return parsed.database
+
+
+def sync_sqlite_replica(primary_path: str, replica_path: str, pages_per_step: int = 1024) -> None:
+    """
+    Copy the primary database file over the replica.
+
+    Pages are copied ``pages_per_step`` at a time, so writers on the primary
+    are only held up for one step at a time; if they change the database,
+    the copy restarts and still ends up consistent.
+    """
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target, pages=pages_per_step)
+    finally:
+        target.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Copy the SQLite primary to the read replica.")
+    parser.add_argument("--interval", type=float, help="Keep copying every INTERVAL seconds")
+    args = parser.parse_args()
+
+    if not settings.READ_REPLICA_URL:
+        parser.error("READ_REPLICA_URL is not set")
+    primary_path = sqlite_path(settings.DATABASE_URL)
+    replica_path = sqlite_path(settings.READ_REPLICA_URL)
+
+    while True:
+        sync_sqlite_replica(primary_path, replica_path)
+        print(f"Copied {primary_path} to {replica_path}")
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,311 @@
+"""
+Maintenance of the ``shift_daily_rollups`` table.
+
+Closed shifts are split at UTC midnight and their time is added to one
+rollup row per (organization, employee, project, task, day), along with the
+number of shifts overlapping the day, how many of those started on an
+earlier day, and the earliest time worked on it. With these, a report over
+whole days counts and dates shifts exactly as one over raw shifts clipped
+to the same window. The helpers below only stage changes on the given
+session, so they commit in the same transaction as the shift change that
+triggered them; each row is changed with a single atomic ``UPDATE``, so
+concurrent writers never lose each other's deltas.
+
+Reports read the rollups of an organization only once they have been
+rebuilt from raw shifts, which records a ``shift_daily_rollup_builds`` row;
+until then they miss the shifts closed before rollups were maintained.
+Rebuild the table (after upgrading, or after a backfill) with:
+
+    python -m app.db.rollups [--organization ORGANIZATION_ID] [--recreate]
+"""
+import argparse
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.timezones import DAY_MS
+
+RollupKey = Tuple[str, str, Optional[str], Optional[str], int]
+# Organization ID of a rebuild covering every organization
+ALL_ORGANIZATIONS = ""
+
+# Organizations whose rebuild this process has seen recorded
+_built_organizations: Set[str] = set()
+
+# Inserts that leave an existing row alone, by dialect
+INSERT_IGNORE = {
+    "sqlite": lambda table: sqlite.insert(table).on_conflict_do_nothing(),
+    "postgresql": lambda table: postgresql.insert(table).on_conflict_do_nothing(),
+    "mysql": lambda table: mysql.insert(table).prefix_with("IGNORE"),
+    "mariadb": lambda table: mysql.insert(table).prefix_with("IGNORE"),
+}
+
+
+@dataclass
+class RollupDelta:
+    """
+    Change to one rollup row.
+    """
+    time: int = 0
+    shifts: int = 0
+    carried: int = 0
+    # Earliest time worked on the day by the added shift pieces
+    first_start: Optional[int] = None
+    # Whether a piece was removed, which may have held the earliest time
+    removed: bool = False
+
+
+def split_by_day(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (day, milliseconds) for each UTC day covered by [start, end).
+    """
+    day = (start // DAY_MS) * DAY_MS
+    while day < end:
+        piece_start = max(start, day)
+        piece_end = min(end, day + DAY_MS)
+        if piece_end > piece_start:
+            yield day, piece_end - piece_start
+        day += DAY_MS
+
+
+def _accumulate(
+    deltas: Dict[RollupKey, RollupDelta],
+    organization_id: str,
+    employee_id: str,
+    project_id: Optional[str],
+    task_id: Optional[str],
+    start: Optional[int],
+    end: Optional[int],
+    sign: int,
+) -> None:
+    if start is None or end is None or end <= start:
+        return
+    start_day = (start // DAY_MS) * DAY_MS
+    for day, time_spent in split_by_day(start, end):
+        delta = deltas[(organization_id, employee_id, project_id, task_id, day)]
+        delta.time += sign * time_spent
+        delta.shifts += sign
+        if day != start_day:
+            delta.carried += sign
+        if sign > 0:
+            piece_start = max(start, day)
+            if delta.first_start is None or piece_start < delta.first_start:
+                delta.first_start = piece_start
+        else:
+            delta.removed = True
+
+
+def _key_filters(source: Any, key: RollupKey) -> List[Any]:
+    organization_id, employee_id, project_id, task_id, _ = key
+    # Comparing against None renders as IS NULL for unassigned shifts
+    return [
+        source.organizationId == organization_id,
+        source.employeeId == employee_id,
+        source.projectId == project_id,
+        source.taskId == task_id,
+    ]
+
+
+def _apply(db: Session, deltas: Dict[RollupKey, RollupDelta]) -> None:
+    rollup = models.ShiftDailyRollup
+    insert_ignore = INSERT_IGNORE.get(db.get_bind().dialect.name, insert)
+    # Recomputing the earliest time worked reads the changed shift
+    db.flush()
+    for key, delta in deltas.items():
+        if not (delta.time or delta.shifts or delta.carried or delta.removed or delta.first_start is not None):
+            continue
+        day = key[4]
+        filters = _key_filters(rollup, key) + [rollup.day == day]
+        if delta.time > 0 or delta.shifts > 0:
+            # Make sure the row exists; if another writer just inserted it,
+            # this does nothing and the update below adds to theirs
+            db.execute(insert_ignore(rollup.__table__).values(
+                organizationId=key[0],
+                employeeId=key[1],
+                projectId=key[2],
+                taskId=key[3],
+                day=day,
+                time=0,
+                shifts=0,
+                carried=0,
+            ))
+
+        values = {
+            "time": rollup.time + delta.time,
+            "shifts": rollup.shifts + delta.shifts,
+            "carried": rollup.carried + delta.carried,
+        }
+        if delta.removed:
+            # The removed piece may have been the earliest, so take the
+            # earliest from the shifts left on the day
+            values["firstStart"] = select(
+                func.min(case((models.Shift.start > day, models.Shift.start), else_=day))
+            ).where(
+                *_key_filters(models.Shift, key),
+                models.Shift.start < day + DAY_MS,
+                models.Shift.end > day,
+                models.Shift.end > models.Shift.start,
+            ).scalar_subquery()
+        elif delta.first_start is not None:
+            values["firstStart"] = case(
+                (
+                    rollup.firstStart.is_(None) | (rollup.firstStart > delta.first_start),
+                    delta.first_start,
+                ),
+                else_=rollup.firstStart,
+            )
+        db.execute(
+            update(rollup).where(*filters).values(**values).execution_options(synchronize_session=False)
+        )
+
+        if delta.shifts < 0:
+            db.execute(
+                delete(rollup)
+                .where(*filters, rollup.shifts <= 0)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def shift_snapshot(shift: models.Shift) -> dict:
+    """
+    Capture the shift fields the rollups depend on, before it is modified.
+    """
+    return {
+        "organizationId": shift.organizationId,
+        "employeeId": shift.employeeId,
+        "projectId": shift.projectId,
+        "taskId": shift.taskId,
+        "start": shift.start,
+        "end": shift.end,
+    }
+
+
+def record_shift_change(db: Session, shift: models.Shift, previous: Optional[dict] = None) -> None:
+    """
+    Update the rollups for a created or modified shift.
+
+    ``previous`` is the :func:`shift_snapshot` taken before the change, or
+    ``None`` for a new shift. Open shifts contribute nothing.
+    """
+    deltas: Dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+    if previous is not None:
+        _accumulate(
+            deltas,
+            previous["organizationId"],
+            previous["employeeId"],
+            previous["projectId"],
+            previous["taskId"],
+            previous["start"],
+            previous["end"],
+            -1,
+        )
+    _accumulate(
+        deltas,
+        shift.organizationId,
+        shift.employeeId,
+        shift.projectId,
+        shift.taskId,
+        shift.start,
+        shift.end,
+        1,
+    )
+    _apply(db, deltas)
+
+
+def rebuild_rollups(db: Session, organization_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Recompute the rollups from closed shifts and commit.
+
+    Returns the number of rollup rows written.
+    """
+    delete_query = db.query(models.ShiftDailyRollup)
+    shift_query = db.query(
+        models.Shift.organizationId,
+        models.Shift.employeeId,
+        models.Shift.projectId,
+        models.Shift.taskId,
+        models.Shift.start,
+        models.Shift.end,
+    ).filter(models.Shift.end.isnot(None))
+    if organization_id:
+        delete_query = delete_query.filter(models.ShiftDailyRollup.organizationId == organization_id)
+        shift_query = shift_query.filter(models.Shift.organizationId == organization_id)
+    delete_query.delete(synchronize_session=False)
+
+    deltas: Dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+    for row in shift_query.yield_per(batch_size):
+        _accumulate(deltas, *row, 1)
+
+    rows = [
+        {
+            "organizationId": key[0],
+            "employeeId": key[1],
+            "projectId": key[2],
+            "taskId": key[3],
+            "day": key[4],
+            "time": delta.time,
+            "shifts": delta.shifts,
+            "carried": delta.carried,
+            "firstStart": delta.first_start,
+        }
+        for key, delta in deltas.items()
+        if delta.shifts > 0
+    ]
+    db.bulk_insert_mappings(models.ShiftDailyRollup, rows)
+    db.merge(models.ShiftDailyRollupBuild(
+        organizationId=organization_id or ALL_ORGANIZATIONS,
+        builtAt=int(time.time() * 1000),
+    ))
+    db.commit()
+    return len(rows)
+
+
+async def rollups_built(db: AsyncSession, organization_id: str) -> bool:
+    """
+    Tell whether the rollups of an organization have been rebuilt from raw
+    shifts, so that they cover all of its closed shifts. Once seen, a
+    rebuild is remembered for the life of the process.
+    """
+    if ALL_ORGANIZATIONS in _built_organizations or organization_id in _built_organizations:
+        return True
+    result = await db.execute(
+        select(models.ShiftDailyRollupBuild.organizationId).where(
+            models.ShiftDailyRollupBuild.organizationId.in_((ALL_ORGANIZATIONS, organization_id))
+        )
+    )
+    built = result.scalars().all()
+    _built_organizations.update(built)
+    return bool(built)
+
+
+if __name__ == "__main__":
+    from app.db.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Rebuild shift daily rollups from raw shifts.")
+    parser.add_argument("--organization", help="Only rebuild rollups for this organization ID")
+    parser.add_argument(
+        "--recreate",
+        action="store_true",
+        help="Drop and recreate the table first, e.g. after its columns changed",
+    )
+    args = parser.parse_args()
+    if args.recreate and args.organization:
+        parser.error("--recreate rebuilds every organization")
+
+    if args.recreate:
+        models.ShiftDailyRollup.__table__.drop(bind=engine, checkfirst=True)
+        models.ShiftDailyRollupBuild.__table__.drop(bind=engine, checkfirst=True)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_rollups(db, organization_id=args.organization)
+    finally:
+        db.close()
+    print(f"Rebuilt {count} rollup rows")
@@ -0,0 +1,240 @@
+"""
+Write-behind group commit for high-frequency ingest routes.
+
+Clients send screenshots and open shifts on a fixed tick, so inserts arrive
+in bursts of small transactions, each paying for its own commit (an fsync
+on most databases). On SQLite they also queue on the single database lock
+and fail with "database is locked" once ``busy_timeout`` runs out. With
+group commit on, ingest routes instead hand their inserts to
+:class:`IngestWriter`, whose thread collects whatever arrives within a
+short window and commits it in one transaction. Reads keep using the
+request session.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import LatencyRecorder
+from app.db.database import engine, sqlite_profile_enabled
+
+logger = logging.getLogger(__name__)
+
+# A queued write: the function run with the writer's session, its extra
+# arguments, the future of its result and when it was queued
+Job = Tuple[Callable[..., Any], Tuple[Any, ...], Future, float]
+
+
+class IngestWriter:
+    """
+    Thread that runs queued write jobs and group-commits them.
+
+    A job is a function taking a :class:`~sqlalchemy.orm.Session` (plus
+    arguments), like those passed to ``AsyncSession.run_sync()``. Up to
+    ``batch_size`` jobs, gathered for at most ``max_wait`` seconds after the
+    first, share one transaction, and their futures resolve once it has
+    committed. If it fails, its jobs are retried one per transaction so that
+    a bad job only fails its own caller.
+
+    ``session_factory`` should not expire objects on commit, so that
+    instances added by a job stay readable once it completes.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 256,
+        max_wait: float = 0.002,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.jobs = 0
+        self.failed = 0
+        # Time to write and commit a batch, and from queuing a job until
+        # its batch is durable
+        self.flush_latency = LatencyRecorder()
+        self.commit_latency = LatencyRecorder()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Queue ``fn(session, *args)`` and return the future of its result,
+        set once its transaction has committed.
+        """
+        future: Future = Future()
+        self._queue.put((fn, args, future, time.perf_counter()))
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        :meth:`submit` for coroutines: wait for the job without blocking
+        the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters and latencies for the metrics endpoint.
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "failed": self.failed,
+            "averageBatchSize": self.jobs / self.batches if self.batches else 0.0,
+            "flushLatencyMs": self.flush_latency.summary(),
+            "commitLatencyMs": self.commit_latency.summary(),
+        }
+
+    def _next_batch(self) -> Optional[List[Job]]:
+        """
+        Wait for a job, then gather the ones queued right behind it.
+        Returns None once the writer is stopped.
+        """
+        job = self._queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                # Stop once this batch is written
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _commit(self, jobs: Sequence[Job]) -> List[Any]:
+        with self.session_factory() as session, session.begin():
+            return [fn(session, *args) for fn, args, _, _ in jobs]
+
+    def _resolve(self, job: Job, result: Any = None, error: Optional[BaseException] = None) -> None:
+        _, _, future, queued_at = job
+        if error is not None:
+            self.failed += 1
+            future.set_exception(error)
+        else:
+            self.commit_latency.record(time.perf_counter() - queued_at)
+            future.set_result(result)
+
+    def _write(self, batch: List[Job]) -> None:
+        jobs = [job for job in batch if job[2].set_running_or_notify_cancel()]
+        if not jobs:
+            return
+        started = time.perf_counter()
+        try:
+            results = self._commit(jobs)
+        except Exception as e:
+            if len(jobs) == 1:
+                self._resolve(jobs[0], error=e)
+            else:
+                # Find the failing job(s) by committing each on its own
+                for job in jobs:
+                    try:
+                        result = self._commit([job])[0]
+                    except Exception as job_error:
+                        self._resolve(job, error=job_error)
+                    else:
+                        self._resolve(job, result)
+        else:
+            for job, result in zip(jobs, results):
+                self._resolve(job, result)
+        self.flush_latency.record(time.perf_counter() - started)
+        self.batches += 1
+        self.jobs += len(jobs)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Ingest write batch failed")
+
+    def start(self) -> None:
+        """
+        Start writing queued jobs in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Write the jobs queued so far, then stop the background thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+
+def add_instance(session: Session, instance: Any) -> None:
+    """
+    Write job adding one new ORM instance.
+    """
+    session.add(instance)
+
+
+def insert_rows(session: Session, model: Any, rows: List[dict]) -> None:
+    """
+    Write job inserting many rows of a model in one executemany.
+    """
+    session.execute(insert(model), rows)
+
+
+async def run_write(
+    db: AsyncSession, writer: Optional[IngestWriter], fn: Callable[..., Any], *args: Any
+) -> Any:
+    """
+    Run a write job and commit it: on the writer thread when there is one,
+    otherwise on the request's session.
+    """
+    if writer is not None:
+        return await writer.run(fn, *args)
+    result = await db.run_sync(fn, *args)
+    await db.commit()
+    return result
+
+
+def ingest_group_commit_enabled() -> bool:
+    """
+    Group commit is on when asked for, and always with the SQLite
+    performance profile (where it also keeps writers off the database lock).
+    """
+    return settings.INGEST_GROUP_COMMIT or sqlite_profile_enabled(settings.DATABASE_URL)
+
+
+@lru_cache()
+def get_ingest_writer() -> Optional[IngestWriter]:
+    """
+    Return the application's ingest writer (also a FastAPI dependency), or
+    None when ingest routes commit on their own session.
+    """
+    if not ingest_group_commit_enabled():
+        return None
+    return IngestWriter(
+        sessionmaker(bind=engine, autoflush=False, expire_on_commit=False),
+        batch_size=settings.INGEST_BATCH_SIZE,
+        max_wait=settings.INGEST_FLUSH_WINDOW_MS / 1000,
+    )
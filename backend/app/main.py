@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+import math
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api import api_router
+from app.api.screenshot import UPLOAD_OVERHEAD_BYTES
+from app.auth.auth import rate_limit_identity
 from app.core.config import settings
-from app.db.database import Base, engine
+from app.core.hashing import PasswordHasherBusy, get_password_hasher
+from app.core.rate_limit import get_rate_limiter
+from app.core.thumbnails import get_thumbnail_pipeline
+from app.db.database import READ_PRIMARY_COOKIE, Base, engine
+from app.db.writer import get_ingest_writer
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -15,8 +24,42 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    default_response_class=ORJSONResponse,
 )
 
+# Token-bucket limits per principal and organization, when
+# RATE_LIMIT_ENABLED. Registered before CORS, so that CORS wraps it and
+# 429 responses get CORS headers too.
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    rate_limiter = get_rate_limiter()
+    if rate_limiter is not None:
+        principal, organization = rate_limit_identity(request)
+        retry_after = await rate_limiter.check(request, principal, organization)
+        if retry_after:
+            return ORJSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+    return await call_next(request)
+
+# Refuse screenshot uploads declaring a body over the size limit before it
+# is received and spooled; the route still checks the bytes it reads
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.method == "POST" and request.url.path == f"{settings.API_V1_STR}/analytics/screenshot/upload":
+        content_length = request.headers.get("Content-Length", "")
+        if (
+            content_length.isdigit()
+            and int(content_length) > settings.SCREENSHOT_MAX_UPLOAD_BYTES + UPLOAD_OVERHEAD_BYTES
+        ):
+            return ORJSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": "Screenshot image is too large"},
+            )
+    return await call_next(request)
+
 # Set up CORS
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -27,10 +70,66 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Pin a client's reads to the primary for a while after it writes
+if settings.READ_REPLICA_URL:
+    @app.middleware("http")
+    async def pin_reads_after_write(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                "1",
+                max_age=settings.READ_AFTER_WRITE_PIN_SECONDS,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+# Logins are shed when the password hashing queue is full
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many password checks in progress, try again shortly"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.on_event("startup")
+def start_thumbnail_pipeline():
+    if settings.SCREENSHOT_THUMBNAIL_WORKERS > 0:
+        get_thumbnail_pipeline().start()
+
+
+@app.on_event("shutdown")
+def stop_thumbnail_pipeline():
+    if settings.SCREENSHOT_THUMBNAIL_WORKERS > 0:
+        get_thumbnail_pipeline().stop()
+
+
+@app.on_event("startup")
+def start_ingest_writer():
+    ingest_writer = get_ingest_writer()
+    if ingest_writer is not None:
+        ingest_writer.start()
+
+
+@app.on_event("shutdown")
+def stop_ingest_writer():
+    # Flushes the inserts still queued
+    ingest_writer = get_ingest_writer()
+    if ingest_writer is not None:
+        ingest_writer.stop()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    get_password_hasher().shutdown()
+
+
 @app.get("/")
 def root():
     return {"message": "Welcome to the Employee Tracking API"}
@@ -1,8 +1,9 @@
 from app.models.admin import Admin
+from app.models.api_key import ApiKey
 from app.models.employee import Employee, employee_project
 from app.models.organization import Organization
 from app.models.project import Project
 from app.models.task import Task, employee_task, team_task
 from app.models.team import Team, team_project
-from app.models.time_tracking import Shift
+from app.models.time_tracking import Shift, ShiftDailyRollup, ShiftDailyRollupBuild
 from app.models.screenshot import Screenshot
\ No newline at end of file
@@ -13,5 +13,5 @@ class Admin(Base):
     name = Column(String)
     hashed_password = Column(String)
     organizationId = Column(String, index=True)
-    api_key = Column(String, nullable=True)
+    api_key = Column(String, nullable=True)  # Legacy plaintext key; cleared by python -m app.auth.api_keys --clear-legacy
     createdAt = Column(Integer)  # Time in milliseconds
\ No newline at end of file
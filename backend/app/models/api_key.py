@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON
+
+from app.db.database import Base
+from app.utils.id_generator import generate_id
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    # The ID is the public half of the key, so verifying one is a primary key lookup
+    id = Column(String, primary_key=True, index=True, default=lambda: generate_id("wk"))
+    adminId = Column(String, ForeignKey("admins.id"), index=True)
+    organizationId = Column(String, index=True)
+    name = Column(String, nullable=True)
+    keyHash = Column(String)  # SHA-256 of the secret half, hex
+    scopes = Column(JSON)  # "read" (GET requests) and/or "write"
+    createdAt = Column(Integer)  # Time in milliseconds
+    expiresAt = Column(Integer, nullable=True)  # Time in milliseconds
+    revokedAt = Column(Integer, nullable=True)  # Time in milliseconds
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float, JSON
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float, JSON, Index
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -7,8 +7,15 @@ from app.utils.id_generator import generate_id
 
 class Screenshot(Base):
     __tablename__ = "screenshots"
+    __table_args__ = (
+        # Previous-frame lookups when deduplicating a shift's screenshots
+        Index("ix_screenshots_shift_timestamp", "shiftId", "timestamp"),
+        # Keyset pagination by (timestamp, id) within an organization or employee
+        Index("ix_screenshots_org_timestamp_id", "organizationId", "timestamp", "id"),
+        Index("ix_screenshots_employee_timestamp_id", "employeeId", "timestamp", "id"),
+    )
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=lambda: generate_id("wsc"))
     site = Column(String, nullable=True)
     productivity = Column(Float, nullable=True)
     employeeId = Column(String, ForeignKey("employees.id"))
@@ -46,6 +53,13 @@ class Screenshot(Base):
     processed = Column(Boolean, default=False)
     createdAt = Column(String, nullable=True)
     updatedAt = Column(String, nullable=True)
+    blobKey = Column(String, nullable=True, index=True)  # Content hash of the image in the blob store
+    blobSize = Column(Integer, nullable=True)  # Image size in bytes
+    thumbnails = Column(JSON, nullable=True)  # Thumbnail blob keys by size, set once processed
+    phash = Column(String, nullable=True)  # dHash (hex) of the stored image
+    duplicateOf = Column(String, nullable=True)  # Screenshot whose image this near-duplicate reuses
+    claimedBy = Column(String, nullable=True)  # Thumbnail pipeline batch processing this screenshot
+    claimedAt = Column(Integer, nullable=True)  # Time in milliseconds when it was claimed
     
     # Relationships
     shift = relationship("Shift", back_populates="screenshots")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float, JSON
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float, JSON, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
@@ -7,6 +7,11 @@ from app.utils.id_generator import generate_id
 
 class Shift(Base):
     __tablename__ = "shifts"
+    __table_args__ = (
+        # Range indexes for window-overlap queries (start < :end AND end > :start)
+        Index("ix_shifts_org_start_end", "organizationId", "start", "end"),
+        Index("ix_shifts_employee_start_end", "employeeId", "start", "end"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: generate_id("ws"))
     token = Column(String, nullable=True)
@@ -41,4 +46,52 @@ class Shift(Base):
     # Relationships
     employee = relationship("Employee", back_populates="shifts")
     task = relationship("Task", back_populates="shifts")
-    screenshots = relationship("Screenshot", back_populates="shift", cascade="all, delete-orphan")
\ No newline at end of file
+    screenshots = relationship("Screenshot", back_populates="shift", cascade="all, delete-orphan")
+
+
+class ShiftDailyRollup(Base):
+    """
+    Time per (organization, employee, project, task, UTC day), maintained
+    from closed shifts so that long-range reports do not scan raw shifts.
+    """
+    __tablename__ = "shift_daily_rollups"
+    __table_args__ = (
+        Index("ix_shift_daily_rollups_org_day", "organizationId", "day"),
+        Index("ix_shift_daily_rollups_employee_day", "employeeId", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    organizationId = Column(String)
+    employeeId = Column(String, ForeignKey("employees.id"))
+    projectId = Column(String, ForeignKey("projects.id"), nullable=True)
+    taskId = Column(String, ForeignKey("tasks.id"), nullable=True)
+    day = Column(Integer)  # Start of the UTC day in milliseconds
+    time = Column(Integer, default=0)  # Time in milliseconds tracked on this day
+    shifts = Column(Integer, default=0)  # Number of shifts overlapping this day
+    carried = Column(Integer, default=0)  # Of those, shifts that started on an earlier day
+    firstStart = Column(Integer, nullable=True)  # Earliest time worked on this day in milliseconds
+
+
+class ShiftDailyRollupBuild(Base):
+    """
+    Completed rebuilds of the rollups from raw shifts, per organization (""
+    for all of them). Rollups only cover shifts closed since they were
+    introduced, so reports read them only once a rebuild is recorded here.
+    """
+    __tablename__ = "shift_daily_rollup_builds"
+
+    organizationId = Column(String, primary_key=True)
+    builtAt = Column(Integer)  # Time in milliseconds the rebuild finished
+
+
+# One row per key. NULLs never compare equal in a unique constraint, so
+# unassigned project and task IDs are coalesced.
+Index(
+    "uq_shift_daily_rollups_key",
+    ShiftDailyRollup.organizationId,
+    ShiftDailyRollup.employeeId,
+    func.coalesce(ShiftDailyRollup.projectId, ""),
+    func.coalesce(ShiftDailyRollup.taskId, ""),
+    ShiftDailyRollup.day,
+    unique=True,
+)
\ No newline at end of file
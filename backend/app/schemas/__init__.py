@@ -1,7 +1,9 @@
 from app.schemas.admin import Admin, AdminCreate, AdminUpdate, AdminWithApiKey
+from app.schemas.api_key import ApiKey, ApiKeyCreate, ApiKeyWithSecret
 from app.schemas.employee import Employee, EmployeeCreate, EmployeeUpdate, EmployeeSetPassword, EmployeeLogin
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
 from app.schemas.task import Task, TaskCreate, TaskUpdate
-from app.schemas.time_tracking import Shift, ShiftCreate, ShiftUpdate, ProjectTime
-from app.schemas.screenshot import Screenshot, ScreenshotCreate, ScreenshotResponse
-from app.schemas.token import Token, TokenPayload
\ No newline at end of file
+from app.schemas.time_tracking import Shift, ShiftCreate, ShiftUpdate, ProjectTime, PayrollEntry, PayrollResponse
+from app.schemas.screenshot import Screenshot, ScreenshotCreate, ScreenshotResponse, ScreenshotBatchResult, ScreenshotBatchResponse
+from app.schemas.token import Token, TokenPayload
+from app.schemas.metrics import PoolStats, DatabaseMetrics, LatencySummary, IngestMetrics, CacheStats, PasswordHashingStats, AuthMetrics
\ No newline at end of file
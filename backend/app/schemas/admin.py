@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 
 from app.schemas.base import *
 
@@ -24,8 +24,7 @@ class AdminInDBBase(AdminBase):
     id: str
     createdAt: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Admin(AdminInDBBase):
@@ -0,0 +1,28 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+ApiKeyScope = Literal["read", "write"]
+
+
+class ApiKeyCreate(BaseModel):
+    name: Optional[str] = None
+    scopes: List[ApiKeyScope] = Field(default_factory=lambda: ["read", "write"], min_length=1)
+    expiresInDays: Optional[int] = Field(default=None, gt=0)
+
+
+class ApiKey(BaseModel):
+    id: str
+    adminId: str
+    organizationId: str
+    name: Optional[str] = None
+    scopes: List[ApiKeyScope]
+    createdAt: int
+    expiresAt: Optional[int] = None
+    revokedAt: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApiKeyWithSecret(ApiKey):
+    key: str  # Only returned when the key is created
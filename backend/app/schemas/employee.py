@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 from app.schemas.base import *
 
@@ -44,8 +44,7 @@ class EmployeeInDBBase(EmployeeBase):
     createdAt: int
     projects: List[str] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Employee(EmployeeInDBBase):
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    maxOverflow: Optional[int] = None
+    checkedIn: Optional[int] = None
+    checkedOut: Optional[int] = None
+    overflow: Optional[int] = None
+    utilization: Optional[float] = None  # Checked out / (size + max overflow)
+
+
+class LatencySummary(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+
+class IngestMetrics(BaseModel):
+    enabled: bool
+    queued: int = 0
+    batches: int = 0
+    jobs: int = 0
+    failed: int = 0
+    averageBatchSize: float = 0.0
+    flushLatencyMs: LatencySummary = LatencySummary(count=0)  # Writing and committing a batch
+    commitLatencyMs: LatencySummary = LatencySummary(count=0)  # From queuing an insert until it is durable
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxSize: int
+    hits: int
+    misses: int
+    hitRate: float  # Hits / lookups since startup
+
+
+class PasswordHashingStats(BaseModel):
+    workers: int
+    maxQueue: int
+    pending: int  # Running or waiting for a thread
+    rejected: int  # Turned away with a 503 since startup
+    latencyMs: LatencySummary  # Queue wait plus hashing
+
+
+class AuthMetrics(BaseModel):
+    tokens: Optional[CacheStats] = None  # Verified JWT claims, if enabled
+    principals: Optional[CacheStats] = None  # Admins and employees, if enabled
+    apiKeys: Optional[CacheStats] = None  # Verified API key rows, if enabled
+    passwordHashing: PasswordHashingStats
+
+
+class DatabaseMetrics(BaseModel):
+    api: PoolStats  # Async engine used by the API routers
+    background: PoolStats  # Sync engine used by scripts and background jobs
+    replica: Optional[PoolStats] = None  # Async engine of the read replica, if any
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.schemas.base import *
 
@@ -55,8 +55,7 @@ class ProjectInDBBase(ProjectBase):
     createdAt: int
     screenshotSettings: ScreenshotSettings
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Project(ProjectInDBBase):
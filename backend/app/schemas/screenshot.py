@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.schemas.base import *
 
@@ -49,6 +49,7 @@ class ScreenshotCreate(ScreenshotBase):
     processed: bool = False
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
+    screenshot: Optional[str] = None  # Base64-encoded image data
 
 
 class ScreenshotInDBBase(ScreenshotBase):
@@ -86,15 +87,32 @@ class ScreenshotInDBBase(ScreenshotBase):
     processed: bool = False
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
+    blobKey: Optional[str] = None  # Content hash of the image in the blob store
+    blobSize: Optional[int] = None  # Image size in bytes
+    thumbnails: Optional[Dict[str, str]] = None  # Thumbnail blob keys by size
+    phash: Optional[str] = None  # dHash (hex) of the stored image
+    duplicateOf: Optional[str] = None  # Screenshot whose image this near-duplicate reuses
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Screenshot(ScreenshotInDBBase):
     pass
 
 
+class ScreenshotBatchResult(BaseModel):
+    index: int  # Position of the item in the request
+    status: int  # HTTP status code the item would have had on its own
+    id: Optional[str] = None  # ID of the created screenshot
+    detail: Optional[Any] = None  # Error detail for failed items
+
+
+class ScreenshotBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ScreenshotBatchResult]
+
+
 class ScreenshotResponse(BaseModel):
     data: List[Screenshot]
     next: Optional[str] = None
\ No newline at end of file
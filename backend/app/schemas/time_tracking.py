@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.schemas.base import *
 
@@ -60,8 +60,7 @@ class ShiftInDBBase(ShiftBase):
     lastActivityEnd: Optional[int] = None
     lastActivityEndTranslated: Optional[int] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Shift(ShiftInDBBase):
@@ -69,11 +68,35 @@ class Shift(ShiftInDBBase):
 
 
 class ProjectTime(BaseModel):
-    projectId: str
-    projectName: str
+    # Grouping columns are only present for the requested group_by keys
+    projectId: Optional[str] = None
+    projectName: Optional[str] = None
     taskId: Optional[str] = None
     taskName: Optional[str] = None
-    employeeId: str
-    employeeName: str
+    employeeId: Optional[str] = None
+    employeeName: Optional[str] = None
+    teamId: Optional[str] = None
+    teamName: Optional[str] = None
+    day: Optional[int] = None  # Start of the (local) day bucket in milliseconds
     time: int  # Time in milliseconds
-    date: int  # Date in milliseconds
\ No newline at end of file
+    date: int  # Date in milliseconds (earliest shift start in the group)
+    shifts: int  # Number of shifts summed into this row
+
+
+class PayrollEntry(BaseModel):
+    # Grouping columns are only present for the requested group_by keys
+    employeeId: Optional[str] = None
+    employeeName: Optional[str] = None
+    projectId: Optional[str] = None
+    projectName: Optional[str] = None
+    regularTime: int  # Time in milliseconds paid at payRate
+    overtimeTime: int  # Time in milliseconds paid at overtimePayRate
+    regularPay: float
+    overtimePay: float
+    totalPay: float
+    shifts: int  # Number of shifts in this row
+
+
+class PayrollResponse(BaseModel):
+    data: List[PayrollEntry]
+    next: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth.api_keys import clear_legacy_api_keys
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.tests.utils.admin import create_random_admin
+from app.tests.utils.organization import create_random_organization
+
+
+def test_api_key_lifecycle(client: TestClient, db: Session) -> None:
+    """Test creating, using, scoping and revoking an API key."""
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    admin_id = admin.id
+    token_headers = {"Authorization": f"Bearer {create_access_token(admin_id)}"}
+    
+    response = client.post(
+        "/api/v1/api-keys/",
+        headers=token_headers,
+        json={"name": "Reporting", "scopes": ["read"]},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    key = content["key"]
+    assert key.startswith(f"{content['id']}.")
+    assert content["adminId"] == admin_id
+    assert content["scopes"] == ["read"]
+    
+    # Only a hash of the secret is stored
+    api_key = db.get(models.ApiKey, content["id"])
+    assert key.partition(".")[2] not in api_key.keyHash
+    
+    # The key authenticates reads
+    key_headers = {"Authorization": f"Bearer {key}"}
+    response = client.get("/api/v1/api-keys/", headers=key_headers)
+    assert response.status_code == 200
+    listed = response.json()
+    assert [listed_key["id"] for listed_key in listed] == [content["id"]]
+    assert "key" not in listed[0]
+    
+    # But not writes, without the write scope
+    response = client.post("/api/v1/api-keys/", headers=key_headers, json={})
+    assert response.status_code == 403
+    
+    # A wrong secret is refused
+    response = client.get("/api/v1/api-keys/", headers={"Authorization": f"Bearer {content['id']}.wrong"})
+    assert response.status_code == 401
+    
+    # Revoked keys stop working right away
+    response = client.delete(f"/api/v1/api-keys/{content['id']}", headers=token_headers)
+    assert response.status_code == 200
+    assert response.json()["revokedAt"] is not None
+    response = client.get("/api/v1/api-keys/", headers=key_headers)
+    assert response.status_code == 401
+    
+    # Keys of other organizations are not visible
+    other_admin = create_random_admin(db, organization_id=create_random_organization(db).id)
+    response = client.delete(
+        f"/api/v1/api-keys/{content['id']}",
+        headers={"Authorization": f"Bearer {create_access_token(other_admin.id)}"},
+    )
+    assert response.status_code == 404
+
+
+def test_legacy_jwt_api_keys_refused(client: TestClient, db: Session) -> None:
+    """Test that API keys issued as JWTs, which cannot be revoked, are refused."""
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    legacy_key = jwt.encode(
+        {"exp": datetime.utcnow() + timedelta(days=365), "sub": admin.id, "type": "api_key"},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+    
+    response = client.get("/api/v1/api-keys/", headers={"Authorization": f"Bearer {legacy_key}"})
+    assert response.status_code == 401
+
+
+def test_clear_legacy_api_keys(db: Session) -> None:
+    """Test that plaintext keys from before hashing are cleared."""
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    admin.api_key = "plaintext-legacy-key"
+    db.commit()
+    admin_id = admin.id
+    
+    assert clear_legacy_api_keys(db) >= 1
+    db.expire_all()
+    assert db.get(models.Admin, admin_id).api_key is None
+    assert clear_legacy_api_keys(db) == 0
\ No newline at end of file
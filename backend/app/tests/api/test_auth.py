@@ -1,11 +1,17 @@
+import asyncio
+import threading
 import time
 import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.main import app
 from app import models
-from app.core.security import get_password_hash
+from app.auth.cache import get_principal_cache
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.security import create_access_token, get_password_hash
 from app.tests.utils.utils import random_lower_string, random_email
 from app.tests.utils.admin import create_random_admin
 from app.tests.utils.organization import create_random_organization
@@ -119,6 +125,95 @@ def test_generate_admin_api_key(db: Session) -> None:
     assert content["id"] == admin.id
     assert "api_key" in content
     
-    # Check database
-    db.refresh(admin)
-    assert admin.api_key == content["api_key"]
\ No newline at end of file
+    # Only a hash of the key is stored
+    key_id, _, secret = content["api_key"].partition(".")
+    api_key = db.get(models.ApiKey, key_id)
+    assert api_key.adminId == admin.id
+    assert secret not in api_key.keyHash
+
+
+def test_principal_cache(client: TestClient, db: Session) -> None:
+    """Test that token principals are cached until they change."""
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    employee_id = employee.id
+    organization_id = organization.id
+    headers = {"Authorization": f"Bearer {create_access_token(employee_id)}"}
+    cache = get_principal_cache()
+    
+    response = client.get("/api/v1/time-tracking/shift", headers=headers)
+    assert response.status_code == 200
+    cached_model, cached_values = cache.get(employee_id)
+    assert cached_model is models.Employee
+    assert cached_values["organizationId"] == organization_id
+    
+    # Served from the cache
+    response = client.get("/api/v1/time-tracking/shift", headers=headers)
+    assert response.status_code == 200
+    
+    # Updates drop the entry
+    name = random_lower_string()
+    employee = db.get(models.Employee, employee_id)
+    employee.name = name
+    db.commit()
+    assert cache.get(employee_id) is None
+    response = client.get("/api/v1/time-tracking/shift", headers=headers)
+    assert response.status_code == 200
+    assert cache.get(employee_id)[1]["name"] == name
+    
+    # So do deletes, and the token stops working
+    db.delete(db.get(models.Employee, employee_id))
+    db.commit()
+    assert cache.get(employee_id) is None
+    response = client.get("/api/v1/time-tracking/shift", headers=headers)
+    assert response.status_code == 401
+
+
+def test_login_rehash_and_busy(client: TestClient, db: Session) -> None:
+    """Test that logins rehash outdated hashes and are shed when hashing is saturated."""
+    organization = create_random_organization(db)
+    email = random_email()
+    password = random_lower_string()
+    employee = models.Employee(
+        email=email,
+        hashed_password=CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(password),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    employee_id = employee.id
+    
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    db.expire_all()
+    rounds = f"${settings.BCRYPT_ROUNDS:02d}$"
+    assert rounds in db.get(models.Employee, employee_id).hashed_password
+    
+    # One thread, no queue, and the thread is taken
+    password_hasher = PasswordHasher(workers=1, max_queue=0)
+    app.dependency_overrides[get_password_hasher] = lambda: password_hasher
+    release = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(password_hasher.run(release.wait),))
+    thread.start()
+    try:
+        while password_hasher.stats()["pending"] == 0:
+            time.sleep(0.01)
+        response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+        assert password_hasher.stats()["rejected"] == 1
+    finally:
+        release.set()
+        thread.join()
+        password_hasher.shutdown()
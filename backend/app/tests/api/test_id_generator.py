@@ -0,0 +1,59 @@
+import re
+from types import SimpleNamespace
+
+from app.utils import id_generator
+from app.utils.id_generator import RANDOM_LENGTH, RANDOM_SPACE, TIME_LENGTH, generate_id, generate_ids
+
+ID_PATTERN = re.compile(rf"^ws[0-9a-z]{{{TIME_LENGTH + RANDOM_LENGTH}}}$")
+
+
+def freeze_clock(monkeypatch, millis: int) -> SimpleNamespace:
+    """Give the generator a fresh clock stopped at ``millis``."""
+    clock = SimpleNamespace(time_ns=lambda: clock.millis * 1_000_000, millis=millis)
+    monkeypatch.setattr(id_generator, "time", clock)
+    monkeypatch.setattr(id_generator, "_clock", id_generator._MonotonicClock())
+    return clock
+
+
+def test_generate_id_format_and_order() -> None:
+    """Test that IDs generated in a tight loop match the format and increase."""
+    ids = [generate_id("ws") for _ in range(20000)]
+    assert all(ID_PATTERN.match(id_) for id_ in ids)
+    assert all(first < second for first, second in zip(ids, ids[1:]))
+    
+    batch = generate_ids("ws", 1000)
+    assert len(batch) == 1000
+    assert all(ID_PATTERN.match(id_) for id_ in batch)
+    assert ids[-1] < batch[0]
+    assert all(first < second for first, second in zip(batch, batch[1:]))
+    assert generate_ids("ws", 0) == []
+
+
+def test_generate_id_same_millisecond(monkeypatch) -> None:
+    """Test ordering within one millisecond and when the clock goes back."""
+    clock = freeze_clock(monkeypatch, 1700000000123)
+    
+    ids = [generate_id("ws") for _ in range(1000)] + generate_ids("ws", 1000)
+    assert all(first < second for first, second in zip(ids, ids[1:]))
+    # The timestamp reads back from the fixed-width time part
+    assert {int(id_[2:2 + TIME_LENGTH], 36) for id_ in ids} == {1700000000123}
+    
+    clock.millis -= 5000
+    later = generate_id("ws")
+    assert later > ids[-1]
+    assert int(later[2:2 + TIME_LENGTH], 36) == 1700000000123
+    
+    clock.millis = 1700000000124
+    assert generate_id("ws") > later
+
+
+def test_generate_id_exhausted_millisecond(monkeypatch) -> None:
+    """Test that running out of random values moves to the next millisecond."""
+    freeze_clock(monkeypatch, 1700000000123)
+    monkeypatch.setattr(id_generator.secrets, "randbelow", lambda limit: min(limit - 1, RANDOM_SPACE - 3))
+    
+    ids = [generate_id("ws")] + generate_ids("ws", 5)
+    assert int(ids[0][2:2 + TIME_LENGTH], 36) == 1700000000123
+    assert {int(id_[2:2 + TIME_LENGTH], 36) for id_ in ids[1:]} == {1700000000124}
+    assert all(ID_PATTERN.match(id_) for id_ in ids)
+    assert all(first < second for first, second in zip(ids, ids[1:]))
@@ -0,0 +1,193 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.database import engine_options, pool_limits
+from app.tests.utils.admin import create_random_admin
+from app.tests.utils.organization import create_random_organization
+
+
+def test_get_database_metrics(client: TestClient, db: Session) -> None:
+    """Test reading connection pool utilization."""
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    access_token = create_access_token(admin.id)
+    
+    response = client.get(
+        "/api/v1/metrics/database",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    
+    assert response.status_code == 200
+    content = response.json()
+    assert set(content) == {"api", "background", "replica"}
+    assert content["replica"] is None
+    assert content["background"]["pool"] == "QueuePool"
+    assert content["background"]["size"] == settings.DB_POOL_SIZE
+    assert 0 <= content["background"]["utilization"] <= 1
+    
+    # Metrics require authentication
+    response = client.get("/api/v1/metrics/database")
+    assert response.status_code == 401
+
+
+def test_engine_options(monkeypatch) -> None:
+    """Test per-dialect engine options and the connection budget."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 20)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", None)
+    
+    options = engine_options("sqlite:///./app.db")
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 20
+    
+    # In-memory SQLite has no pool to size
+    assert "pool_size" not in engine_options("sqlite://")
+    
+    options = engine_options("postgresql://user:pass@db/app")
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    options = engine_options("postgresql+asyncpg://user:pass@db/app")
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+    
+    # 4 workers with 2 engines each share 100 connections
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 100)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert pool_limits() == (10, 2)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 4)
+    with pytest.raises(ValueError):
+        pool_limits()
+
+
+def test_sqlite_performance_profile(tmp_path, monkeypatch) -> None:
+    """Test the pragmas applied by the SQLite performance profile."""
+    from sqlalchemy import text
+
+    from app.db.database import create_database_engine
+
+    monkeypatch.setattr(settings, "SQLITE_PERFORMANCE_PROFILE", True)
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+    engine.dispose()
+
+
+def test_sync_and_async_database_layers(tmp_path, monkeypatch) -> None:
+    """Test that the sync layer of scripts and jobs and the async layer of the API share data."""
+    import asyncio
+
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import database
+
+    url = f"sqlite:///{tmp_path / 'layers.db'}"
+    engine = database.create_database_engine(url)
+    async_engine = database.create_async_database_engine(database.get_async_database_url(url))
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    )
+    
+    # Written through get_db, as scripts and background jobs do
+    sessions = database.get_db()
+    db = next(sessions)
+    organization_id = create_random_organization(db).id
+    sessions.close()
+    
+    async def read_and_write() -> str:
+        async_sessions = database.get_async_db()
+        async_db = await async_sessions.__anext__()
+        try:
+            organization = await async_db.get(models.Organization, organization_id)
+            organization.name = "renamed"
+            await async_db.commit()
+            return organization.name
+        finally:
+            await async_sessions.aclose()
+    
+    assert asyncio.run(read_and_write()) == "renamed"
+    
+    # And read back through get_db after the async layer's commit
+    sessions = database.get_db()
+    db = next(sessions)
+    assert db.scalar(select(models.Organization.name).where(models.Organization.id == organization_id)) == "renamed"
+    sessions.close()
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def test_get_ingest_metrics(client: TestClient, db: Session) -> None:
+    """Test reading group commit metrics."""
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.writer import IngestWriter, add_instance, get_ingest_writer
+    from app.main import app
+
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+    
+    # Group commit is off by default
+    response = client.get("/api/v1/metrics/ingest", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["enabled"] is False
+    
+    writer = IngestWriter(sessionmaker(bind=db.get_bind(), expire_on_commit=False))
+    app.dependency_overrides[get_ingest_writer] = lambda: writer
+    writer.start()
+    try:
+        writer.submit(add_instance, models.Organization(name="Queued", createdAt=0)).result(timeout=10)
+    finally:
+        writer.stop()
+    
+    response = client.get("/api/v1/metrics/ingest", headers=headers)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["enabled"] is True
+    assert content["batches"] == 1
+    assert content["jobs"] == 1
+    assert content["flushLatencyMs"]["count"] == 1
+    assert content["commitLatencyMs"]["p99"] >= content["flushLatencyMs"]["p50"] >= 0
+
+
+def test_get_auth_metrics(client: TestClient, db: Session) -> None:
+    """Test token cache hits and expiry, and reading auth cache metrics."""
+    import time
+
+    from app.core.security import TokenCache
+
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+    
+    response = client.get("/api/v1/metrics/auth", headers=headers)
+    assert response.status_code == 200
+    before = response.json()
+    response = client.get("/api/v1/metrics/auth", headers=headers)
+    after = response.json()
+    # The same token and admin are served from the caches
+    assert after["tokens"]["hits"] > before["tokens"]["hits"]
+    assert after["principals"]["hits"] > before["principals"]["hits"]
+    assert 0 < after["tokens"]["hitRate"] <= 1
+    
+    cache = TokenCache(max_size=2)
+    cache.put("expired", {"sub": "wa1", "exp": time.time() - 1})
+    assert cache.get("expired") is None
+    for token in ("a", "b", "c"):
+        cache.put(token, {"sub": token, "exp": time.time() + 60})
+    assert cache.get("a") is None
+    assert cache.get("c")["sub"] == "c"
+    assert cache.stats()["size"] == 2
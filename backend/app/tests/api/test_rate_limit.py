@@ -0,0 +1,118 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth.cache import get_principal_cache
+from app.core.config import settings
+from app.core.rate_limit import MemoryBucketStore, SQLiteBucketStore, get_rate_limiter
+from app.core.security import create_access_token
+from app.tests.utils.organization import create_random_organization
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def test_bucket_stores(tmp_path) -> None:
+    """Test token buckets in memory and shared between workers through SQLite."""
+    # Refills too slowly to matter during the test
+    bucket = ("default:we1", 0.001, 3)
+    store = MemoryBucketStore()
+    assert [store.take([bucket]) for _ in range(4)][:3] == [0, 0, 0]
+    assert store.take([bucket]) > 0
+    
+    # All or nothing: a full bucket is not charged when another is empty
+    other = ("default:we2", 0.001, 3)
+    assert store.take([other, bucket]) > 0
+    assert [store.take([other]) for _ in range(3)] == [0, 0, 0]
+    
+    # Two workers sharing a SQLite file hand out the burst exactly once
+    path = str(tmp_path / "rate_limits.db")
+    workers = [SQLiteBucketStore(path), SQLiteBucketStore(path)]
+    granted = []
+    
+    def client(store: SQLiteBucketStore) -> None:
+        for _ in range(10):
+            granted.append(store.take([("ingest:we1", 0.001, 25)]) == 0)
+    
+    threads = [threading.Thread(target=client, args=(workers[i % 2],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert granted.count(True) == 25
+    
+    # Buckets refill at their rate
+    assert workers[0].take([("ingest:we3", 100, 1)]) == 0
+    assert 0 < workers[1].take([("ingest:we3", 100, 1)]) <= 0.01
+    time.sleep(0.02)
+    assert workers[0].take([("ingest:we3", 100, 1)]) == 0
+
+
+def test_rate_limit_middleware(client: TestClient, db: Session, monkeypatch) -> None:
+    """Test per-principal and per-organization limits on requests."""
+    organization = create_random_organization(db)
+    other_organization = create_random_organization(db)
+    employee_ids = []
+    for organization_id in (organization.id, organization.id, other_organization.id):
+        employee = models.Employee(
+            email=random_email(),
+            name=random_lower_string(),
+            type="personal",
+            organizationId=organization_id,
+            createdAt=int(time.time() * 1000),
+        )
+        db.add(employee)
+        db.commit()
+        employee_ids.append(employee.id)
+    headers = [
+        {"Authorization": f"Bearer {create_access_token(employee_id, organization_id=organization_id)}"}
+        for employee_id, organization_id in zip(
+            employee_ids, (organization.id, organization.id, other_organization.id)
+        )
+    ]
+    
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(
+        settings,
+        "RATE_LIMITS",
+        {"default": {"rate": 0.001, "burst": 3, "orgRate": 0.001, "orgBurst": 4}},
+    )
+    get_rate_limiter.cache_clear()
+    try:
+        statuses = [client.get("/api/v1/time-tracking/shift", headers=headers[0]).status_code for _ in range(3)]
+        assert statuses == [200, 200, 200]
+        response = client.get("/api/v1/time-tracking/shift", headers=headers[0])
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        
+        # The token names the organization, so its budget is spent for its
+        # other employees from their first request
+        assert client.get("/api/v1/time-tracking/shift", headers=headers[1]).status_code == 200
+        assert client.get("/api/v1/time-tracking/shift", headers=headers[1]).status_code == 429
+        
+        # Other organizations are not affected
+        assert client.get("/api/v1/time-tracking/shift", headers=headers[2]).status_code == 200
+        assert client.get("/api/v1/time-tracking/shift", headers=headers[2]).status_code == 200
+        
+        # Tokens issued without the organization are only charged to it
+        # while their principal is cached
+        legacy = {"Authorization": f"Bearer {create_access_token(employee_ids[1])}"}
+        get_principal_cache().invalidate([employee_ids[1]])
+        assert client.get("/api/v1/time-tracking/shift", headers=legacy).status_code == 200
+        assert client.get("/api/v1/time-tracking/shift", headers=legacy).status_code == 429
+        
+        # Made-up credentials share their client's bucket with anonymous requests
+        fake = [f"Bearer {random_lower_string()}", "Bearer wk0000.secret", f"Bearer {random_lower_string()}"]
+        statuses = [
+            client.get("/api/v1/time-tracking/shift", headers={"Authorization": credential}).status_code
+            for credential in fake
+        ]
+        assert statuses == [401, 401, 401]
+        assert client.get(
+            "/api/v1/time-tracking/shift", headers={"Authorization": f"Bearer {random_lower_string()}"}
+        ).status_code == 429
+        assert client.get("/api/v1/time-tracking/shift").status_code == 429
+    finally:
+        get_rate_limiter.cache_clear()
@@ -1,3 +1,6 @@
+import base64
+import json
+import os
 import time
 import pytest
 from fastapi.testclient import TestClient
@@ -5,7 +8,10 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app import models
+from app.api.screenshot import UPLOAD_OVERHEAD_BYTES
+from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash
+from app.core.storage import LocalBlobStore, get_blob_store
 from app.tests.utils.utils import random_lower_string, random_email
 from app.tests.utils.admin import create_random_admin
 from app.tests.utils.organization import create_random_organization
@@ -376,7 +382,7 @@ def test_paginate_screenshots(db: Session) -> None:
     assert len(content["data"]) == 2
     assert content["data"][0]["id"] == screenshot1.id
     assert content["data"][1]["id"] == screenshot2.id
-    assert content["next"] == str(timestamp2)
+    assert content["next"] is not None
     
     # Paginate screenshots (second page)
     response = client.get(
@@ -389,4 +395,858 @@ def test_paginate_screenshots(db: Session) -> None:
     content = response.json()
     assert len(content["data"]) == 1
     assert content["data"][0]["id"] == screenshot3.id
-    assert content["next"] is None
\ No newline at end of file
+    assert content["next"] is None
+
+def test_paginate_screenshots_timezone(client: TestClient, db: Session) -> None:
+    """Test that paginated screenshots carry local times for the timezone."""
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    
+    # Create access token for employee
+    access_token = create_access_token(employee.id)
+    
+    # Create shift and screenshot
+    timestamp = 1700024400000  # 2023-11-15 05:00 UTC
+    shift = models.Shift(
+        type="manual",
+        start=timestamp - 3600000,
+        timezoneOffset=-18000000,
+        employeeId=employee.id,
+        organizationId=organization.id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    db.add(models.Screenshot(
+        id=random_lower_string(),
+        employeeId=employee.id,
+        shiftId=shift.id,
+        timestamp=timestamp,
+        organizationId=organization.id,
+    ))
+    db.commit()
+    
+    response = client.get(
+        f"/api/v1/analytics/screenshot/paginate?start={timestamp - 1}&end={timestamp + 1}&timezone=America/New_York",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["data"][0]["timestampTranslated"] == "2023-11-15T00:00:00.000-05:00"
+
+
+
+def test_create_screenshot_stores_image(client: TestClient, db: Session, tmp_path) -> None:
+    """Test that screenshot images are stored once per distinct content."""
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.thumbnails import ThumbnailPipeline, get_thumbnail_pipeline
+
+    blob_store = LocalBlobStore(str(tmp_path))
+    pipeline = ThumbnailPipeline(sessionmaker(bind=db.get_bind()), blob_store, workers=1, sizes=[160])
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    app.dependency_overrides[get_thumbnail_pipeline] = lambda: pipeline
+    
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    organization_id = organization.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization_id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    shift_id = shift.id
+    
+    # Upload the same image twice
+    image = b"\x89PNG\r\n\x1a\n" + os.urandom(256)
+    content = []
+    for offset in range(2):
+        response = client.post(
+            "/api/v1/analytics/screenshot/",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={
+                "employeeId": employee_id,
+                "shiftId": shift_id,
+                "timestamp": int(time.time() * 1000) + offset,
+                "organizationId": organization_id,
+                "screenshot": base64.b64encode(image).decode(),
+            },
+        )
+        assert response.status_code == 200
+        content.append(response.json())
+    
+    blob_key = content[0]["blobKey"]
+    assert blob_key is not None
+    assert content[1]["blobKey"] == blob_key
+    assert content[0]["blobSize"] == len(image)
+    assert blob_store.get(blob_key) == image
+    assert "screenshot" not in content[0]
+    
+    # The blob and its thumbnails are kept until the last screenshot
+    # referencing them is deleted
+    thumbnail_key = blob_store.put(b"thumbnail" + os.urandom(16))
+    for item in content:
+        db.get(models.Screenshot, item["id"]).thumbnails = {"160": thumbnail_key}
+    db.commit()
+    for index, item in enumerate(content):
+        response = client.delete(
+            f"/api/v1/analytics/screenshot/{item['id']}",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 204
+        assert blob_store.exists(blob_key) == (index == 0)
+        assert blob_store.exists(thumbnail_key) == (index == 0)
+    
+    # Images stored within the grace period, e.g. by an upload that has yet
+    # to commit, are deleted once it has passed
+    pipeline.delete_grace = 1.0
+    response = client.post(
+        "/api/v1/analytics/screenshot/",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={
+            "employeeId": employee_id,
+            "shiftId": shift_id,
+            "timestamp": int(time.time() * 1000),
+            "organizationId": organization_id,
+            "screenshot": base64.b64encode(image).decode(),
+        },
+    )
+    assert response.status_code == 200
+    response = client.delete(
+        f"/api/v1/analytics/screenshot/{response.json()['id']}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 204
+    assert blob_store.exists(blob_key)
+    deadline = time.time() + 5
+    while blob_store.exists(blob_key) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not blob_store.exists(blob_key)
+    pipeline.stop()
+    
+    # Invalid image data is rejected
+    response = client.post(
+        "/api/v1/analytics/screenshot/",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={
+            "employeeId": employee_id,
+            "shiftId": shift_id,
+            "timestamp": int(time.time() * 1000),
+            "organizationId": organization_id,
+            "screenshot": "not base64!",
+        },
+    )
+    assert response.status_code == 400
+
+
+
+def test_upload_screenshot(client: TestClient, db: Session, tmp_path, monkeypatch) -> None:
+    """Test creating a screenshot from a multipart upload."""
+    blob_store = LocalBlobStore(str(tmp_path))
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    
+    # Create access token for employee
+    access_token = create_access_token(employee.id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee.id,
+        organizationId=organization.id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    
+    metadata = json.dumps({
+        "employeeId": employee.id,
+        "shiftId": shift.id,
+        "timestamp": int(time.time() * 1000),
+        "organizationId": organization.id,
+        "app": "Chrome",
+    })
+    image = os.urandom(300 * 1024)  # Spans several upload chunks
+    
+    response = client.post(
+        "/api/v1/analytics/screenshot/upload",
+        headers={"Authorization": f"Bearer {access_token}"},
+        data={"metadata": metadata},
+        files={"file": ("screenshot.png", image, "image/png")},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["app"] == "Chrome"
+    assert content["blobSize"] == len(image)
+    assert blob_store.get(content["blobKey"]) == image
+    
+    # Invalid metadata is rejected
+    response = client.post(
+        "/api/v1/analytics/screenshot/upload",
+        headers={"Authorization": f"Bearer {access_token}"},
+        data={"metadata": json.dumps({"app": "Chrome"})},
+        files={"file": ("screenshot.png", image, "image/png")},
+    )
+    assert response.status_code == 422
+    
+    # Uploads declaring an oversized body are rejected before it is read,
+    # ahead of authentication
+    monkeypatch.setattr(settings, "SCREENSHOT_MAX_UPLOAD_BYTES", 1024)
+    response = client.post(
+        "/api/v1/analytics/screenshot/upload",
+        data={"metadata": metadata},
+        files={"file": ("screenshot.png", os.urandom(1024 + UPLOAD_OVERHEAD_BYTES), "image/png")},
+    )
+    assert response.status_code == 413
+    
+    # Bodies within the allowance are still checked as they are read, and
+    # oversized images are rejected without leaving a blob behind
+    response = client.post(
+        "/api/v1/analytics/screenshot/upload",
+        headers={"Authorization": f"Bearer {access_token}"},
+        data={"metadata": metadata},
+        files={"file": ("screenshot.png", os.urandom(4096), "image/png")},
+    )
+    assert response.status_code == 413
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_blob_store_delete_grace(tmp_path) -> None:
+    """Test that blobs stored since the cutoff are not deleted."""
+    blob_store = LocalBlobStore(str(tmp_path))
+    key = blob_store.put(b"image")
+    path = blob_store.path(key)
+    os.utime(path, (1000, 1000))
+    
+    # Storing existing content again counts as storing it now
+    assert blob_store.put(b"image") == key
+    assert not blob_store.delete(key, stored_before=time.time() - 60)
+    assert blob_store.get(key) == b"image"
+    assert os.listdir(os.path.dirname(path)) == [key]
+    
+    os.utime(path, (1000, 1000))
+    assert blob_store.put_stream([b"ima", b"ge"]) == (key, 5)
+    assert not blob_store.delete(key, stored_before=time.time() - 60)
+    
+    os.utime(path, (1000, 1000))
+    assert blob_store.delete(key, stored_before=time.time() - 60)
+    assert not blob_store.exists(key)
+    assert blob_store.delete(key, stored_before=time.time() - 60)
+
+
+def test_thumbnail_pipeline(client: TestClient, db: Session, tmp_path) -> None:
+    """Test generating thumbnails for unprocessed screenshots."""
+    from io import BytesIO
+
+    from PIL import Image
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.thumbnails import ThumbnailPipeline
+
+    blob_store = LocalBlobStore(str(tmp_path))
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    organization_id = organization.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization_id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    shift_id = shift.id
+    
+    buffer = BytesIO()
+    Image.new("RGB", (1920, 1080), (30, 120, 200)).save(buffer, "PNG")
+    images = [buffer.getvalue(), b"not an image", None]
+    
+    screenshot_ids = []
+    for index, image in enumerate(images):
+        screenshot_in = {
+            "employeeId": employee_id,
+            "shiftId": shift_id,
+            "timestamp": int(time.time() * 1000) + index,
+            "organizationId": organization_id,
+        }
+        if image is not None:
+            screenshot_in["screenshot"] = base64.b64encode(image).decode()
+        response = client.post(
+            "/api/v1/analytics/screenshot/",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json=screenshot_in,
+        )
+        assert response.status_code == 200
+        assert response.json()["processed"] is False
+        screenshot_ids.append(response.json()["id"])
+    
+    session_factory = sessionmaker(bind=db.get_bind())
+    pipeline = ThumbnailPipeline(
+        session_factory,
+        blob_store,
+        workers=1,
+        sizes=[160, 480],
+        batch_size=2,
+        claim_timeout=60,
+    )
+    try:
+        # Rows claimed by another pipeline are skipped until the claim expires
+        with session_factory() as other:
+            assert [row.id for row in pipeline._claim(other, "other")] == screenshot_ids[:2]
+        assert pipeline.drain() == 1
+        assert pipeline.drain() == 0
+        pipeline.claim_timeout = 0
+        time.sleep(0.01)
+        assert pipeline.drain() == 2
+    finally:
+        pipeline.stop()
+    
+    screenshots = {
+        screenshot.id: screenshot
+        for screenshot in db.query(models.Screenshot).filter(models.Screenshot.id.in_(screenshot_ids))
+    }
+    assert all(screenshot.processed for screenshot in screenshots.values())
+    
+    thumbnails = screenshots[screenshot_ids[0]].thumbnails
+    assert set(thumbnails) == {"160", "480"}
+    with Image.open(BytesIO(blob_store.get(thumbnails["480"]))) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (480, 270)
+    with Image.open(BytesIO(blob_store.get(thumbnails["160"]))) as thumbnail:
+        assert thumbnail.size == (160, 90)
+    
+    # Unreadable and missing images are marked processed without thumbnails
+    assert screenshots[screenshot_ids[1]].thumbnails is None
+    assert screenshots[screenshot_ids[2]].thumbnails is None
+
+
+def test_screenshot_deduplication(client: TestClient, db: Session, tmp_path) -> None:
+    """Test that near-identical frames of a shift reuse the earlier image."""
+    from io import BytesIO
+
+    from PIL import Image, ImageDraw
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.thumbnails import ThumbnailPipeline
+
+    blob_store = LocalBlobStore(str(tmp_path))
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    organization_id = organization.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization_id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    shift_id = shift.id
+    
+    def encode(image):
+        buffer = BytesIO()
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
+    
+    # An idle screen, the same screen with the clock changed, and a new window
+    idle = Image.new("RGB", (640, 360))
+    for x in range(640):
+        ImageDraw.Draw(idle).line([(x, 0), (x, 359)], fill=(x * 255 // 639, 80, 160))
+    clock = idle.copy()
+    ImageDraw.Draw(clock).rectangle([600, 340, 630, 355], fill=(255, 255, 255))
+    window = idle.transpose(Image.FLIP_LEFT_RIGHT)
+    images = [encode(idle), encode(clock), encode(clock), encode(window)]
+    
+    screenshots = []
+    timestamp = int(time.time() * 1000)
+    for index, image in enumerate(images):
+        response = client.post(
+            "/api/v1/analytics/screenshot/",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={
+                "employeeId": employee_id,
+                "shiftId": shift_id,
+                "timestamp": timestamp + index * 60000,
+                "organizationId": organization_id,
+                "screenshot": base64.b64encode(image).decode(),
+            },
+        )
+        assert response.status_code == 200
+        screenshots.append(response.json())
+    
+    # Process the first frame alone so the rest compare with a stored frame
+    pipeline = ThumbnailPipeline(
+        sessionmaker(bind=db.get_bind()),
+        blob_store,
+        workers=1,
+        sizes=[160],
+        batch_size=1,
+        max_distance=4,
+    )
+    try:
+        assert pipeline.process_batch() == 1
+        pipeline.batch_size = 10
+        # Replaced images stored within the grace period are kept for later
+        pipeline.delete_grace = 60
+        assert pipeline.process_batch() == 3
+        assert blob_store.exists(screenshots[1]["blobKey"])
+        pipeline.delete_grace = 0
+        assert pipeline.drain() == 0
+    finally:
+        pipeline.stop()
+    
+    rows = {
+        row.id: row
+        for row in db.query(models.Screenshot).filter(
+            models.Screenshot.id.in_([screenshot["id"] for screenshot in screenshots])
+        )
+    }
+    first, second, third, fourth = [rows[screenshot["id"]] for screenshot in screenshots]
+    assert first.duplicateOf is None
+    assert first.phash is not None
+    
+    # Near-duplicates point at the first frame's image and thumbnails
+    for duplicate in (second, third):
+        assert duplicate.duplicateOf == first.id
+        assert duplicate.blobKey == first.blobKey
+        assert duplicate.phash == first.phash
+        assert duplicate.thumbnails == first.thumbnails
+    assert not blob_store.exists(screenshots[1]["blobKey"])
+    
+    # A different screen keeps its own image
+    assert fourth.duplicateOf is None
+    assert fourth.blobKey == screenshots[3]["blobKey"]
+    assert blob_store.exists(fourth.blobKey)
+    assert set(fourth.thumbnails) == {"160"}
+
+
+def test_create_screenshots_batch(client: TestClient, db: Session, tmp_path) -> None:
+    """Test creating screenshots in bulk with per-item results."""
+    blob_store = LocalBlobStore(str(tmp_path))
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    
+    # Create organization and two employees
+    organization = create_random_organization(db)
+    employees = []
+    for _ in range(2):
+        employee = models.Employee(
+            email=random_email(),
+            name=random_lower_string(),
+            hashed_password=get_password_hash("password"),
+            type="personal",
+            organizationId=organization.id,
+            createdAt=int(time.time() * 1000),
+        )
+        db.add(employee)
+        employees.append(employee)
+    db.commit()
+    employee_id, other_employee_id = [employee.id for employee in employees]
+    organization_id = organization.id
+    
+    # Create access token for the first employee
+    access_token = create_access_token(employee_id)
+    
+    # Create a shift for each employee
+    shift_ids = []
+    for shift_employee_id in (employee_id, other_employee_id):
+        shift = models.Shift(
+            type="manual",
+            start=int(time.time() * 1000) - 3600000,
+            timezoneOffset=0,
+            employeeId=shift_employee_id,
+            organizationId=organization_id,
+        )
+        db.add(shift)
+        db.commit()
+        shift_ids.append(shift.id)
+    shift_id, other_shift_id = shift_ids
+    
+    timestamp = int(time.time() * 1000)
+    image = os.urandom(1024)
+    
+    def item(**fields):
+        return {
+            "employeeId": employee_id,
+            "shiftId": shift_id,
+            "timestamp": timestamp,
+            "organizationId": organization_id,
+            **fields,
+        }
+    
+    screenshots_in = [
+        item(app="Chrome"),
+        item(app="Slack", screenshot=base64.b64encode(image).decode()),
+        item(timestamp="not a timestamp"),
+        item(employeeId=other_employee_id, shiftId=other_shift_id),
+        item(shiftId=other_shift_id),
+        item(shiftId="nonexistent"),
+        item(screenshot="not base64!"),
+    ]
+    response = client.post(
+        "/api/v1/analytics/screenshot/batch",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json=screenshots_in,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["created"] == 2
+    assert content["failed"] == 5
+    assert [result["index"] for result in content["results"]] == list(range(len(screenshots_in)))
+    assert [result["status"] for result in content["results"]] == [200, 200, 422, 403, 403, 404, 400]
+    
+    created = {
+        screenshot.id: screenshot
+        for screenshot in db.query(models.Screenshot).filter(models.Screenshot.shiftId == shift_id)
+    }
+    assert set(created) == {content["results"][0]["id"], content["results"][1]["id"]}
+    # IDs sort in the order the batch was sent
+    assert "wsc" == content["results"][0]["id"][:3]
+    assert content["results"][0]["id"] < content["results"][1]["id"]
+    assert created[content["results"][0]["id"]].app == "Chrome"
+    assert created[content["results"][0]["id"]].blobKey is None
+    with_image = created[content["results"][1]["id"]]
+    assert with_image.blobSize == len(image)
+    assert blob_store.get(with_image.blobKey) == image
+    
+    # Oversized batches are rejected
+    response = client.post(
+        "/api/v1/analytics/screenshot/batch",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json=[item()] * (settings.SCREENSHOT_BATCH_MAX_ITEMS + 1),
+    )
+    assert response.status_code == 413
+
+
+def test_paginate_screenshots_cursor(client: TestClient, db: Session) -> None:
+    """Test that the cursor keeps screenshots sharing a timestamp, both ways."""
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    
+    # Five screenshots, three of them in the same millisecond
+    timestamp = int(time.time() * 1000) - 1800000
+    screenshots = [
+        models.Screenshot(
+            employeeId=employee_id,
+            shiftId=shift.id,
+            timestamp=timestamp + offset,
+            organizationId=organization.id,
+        )
+        for offset in (0, 1000, 1000, 1000, 2000)
+    ]
+    db.add_all(screenshots)
+    db.commit()
+    expected = [
+        screenshot.id
+        for screenshot in sorted(screenshots, key=lambda screenshot: (screenshot.timestamp, screenshot.id))
+    ]
+    
+    for sort_by, order in (("timestamp", expected), ("timestamp_desc", expected[::-1])):
+        ids = []
+        next_token = None
+        while True:
+            params = {
+                "start": timestamp - 60000,
+                "end": timestamp + 60000,
+                "sort_by": sort_by,
+                "limit": 2,
+            }
+            if next_token:
+                params["next"] = next_token
+            response = client.get(
+                "/api/v1/analytics/screenshot/paginate",
+                headers={"Authorization": f"Bearer {access_token}"},
+                params=params,
+            )
+            assert response.status_code == 200
+            content = response.json()
+            ids.extend(item["id"] for item in content["data"])
+            next_token = content["next"]
+            if next_token is None:
+                break
+        assert ids == order
+    
+    # Malformed cursors are rejected
+    response = client.get(
+        "/api/v1/analytics/screenshot/paginate",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={"start": 0, "end": timestamp, "next": str(timestamp)},
+    )
+    assert response.status_code == 400
+
+
+def test_paginate_screenshots_ndjson(client: TestClient, db: Session, monkeypatch) -> None:
+    """Test streaming a page of screenshots as NDJSON."""
+    from app.api import screenshot as screenshot_api
+
+    # Stream in small chunks to cover chunk boundaries
+    monkeypatch.setattr(screenshot_api, "NDJSON_CHUNK_SIZE", 2)
+    
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create shift
+    shift = models.Shift(
+        type="manual",
+        start=1719835200000 - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+    )
+    db.add(shift)
+    db.commit()
+    db.refresh(shift)
+    
+    # 2024-07-01T12:00:00Z plus one minute per screenshot
+    timestamp = 1719835200000
+    screenshots = [
+        models.Screenshot(
+            employeeId=employee_id,
+            shiftId=shift.id,
+            timestamp=timestamp + index * 60000,
+            organizationId=organization.id,
+            app="Chrome",
+            systemPermissions={"accessibility": "authorized"},
+        )
+        for index in range(5)
+    ]
+    db.add_all(screenshots)
+    db.commit()
+    expected = [screenshot.id for screenshot in screenshots]
+    
+    def get_lines(params):
+        response = client.get(
+            "/api/v1/analytics/screenshot/paginate",
+            headers={"Authorization": f"Bearer {access_token}", "Accept": "application/x-ndjson"},
+            params=params,
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.text.splitlines()]
+    
+    params = {"start": timestamp, "end": timestamp + 3600000, "timezone": "Europe/Berlin", "limit": 3}
+    lines = get_lines(params)
+    assert [line["id"] for line in lines[:-1]] == expected[:3]
+    assert lines[0]["app"] == "Chrome"
+    assert lines[0]["systemPermissions"] == {"accessibility": "authorized"}
+    assert lines[0]["timestampTranslated"] == "2024-07-01T14:00:00.000+02:00"
+    assert lines[-1]["next"] is not None
+    
+    # The trailing cursor continues where the stream stopped
+    lines = get_lines({**params, "next": lines[-1]["next"]})
+    assert [line["id"] for line in lines[:-1]] == expected[3:]
+    assert lines[-1] == {"next": None}
+
+
+def test_ingest_writer(client: TestClient, db: Session) -> None:
+    """Test group-committing screenshot inserts on the ingest writer."""
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.writer import IngestWriter, get_ingest_writer, insert_rows
+
+    writer = IngestWriter(sessionmaker(bind=db.get_bind(), autoflush=False, expire_on_commit=False))
+    
+    # Create organization, employee and shift
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    employee_id = employee.id
+    organization_id = organization.id
+    shift = models.Shift(
+        type="manual",
+        start=int(time.time() * 1000) - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization_id,
+    )
+    db.add(shift)
+    db.commit()
+    shift_id = shift.id
+    access_token = create_access_token(employee_id)
+    
+    # Jobs queued before the thread starts share one transaction; the
+    # duplicate row makes it fail, so each job is then retried on its own
+    rows = [
+        {
+            "id": f"wsc-writer-{index}",
+            "employeeId": employee_id,
+            "shiftId": shift_id,
+            "organizationId": organization_id,
+            "timestamp": 1719835200000 + index * 1000,
+        }
+        for index in range(3)
+    ]
+    futures = [writer.submit(insert_rows, models.Screenshot, [row]) for row in rows]
+    duplicate = writer.submit(insert_rows, models.Screenshot, [rows[0]])
+    writer.start()
+    app.dependency_overrides[get_ingest_writer] = lambda: writer
+    try:
+        assert [future.result(timeout=10) for future in futures] == [None, None, None]
+        with pytest.raises(IntegrityError):
+            duplicate.result(timeout=10)
+        
+        # Routes hand their inserts to the writer
+        response = client.post(
+            "/api/v1/analytics/screenshot/",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={
+                "employeeId": employee_id,
+                "shiftId": shift_id,
+                "timestamp": 1719835300000,
+                "organizationId": organization_id,
+                "app": "Chrome",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["app"] == "Chrome"
+    finally:
+        writer.stop()
+    
+    stats = writer.stats()
+    assert stats["batches"] == 2
+    assert stats["jobs"] == 5
+    assert stats["failed"] == 1
+    assert stats["averageBatchSize"] == 2.5
+    assert stats["flushLatencyMs"]["count"] == 2
+    assert stats["commitLatencyMs"]["count"] == 4
+    assert db.query(models.Screenshot).filter(models.Screenshot.shiftId == shift_id).count() == 4
@@ -4,8 +4,8 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app import models
-from app.core.security import create_access_token
-from app.tests.utils.utils import random_lower_string
+from app.core.security import create_access_token, get_password_hash
+from app.tests.utils.utils import random_lower_string, random_email
 from app.tests.utils.admin import create_random_admin
 from app.tests.utils.organization import create_random_organization
 
@@ -278,4 +278,73 @@ def test_delete_task(db: Session) -> None:
     
     # Check database
     task = db.query(models.Task).filter(models.Task.id == task.id).first()
-    assert task is None
\ No newline at end of file
+    assert task is None
+
+
+def test_read_tasks(client: TestClient, db: Session) -> None:
+    """Test listing the tasks an employee is assigned to."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=1234567890,
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create project
+    project = models.Project(
+        name=random_lower_string(),
+        billable=True,
+        organizationId=organization.id,
+        creatorId=admin.id,
+        createdAt=1234567890,
+    )
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    project_id = project.id
+    
+    # Create two tasks assigned to the employee and one that is not
+    tasks = []
+    for index in range(3):
+        task = models.Task(
+            name=random_lower_string(),
+            projectId=project_id,
+            organizationId=organization.id,
+            creatorId=admin.id,
+            createdAt=1234567890,
+            labels=["label"],
+            employees=[employee] if index < 2 else [],
+        )
+        db.add(task)
+        tasks.append(task)
+    db.commit()
+    assigned = {task.id: task.name for task in tasks[:2]}
+    
+    response = client.get(
+        f"/api/v1/task/?project_id={project_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert {task["id"]: task["name"] for task in content} == assigned
+    for task in content:
+        assert task["projectId"] == project_id
+        assert task["employees"] == [employee_id]
+        assert task["teams"] == []
+        assert task["labels"] == ["label"]
+        assert task["status"] == "To Do"
+        assert task["billable"] is True
@@ -5,10 +5,14 @@ from sqlalchemy.orm import Session
 
 from app.main import app
 from app import models
+from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash
+from app.api.time_tracking import PAYROLL_MAX_LIMIT
+from app.db.rollups import rebuild_rollups
 from app.tests.utils.utils import random_lower_string, random_email
 from app.tests.utils.admin import create_random_admin
 from app.tests.utils.organization import create_random_organization
+from app.utils.payroll import get_payroll_cache
 
 
 client = TestClient(app)
@@ -298,4 +302,776 @@ def test_get_project_time(db: Session) -> None:
     assert content[0]["employeeId"] == employee.id
     assert content[0]["employeeName"] == name
     assert content[0]["time"] == end_time - start_time
-    assert content[0]["date"] == start_time
\ No newline at end of file
+    assert content[0]["date"] == start_time
+
+def test_get_project_time_grouped(client: TestClient, db: Session) -> None:
+    """Test project time analytics summed per project and per day."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    
+    # Create access token for employee
+    access_token = create_access_token(employee.id)
+    
+    # Create project
+    project_name = random_lower_string()
+    project = models.Project(
+        name=project_name,
+        billable=True,
+        organizationId=organization.id,
+        creatorId=admin.id,
+        createdAt=1234567890,
+    )
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    project_id = project.id
+    
+    # Create two shifts on consecutive days
+    day_ms = 86400000
+    day_start = 1700006400000  # Midnight UTC
+    shifts = [
+        (day_start + 3600000, day_start + 7200000),
+        (day_start + day_ms + 3600000, day_start + day_ms + 5400000),
+    ]
+    for shift_start, shift_end in shifts:
+        db.add(models.Shift(
+            type="manual",
+            start=shift_start,
+            end=shift_end,
+            timezoneOffset=0,
+            employeeId=employee.id,
+            organizationId=organization.id,
+            projectId=project_id,
+        ))
+    db.commit()
+    
+    # Not aligned to whole days, so the raw shifts are aggregated
+    window_start = day_start - 60000
+    window_end = day_start + 2 * day_ms + 60000
+    
+    # Group by project
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={window_start}&end={window_end}&group_by=project",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 1
+    assert content[0]["projectId"] == project_id
+    assert content[0]["projectName"] == project_name
+    assert content[0]["employeeId"] is None
+    assert content[0]["time"] == 3600000 + 1800000
+    assert content[0]["date"] == shifts[0][0]
+    assert content[0]["shifts"] == 2
+    
+    # Group by day
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={window_start}&end={window_end}&group_by=day",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [row["day"] for row in content] == [day_start, day_start + day_ms]
+    assert [row["time"] for row in content] == [3600000, 1800000]
+    
+    # Unknown grouping keys are rejected
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={window_start}&end={window_end}&group_by=week",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 400
+
+
+
+def test_project_time_rollups(client: TestClient, db: Session) -> None:
+    """Test daily rollups maintained by shift updates and rebuilt from shifts."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    organization_id = organization.id
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create two projects assigned to the employee
+    project_ids = []
+    for _ in range(2):
+        project = models.Project(
+            name=random_lower_string(),
+            billable=True,
+            organizationId=organization.id,
+            creatorId=admin.id,
+            createdAt=1234567890,
+        )
+        project.employees.append(employee)
+        db.add(project)
+        db.commit()
+        project_ids.append(project.id)
+    
+    # Create an open shift crossing midnight UTC
+    day_ms = 86400000
+    day_start = 1700006400000  # Midnight UTC
+    shift = models.Shift(
+        type="manual",
+        start=day_start + day_ms - 3600000,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+        projectId=project_ids[0],
+    )
+    db.add(shift)
+    db.commit()
+    shift_id = shift.id
+    
+    # Close the shift, then reassign it to the second project
+    response = client.put(
+        f"/api/v1/time-tracking/shift/{shift_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"end": day_start + day_ms + 1800000},
+    )
+    assert response.status_code == 200
+    response = client.put(
+        f"/api/v1/time-tracking/shift/{shift_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"projectId": project_ids[1]},
+    )
+    assert response.status_code == 200
+    
+    rollups = db.query(models.ShiftDailyRollup).order_by(models.ShiftDailyRollup.day).all()
+    assert [(r.projectId, r.day, r.time, r.shifts, r.carried, r.firstStart) for r in rollups] == [
+        (project_ids[1], day_start, 3600000, 1, 0, day_start + day_ms - 3600000),
+        (project_ids[1], day_start + day_ms, 1800000, 1, 1, day_start + day_ms),
+    ]
+    
+    def get_project_days() -> list:
+        response = client.get(
+            f"/api/v1/time-tracking/analytics/project-time?start={day_start}&end={day_start + 2 * day_ms}&group_by=project,day",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 200
+        return [(row["projectId"], row["day"], row["time"]) for row in response.json()]
+    
+    # Until the organization's rollups are rebuilt, they may miss shifts
+    # closed before they were maintained, so raw shifts are read
+    rollup_filter = models.ShiftDailyRollup.organizationId == organization_id
+    db.query(models.ShiftDailyRollup).filter(rollup_filter).delete()
+    db.commit()
+    assert get_project_days() == [
+        (project_ids[1], day_start, 3600000),
+        (project_ids[1], day_start + day_ms, 1800000),
+    ]
+    
+    # Rebuilding from raw shifts gives the same rollups and records it
+    assert rebuild_rollups(db, organization_id=organization_id) == 2
+    rollups = db.query(models.ShiftDailyRollup).filter(rollup_filter).order_by(models.ShiftDailyRollup.day).all()
+    assert [(r.projectId, r.day, r.time, r.shifts, r.carried, r.firstStart) for r in rollups] == [
+        (project_ids[1], day_start, 3600000, 1, 0, day_start + day_ms - 3600000),
+        (project_ids[1], day_start + day_ms, 1800000, 1, 1, day_start + day_ms),
+    ]
+    assert db.get(models.ShiftDailyRollupBuild, organization_id) is not None
+    
+    # Day-aligned windows are then answered from the rollups
+    db.query(models.ShiftDailyRollup).filter(rollup_filter).update({"time": 60000})
+    db.commit()
+    assert get_project_days() == [
+        (project_ids[1], day_start, 60000),
+        (project_ids[1], day_start + day_ms, 60000),
+    ]
+
+
+
+def test_project_time_rollups_match_shifts(client: TestClient, db: Session, monkeypatch) -> None:
+    """Test that rollups and raw shifts give the same project time."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    organization_id = organization.id
+    access_token = create_access_token(employee_id)
+    
+    project = models.Project(
+        name=random_lower_string(),
+        billable=True,
+        organizationId=organization.id,
+        creatorId=admin.id,
+        createdAt=1234567890,
+    )
+    project.employees.append(employee)
+    db.add(project)
+    db.commit()
+    project_id = project.id
+    # Rollups are read once the (still empty) organization has been rebuilt
+    assert rebuild_rollups(db, organization_id=organization_id) == 0
+    
+    # Shifts running into day 1, inside it, into day 2 and across all of it
+    hour_ms = 3600000
+    day_ms = 86400000
+    day1 = 1700006400000  # Midnight UTC
+    headers = {"Authorization": f"Bearer {access_token}"}
+    shift_ids = []
+    for start, end in [
+        (day1 - hour_ms, day1 + hour_ms),
+        (day1 + 10 * hour_ms, day1 + 12 * hour_ms),
+        (day1 + 22 * hour_ms, day1 + day_ms + 3 * hour_ms),
+        (day1 - 4 * hour_ms, day1 + day_ms + 2 * hour_ms),
+    ]:
+        response = client.post(
+            "/api/v1/time-tracking/shift",
+            headers=headers,
+            json={
+                "type": "manual",
+                "start": start,
+                "timezoneOffset": 0,
+                "employeeId": employee_id,
+                "organizationId": organization_id,
+                "projectId": project_id,
+            },
+        )
+        assert response.status_code == 200
+        shift_ids.append(response.json()["id"])
+        response = client.put(f"/api/v1/time-tracking/shift/{shift_ids[-1]}", headers=headers, json={"end": end})
+        assert response.status_code == 200
+    
+    def compare_sources() -> list:
+        results = {}
+        for use_rollups in (True, False):
+            monkeypatch.setattr(settings, "PROJECT_TIME_ROLLUPS", use_rollups)
+            results[use_rollups] = []
+            for start, end in [(day1, day1 + day_ms), (day1, day1 + 2 * day_ms), (day1 + day_ms, day1 + 3 * day_ms)]:
+                for group_by in ("project", "project,day", "employee,day"):
+                    response = client.get(
+                        f"/api/v1/time-tracking/analytics/project-time?start={start}&end={end}&group_by={group_by}",
+                        headers=headers,
+                    )
+                    assert response.status_code == 200
+                    results[use_rollups].append(response.json())
+        assert results[True] == results[False]
+        return results[True]
+    
+    # Day 1 holds all four shifts, from its first millisecond
+    content = compare_sources()
+    assert [(row["time"], row["date"], row["shifts"]) for row in content[0]] == [(29 * hour_ms, day1, 4)]
+    
+    # Unassign one shift holding day 1's first millisecond and end the other
+    # before day 1
+    response = client.put(f"/api/v1/time-tracking/shift/{shift_ids[0]}", headers=headers, json={"projectId": None})
+    assert response.status_code == 200
+    response = client.put(f"/api/v1/time-tracking/shift/{shift_ids[3]}", headers=headers, json={"end": day1 - 2 * hour_ms})
+    assert response.status_code == 200
+    content = compare_sources()
+    assert [(row["time"], row["date"], row["shifts"]) for row in content[0]] == [
+        (4 * hour_ms, day1 + 10 * hour_ms, 2),
+    ]
+    rollups = db.query(models.ShiftDailyRollup).filter(
+        models.ShiftDailyRollup.employeeId == employee_id,
+    ).order_by(models.ShiftDailyRollup.projectId, models.ShiftDailyRollup.day).all()
+    assert [(r.projectId, r.day, r.time, r.shifts, r.carried, r.firstStart) for r in rollups] == [
+        (None, day1 - day_ms, hour_ms, 1, 0, day1 - hour_ms),
+        (None, day1, hour_ms, 1, 1, day1),
+        (project_id, day1 - day_ms, 2 * hour_ms, 1, 0, day1 - 4 * hour_ms),
+        (project_id, day1, 4 * hour_ms, 2, 0, day1 + 10 * hour_ms),
+        (project_id, day1 + day_ms, 3 * hour_ms, 1, 1, day1 + day_ms),
+    ]
+
+
+def test_update_shift_rejects_long_shifts(client: TestClient, db: Session) -> None:
+    """Test that shifts cannot be closed after the maximum shift duration."""
+    # Create organization and employee
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    access_token = create_access_token(employee.id)
+    
+    # Create an open shift
+    shift = models.Shift(
+        type="manual",
+        start=1700006400000,
+        timezoneOffset=0,
+        employeeId=employee.id,
+        organizationId=organization.id,
+    )
+    db.add(shift)
+    db.commit()
+    shift_id = shift.id
+    
+    # Closing it after the maximum duration is rejected
+    response = client.put(
+        f"/api/v1/time-tracking/shift/{shift_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"end": 1700006400000 + settings.MAX_SHIFT_DURATION_MS + 1},
+    )
+    assert response.status_code == 422
+    db.expire_all()
+    assert db.get(models.Shift, shift_id).end is None
+    
+    # Closing it at the maximum duration is accepted
+    response = client.put(
+        f"/api/v1/time-tracking/shift/{shift_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"end": 1700006400000 + settings.MAX_SHIFT_DURATION_MS},
+    )
+    assert response.status_code == 200
+    assert response.json()["end"] == 1700006400000 + settings.MAX_SHIFT_DURATION_MS
+
+
+def test_get_project_time_clips_to_window(client: TestClient, db: Session) -> None:
+    """Test that shifts straddling the window are clipped instead of dropped."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    
+    # Create access token for employee
+    access_token = create_access_token(employee.id)
+    
+    # Create project
+    project = models.Project(
+        name=random_lower_string(),
+        billable=True,
+        organizationId=organization.id,
+        creatorId=admin.id,
+        createdAt=1234567890,
+    )
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    
+    # Overnight shift from 22:00 yesterday to 02:00 today
+    day_start = 1700006400000  # Midnight UTC
+    db.add(models.Shift(
+        type="manual",
+        start=day_start - 7200000,
+        end=day_start + 7200000,
+        timezoneOffset=0,
+        employeeId=employee.id,
+        organizationId=organization.id,
+        projectId=project.id,
+    ))
+    db.commit()
+    
+    # Query the morning of today
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={day_start}&end={day_start + 43200000}&group_by=project,day",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 1
+    assert content[0]["time"] == 7200000
+    assert content[0]["date"] == day_start
+    assert content[0]["day"] == day_start
+
+
+def test_get_project_time_local_days(client: TestClient, db: Session) -> None:
+    """Test day buckets split at local midnight of the requested timezone."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    
+    # Create access token for employee
+    access_token = create_access_token(employee.id)
+    
+    # Create project
+    project = models.Project(
+        name=random_lower_string(),
+        billable=True,
+        organizationId=organization.id,
+        creatorId=admin.id,
+        createdAt=1234567890,
+    )
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    
+    # 22:00 to 01:00 in New York (UTC-5), i.e. 03:00 to 06:00 UTC
+    local_midnight = 1700024400000  # 2023-11-15 00:00 in New York
+    db.add(models.Shift(
+        type="manual",
+        start=local_midnight - 7200000,
+        end=local_midnight + 3600000,
+        timezoneOffset=-18000000,
+        employeeId=employee.id,
+        organizationId=organization.id,
+        projectId=project.id,
+    ))
+    db.commit()
+    
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={local_midnight - 86400000}&end={local_midnight + 86400000}"
+        "&group_by=day&timezone=America/New_York",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [(row["day"], row["time"], row["shifts"]) for row in content] == [
+        (local_midnight - 86400000, 7200000, 1),
+        (local_midnight, 3600000, 0),
+    ]
+    
+    # The same shift falls on a single UTC day
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={local_midnight - 86400000}&end={local_midnight + 86400000}"
+        "&group_by=day",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    assert [row["time"] for row in response.json()] == [10800000]
+    
+    # Unknown timezones are rejected
+    response = client.get(
+        f"/api/v1/time-tracking/analytics/project-time?start={local_midnight}&end={local_midnight + 1}"
+        "&timezone=Nowhere/Special",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 400
+
+
+def test_get_payroll(client: TestClient, db: Session) -> None:
+    """Test regular and overtime pay per project for a closed pay period."""
+    # Create organization and admin
+    organization = create_random_organization(db)
+    admin = create_random_admin(db, organization_id=organization.id)
+    
+    # Create employee
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    db.refresh(employee)
+    employee_id = employee.id
+    
+    # Create access token for employee
+    access_token = create_access_token(employee_id)
+    
+    # Create two projects
+    project_ids = []
+    for _ in range(2):
+        project = models.Project(
+            name=random_lower_string(),
+            billable=True,
+            organizationId=organization.id,
+            creatorId=admin.id,
+            createdAt=1234567890,
+        )
+        db.add(project)
+        db.commit()
+        project_ids.append(project.id)
+    
+    hour_ms = 3600000
+    period_start = 1700006400000
+    # 10 hours at 20/h with overtime at 30/h after 8 hours
+    db.add(models.Shift(
+        type="manual",
+        start=period_start,
+        end=period_start + 10 * hour_ms,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+        projectId=project_ids[0],
+        payRate=20.0,
+        overtimePayRate=30.0,
+        overtimeStart=period_start + 8 * hour_ms,
+    ))
+    # 2 hours unpaid on the second project
+    db.add(models.Shift(
+        type="manual",
+        start=period_start + 24 * hour_ms,
+        end=period_start + 26 * hour_ms,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+        projectId=project_ids[1],
+        payRate=20.0,
+        paid=False,
+    ))
+    db.commit()
+    
+    url = f"/api/v1/time-tracking/analytics/payroll?start={period_start}&end={period_start + 48 * hour_ms}"
+    response = client.get(
+        f"{url}&group_by=employee",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert len(content["data"]) == 1
+    row = content["data"][0]
+    assert row["employeeId"] == employee_id
+    assert row["regularTime"] == 10 * hour_ms
+    assert row["overtimeTime"] == 2 * hour_ms
+    assert row["regularPay"] == 160.0
+    assert row["overtimePay"] == 60.0
+    assert row["totalPay"] == 220.0
+    assert row["shifts"] == 2
+    
+    # One project per page
+    response = client.get(
+        f"{url}&group_by=project&limit=1",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["data"]) == 1
+    assert content["next"] == "1"
+    rows = content["data"]
+    response = client.get(
+        f"{url}&group_by=project&limit=1&next={content['next']}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    rows += content["data"]
+    by_project = {row["projectId"]: row for row in rows}
+    assert by_project[project_ids[0]]["totalPay"] == 220.0
+    assert by_project[project_ids[1]]["totalPay"] == 0.0
+    assert by_project[project_ids[1]]["regularTime"] == 2 * hour_ms
+    
+    # Page sizes and offsets are bounded
+    for query, status_code in [("limit=0", 422), (f"limit={PAYROLL_MAX_LIMIT + 1}", 422), ("next=-1", 400)]:
+        response = client.get(f"{url}&{query}", headers={"Authorization": f"Bearer {access_token}"})
+        assert response.status_code == status_code
+
+
+def test_payroll_cache_expires(client: TestClient, db: Session, monkeypatch) -> None:
+    """Test that cached payroll changed through another worker expires."""
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    employee_id = employee.id
+    access_token = create_access_token(employee_id)
+    
+    hour_ms = 3600000
+    period_start = 1700006400000
+    shift = models.Shift(
+        type="manual",
+        start=period_start,
+        end=period_start + hour_ms,
+        timezoneOffset=0,
+        employeeId=employee_id,
+        organizationId=organization.id,
+        payRate=20.0,
+    )
+    db.add(shift)
+    db.commit()
+    shift_id = shift.id
+    
+    monkeypatch.setattr(settings, "PAYROLL_CACHE_TTL_SECONDS", 0.2)
+    get_payroll_cache.cache_clear()
+    try:
+        url = f"/api/v1/time-tracking/analytics/payroll?start={period_start}&end={period_start + 24 * hour_ms}"
+        
+        def total_pay() -> float:
+            response = client.get(url, headers={"Authorization": f"Bearer {access_token}"})
+            assert response.status_code == 200
+            return response.json()["data"][0]["totalPay"]
+        
+        assert total_pay() == 20.0
+        # A change this worker did not make is served stale until the entry expires
+        db.query(models.Shift).filter(models.Shift.id == shift_id).update({"payRate": 30.0})
+        db.commit()
+        assert total_pay() == 20.0
+        time.sleep(0.3)
+        assert total_pay() == 30.0
+    finally:
+        get_payroll_cache.cache_clear()
+
+
+
+def test_read_shifts(client: TestClient, db: Session) -> None:
+    """Test listing an employee's shifts."""
+    # Create organization and two employees
+    organization = create_random_organization(db)
+    employees = []
+    for _ in range(2):
+        employee = models.Employee(
+            email=random_email(),
+            name=random_lower_string(),
+            hashed_password=get_password_hash("password"),
+            type="personal",
+            organizationId=organization.id,
+            createdAt=int(time.time() * 1000),
+        )
+        db.add(employee)
+        employees.append(employee)
+    db.commit()
+    employee_id, other_employee_id = [employee.id for employee in employees]
+    
+    # Create access token for the first employee
+    access_token = create_access_token(employee_id)
+    
+    # Create two shifts for the employee and one for the other employee
+    start_time = int(time.time() * 1000) - 3600000
+    for index, shift_employee_id in enumerate((employee_id, employee_id, other_employee_id)):
+        db.add(models.Shift(
+            type="manual",
+            start=start_time + index * 60000,
+            end=start_time + index * 60000 + 30000,
+            timezoneOffset=-18000000,
+            employeeId=shift_employee_id,
+            organizationId=organization.id,
+            payRate=20.5,
+        ))
+    db.commit()
+    
+    response = client.get(
+        "/api/v1/time-tracking/shift",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 2
+    assert sorted(shift["start"] for shift in content) == [start_time, start_time + 60000]
+    for shift in content:
+        assert shift["employeeId"] == employee_id
+        assert shift["end"] == shift["start"] + 30000
+        assert shift["timezoneOffset"] == -18000000
+        assert shift["payRate"] == 20.5
+        assert shift["paid"] is True
+        assert shift["projectId"] is None
+
+
+def test_read_shifts_replica(client: TestClient, db: Session, tmp_path) -> None:
+    """Test routing shift reads to a read replica."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.db.database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, get_replica_sessionmaker
+    from app.db.replica import sync_sqlite_replica
+
+    # Create organization, employee and a shift
+    organization = create_random_organization(db)
+    employee = models.Employee(
+        email=random_email(),
+        name=random_lower_string(),
+        hashed_password=get_password_hash("password"),
+        type="personal",
+        organizationId=organization.id,
+        createdAt=int(time.time() * 1000),
+    )
+    db.add(employee)
+    db.commit()
+    employee_id = employee.id
+    organization_id = organization.id
+    access_token = create_access_token(employee_id)
+    
+    start_time = int(time.time() * 1000) - 3600000
+    for index in range(2):
+        db.add(models.Shift(
+            type="manual",
+            start=start_time + index * 60000,
+            end=start_time + index * 60000 + 30000,
+            timezoneOffset=0,
+            employeeId=employee_id,
+            organizationId=organization_id,
+        ))
+        db.commit()
+        if index == 0:
+            # The replica only has the first shift
+            replica_path = str(tmp_path / "replica.db")
+            sync_sqlite_replica(db.get_bind().url.database, replica_path)
+    
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{replica_path}", poolclass=NullPool)
+    app.dependency_overrides[get_replica_sessionmaker] = lambda: async_sessionmaker(
+        replica_engine, expire_on_commit=False
+    )
+    
+    def read_shifts(**kwargs):
+        response = client.get(
+            "/api/v1/time-tracking/shift",
+            headers={"Authorization": f"Bearer {access_token}", **kwargs.pop("headers", {})},
+            **kwargs,
+        )
+        assert response.status_code == 200
+        return response.json()
+    
+    assert len(read_shifts()) == 1
+    
+    # Pinned requests read their own writes from the primary
+    assert len(read_shifts(headers={READ_PRIMARY_HEADER: "1"})) == 2
+    assert len(read_shifts(cookies={READ_PRIMARY_COOKIE: "1"})) == 2
+    
+    # Once the replica catches up it serves them too
+    sync_sqlite_replica(db.get_bind().url.database, replica_path)
+    assert len(read_shifts()) == 2
@@ -4,11 +4,17 @@ from typing import Dict, Generator
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.db.database import Base, get_db
+from app.core.config import settings
+from app.db.database import Base, get_async_db, get_db
 from app.main import app
 
+# Tests run the thumbnail pipeline explicitly instead of in the background
+settings.SCREENSHOT_THUMBNAIL_WORKERS = 0
+
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -17,6 +23,11 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The API routers use the async driver against the same file. The test client
+# runs each request on its own event loop, so connections are not pooled.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="function")
 def db() -> Generator:
@@ -48,7 +59,16 @@ def client(db: Generator) -> Generator:
         finally:
             db.close()
     
+    # Override the get_async_db dependency used by the API routers
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            try:
+                yield async_db
+            finally:
+                db.close()
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as c:
         yield c
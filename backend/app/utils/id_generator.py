@@ -1,13 +1,97 @@
-import random
+"""
+Time-ordered IDs in the Insightful API's prefixed format (``ws...``,
+``we...``, ...).
+
+After the prefix come a millisecond timestamp and a random part, both in
+lowercase base36 and fixed width, so IDs of one kind sort by creation time.
+New rows then land at the right edge of the primary key index instead of on
+a random page of it. Within a millisecond the random part counts up from a
+random start, so IDs from one process also keep their order there.
+"""
+import secrets
 import string
+import threading
 import time
+from typing import List, Tuple
+
+# Digits before letters: string order matches numeric order
+ALPHABET = string.digits + string.ascii_lowercase
+BASE = len(ALPHABET)
+# 36**9 milliseconds since the Unix epoch reach into the year 5188
+TIME_LENGTH = 9
+# About 62 random bits per millisecond: unique across processes while
+# keeping keys, and so the indexes on them, short
+RANDOM_LENGTH = 12
+RANDOM_SPACE = BASE ** RANDOM_LENGTH
+
+# Encode two digits per division
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+
+
+def _encode(value: int, length: int) -> str:
+    """
+    Encode ``value`` as ``length`` (even) zero-padded base36 digits.
+    """
+    pairs = []
+    for _ in range(length // 2):
+        value, pair = divmod(value, BASE * BASE)
+        pairs.append(_PAIRS[pair])
+    return "".join(reversed(pairs))
 
 
-def generate_id(prefix: str = "w", length: int = 16) -> str:
+class _MonotonicClock:
+    """
+    Hands out increasing (millisecond, random) pairs.
     """
-    Generate a unique ID with a prefix and random characters.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._millis = 0
+        self._time_part = _encode(0, TIME_LENGTH + 1)[1:]
+        self._random = 0
+
+    def reserve(self, count: int) -> Tuple[str, int]:
+        """
+        Reserve ``count`` consecutive random values in one millisecond.
+        Returns its encoded timestamp and the first value.
+        """
+        with self._lock:
+            millis = time.time_ns() // 1_000_000
+            if millis > self._millis:
+                start = secrets.randbelow(RANDOM_SPACE)
+            else:
+                # Same millisecond, or the clock went back: keep counting
+                millis = self._millis
+                start = self._random + 1
+            if start + count > RANDOM_SPACE:
+                # Out of values for this millisecond: borrow the next one
+                millis += 1
+                start = secrets.randbelow(RANDOM_SPACE - count)
+            if millis != self._millis:
+                self._millis = millis
+                self._time_part = _encode(millis, TIME_LENGTH + 1)[1:]
+            self._random = start + count - 1
+            return self._time_part, start
+
+
+_clock = _MonotonicClock()
+
+
+def generate_id(prefix: str = "w") -> str:
+    """
+    Generate a unique, time-ordered ID with a prefix.
     Similar to the format used in the Insightful API.
     """
-    chars = string.ascii_lowercase + string.digits
-    random_part = ''.join(random.choice(chars) for _ in range(length - len(prefix)))
-    return f"{prefix}{random_part}"
\ No newline at end of file
+    time_part, value = _clock.reserve(1)
+    return f"{prefix}{time_part}{_encode(value, RANDOM_LENGTH)}"
+
+
+def generate_ids(prefix: str, count: int) -> List[str]:
+    """
+    Generate ``count`` increasing IDs at once, for bulk inserts.
+    """
+    if count <= 0:
+        return []
+    time_part, start = _clock.reserve(count)
+    head = f"{prefix}{time_part}"
+    return [head + _encode(value, RANDOM_LENGTH) for value in range(start, start + count)]
@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Tuple
+
+
+def encode_cursor(timestamp: int, id: str) -> str:
+    """
+    Encode the (timestamp, id) position of the last row of a page as an
+    opaque, URL-safe pagination token.
+    """
+    data = json.dumps([timestamp, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Tuple[int, str]:
+    """
+    Decode a token from :func:`encode_cursor`, raising ValueError if it is
+    malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        timestamp, id = json.loads(data)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(timestamp, int) or isinstance(timestamp, bool) or not isinstance(id, str):
+        raise ValueError("Invalid pagination cursor")
+    return timestamp, id
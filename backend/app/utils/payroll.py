@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Any, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.utils.timezones import HOUR_MS
+
+# Columns that follow the grouping columns in each payroll row
+PAYROLL_COLUMNS = ("start", "end", "payRate", "overtimePayRate", "overtimeStart", "paid")
+
+
+def compute_payroll(rows: Sequence[Any], group_names: List[str]) -> List[dict]:
+    """
+    Compute regular and overtime earnings per group from shift rows.
+
+    Each row holds the grouping columns followed by :data:`PAYROLL_COLUMNS`,
+    with start and end already clipped to the pay period. Rates are per hour.
+    Time after ``overtimeStart`` is paid at ``overtimePayRate`` (falling back
+    to ``payRate``); unpaid shifts count towards time but earn nothing.
+    Groups are returned in order of first appearance.
+    """
+    if not rows:
+        return []
+
+    group_width = len(group_names)
+    columns = list(zip(*rows))
+    group_codes = {}
+    codes = np.fromiter(
+        (group_codes.setdefault(key, len(group_codes)) for key in zip(*columns[:group_width])),
+        dtype=np.int64,
+        count=len(rows),
+    )
+    starts = np.array(columns[group_width], dtype=np.float64)
+    ends = np.array(columns[group_width + 1], dtype=np.float64)
+    pay_rates = np.array(columns[group_width + 2], dtype=np.float64)
+    overtime_rates = np.array(columns[group_width + 3], dtype=np.float64)
+    overtime_starts = np.array(columns[group_width + 4], dtype=np.float64)
+    paid = np.array([bool(value) for value in columns[group_width + 5]], dtype=np.float64)
+
+    # Overtime begins at overtimeStart, bounded to the (clipped) shift
+    overtime_from = np.where(
+        np.isnan(overtime_starts), ends, np.clip(overtime_starts, starts, ends)
+    )
+    regular_time = overtime_from - starts
+    overtime_time = ends - overtime_from
+
+    pay_rates = np.nan_to_num(pay_rates) * paid
+    overtime_rates = np.where(np.isnan(overtime_rates), pay_rates, overtime_rates * paid)
+    regular_pay = regular_time / HOUR_MS * pay_rates
+    overtime_pay = overtime_time / HOUR_MS * overtime_rates
+
+    group_count = len(group_codes)
+    totals = {
+        "regularTime": np.bincount(codes, weights=regular_time, minlength=group_count),
+        "overtimeTime": np.bincount(codes, weights=overtime_time, minlength=group_count),
+        "regularPay": np.bincount(codes, weights=regular_pay, minlength=group_count),
+        "overtimePay": np.bincount(codes, weights=overtime_pay, minlength=group_count),
+        "shifts": np.bincount(codes, minlength=group_count),
+    }
+
+    result = []
+    for code, key in enumerate(group_codes):
+        item = dict(zip(group_names, key))
+        item["regularTime"] = int(totals["regularTime"][code])
+        item["overtimeTime"] = int(totals["overtimeTime"][code])
+        item["regularPay"] = round(float(totals["regularPay"][code]), 2)
+        item["overtimePay"] = round(float(totals["overtimePay"][code]), 2)
+        item["totalPay"] = round(item["regularPay"] + item["overtimePay"], 2)
+        item["shifts"] = int(totals["shifts"][code])
+        result.append(item)
+    return result
+
+
+class PayrollCache(TTLCache):
+    """
+    LRU of computed payroll results for closed pay periods, each expiring
+    ``ttl`` seconds after it was stored.
+
+    Keys start with the organization ID so every entry of an organization
+    can be dropped when one of its shifts changes. Only the worker process
+    that made the change drops them; other workers keep serving theirs
+    until they expire.
+    """
+
+    def invalidate_organization(self, organization_id: Hashable) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == organization_id]:
+                del self._entries[key]
+
+
+@lru_cache()
+def get_payroll_cache() -> Optional[PayrollCache]:
+    """
+    Return the process-wide payroll cache, or None when it is disabled.
+    """
+    if settings.PAYROLL_CACHE_TTL_SECONDS <= 0:
+        return None
+    return PayrollCache(settings.PAYROLL_CACHE_MAX_SIZE, settings.PAYROLL_CACHE_TTL_SECONDS)
+
+
+def invalidate_payroll(organization_id: str) -> None:
+    """
+    Drop this process's cached payroll of an organization, after one of its
+    shifts changed.
+    """
+    payroll_cache = get_payroll_cache()
+    if payroll_cache is not None:
+        payroll_cache.invalidate_organization(organization_id)
@@ -0,0 +1,148 @@
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from typing import Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """
+    Look up an IANA timezone, raising ValueError for unknown names.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def _offset_ms(zone: ZoneInfo, instant_ms: int) -> int:
+    moment = datetime.fromtimestamp(instant_ms / 1000, tz=zone)
+    return int(moment.utcoffset().total_seconds() * 1000)
+
+
+@lru_cache(maxsize=1024)
+def _year_transitions(name: str, year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UTC offset transitions of a zone during one calendar year (UTC).
+
+    Returns the instants in milliseconds at which an offset takes effect,
+    starting with the first instant of the year, and the offsets in
+    milliseconds. Offsets are sampled hourly and each change is narrowed
+    down to the minute.
+    """
+    zone = get_zone(name)
+    year_start = int(datetime(year, 1, 1, tzinfo=dt_timezone.utc).timestamp() * 1000)
+    year_end = int(datetime(year + 1, 1, 1, tzinfo=dt_timezone.utc).timestamp() * 1000)
+
+    instants = [year_start]
+    offsets = [_offset_ms(zone, year_start)]
+    for hour in range(year_start + HOUR_MS, year_end + 1, HOUR_MS):
+        offset = _offset_ms(zone, hour)
+        if offset == offsets[-1]:
+            continue
+        # The change happened within the last hour; find the exact minute
+        low, high = hour - HOUR_MS, hour
+        while high - low > MINUTE_MS:
+            middle = low + ((high - low) // 2 // MINUTE_MS) * MINUTE_MS
+            if _offset_ms(zone, middle) == offsets[-1]:
+                low = middle
+            else:
+                high = middle
+        instants.append(high)
+        offsets.append(offset)
+
+    return np.array(instants, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def _transitions(name: str, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+    first_year = datetime.fromtimestamp(start / 1000, tz=dt_timezone.utc).year
+    last_year = datetime.fromtimestamp(end / 1000, tz=dt_timezone.utc).year
+    years = [_year_transitions(name, year) for year in range(first_year, last_year + 1)]
+    return (
+        np.concatenate([instants for instants, _ in years]),
+        np.concatenate([offsets for _, offsets in years]),
+    )
+
+
+def offsets_at(name: str, instants: np.ndarray) -> np.ndarray:
+    """
+    UTC offsets in milliseconds of a zone at each of the given instants.
+    """
+    instants = np.asarray(instants, dtype=np.int64)
+    if instants.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    transition_instants, transition_offsets = _transitions(
+        name, int(instants.min()), int(instants.max())
+    )
+    index = np.searchsorted(transition_instants, instants, side="right") - 1
+    return transition_offsets[index]
+
+
+def local_day_starts(name: str, start: int, end: int) -> np.ndarray:
+    """
+    UTC instants in milliseconds of every local midnight from the one
+    starting the local day of ``start`` up to the first one after ``end``.
+    """
+    local_start, local_end = offsets_at(name, np.array([start, end])) + np.array([start, end])
+    first_day = (local_start // DAY_MS) * DAY_MS
+    last_day = (local_end // DAY_MS + 1) * DAY_MS
+    local_midnights = np.arange(first_day, last_day + 1, DAY_MS, dtype=np.int64)
+
+    # Resolve local wall time to UTC, re-checking the offset at the guess
+    guess = local_midnights - offsets_at(name, local_midnights)
+    return local_midnights - offsets_at(name, guess)
+
+
+def split_by_local_day(
+    name: str, starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split the intervals [starts, ends) at local midnight of the zone.
+
+    Returns, for every piece, the index of the interval it came from, the
+    UTC instant in milliseconds of the local midnight starting its day, and
+    its length in milliseconds.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if starts.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    bounds = local_day_starts(name, int(starts.min()), int(ends.max()))
+    first = np.searchsorted(bounds, starts, side="right") - 1
+    last = np.searchsorted(bounds, ends - 1, side="right") - 1
+    counts = np.maximum(last - first + 1, 1)
+
+    index = np.repeat(np.arange(starts.size), counts)
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    day_index = first[index] + position
+
+    piece_starts = np.maximum(starts[index], bounds[day_index])
+    piece_ends = np.minimum(ends[index], bounds[day_index + 1])
+    return index, bounds[day_index], piece_ends - piece_starts
+
+
+def translate_timestamps(name: str, instants: np.ndarray) -> np.ndarray:
+    """
+    Format instants in milliseconds as local ISO 8601 strings with offset.
+    """
+    instants = np.asarray(instants, dtype=np.int64)
+    offsets = offsets_at(name, instants)
+    local = np.datetime_as_string((instants + offsets).astype("datetime64[ms]"), unit="ms")
+    minutes = np.abs(offsets) // MINUTE_MS
+    signs = np.where(offsets < 0, "-", "+")
+    suffixes = np.char.add(
+        signs,
+        np.char.add(
+            np.char.zfill((minutes // 60).astype(str), 2),
+            np.char.add(":", np.char.zfill((minutes % 60).astype(str), 2)),
+        ),
+    )
+    return np.char.add(local.astype(str), suffixes)
@@ -0,0 +1,116 @@
+"""
+Time the authentication dependency chain (JWT decode, then admin or
+employee lookup) per request, without caches, with the verified token
+cache, and with the principal cache on top; then the same for API keys
+with and without the key cache.
+
+Run from the backend directory:
+
+    python -m benchmarks.auth_chain [--requests 5000] [--rate 500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth.api_keys import get_api_key_cache, new_api_key, verify_opaque_api_key
+from app.auth.auth import get_current_user
+from app.auth.cache import get_principal_cache, load_principal
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token, get_token_cache
+from app.db.database import Base
+
+
+def configure(token_cache: bool, principal_cache: bool, api_key_cache: bool = False) -> None:
+    settings.TOKEN_CACHE_MAX_SIZE = 10000 if token_cache else 0
+    settings.PRINCIPAL_CACHE_TTL_SECONDS = 30.0 if principal_cache else 0
+    settings.API_KEY_CACHE_TTL_SECONDS = 60.0 if api_key_cache else 0
+    get_token_cache.cache_clear()
+    get_principal_cache.cache_clear()
+    get_api_key_cache.cache_clear()
+
+
+async def run(session_factory, check: Callable[[AsyncSession], Awaitable[Any]], requests: int) -> float:
+    # One session per request, as with the get_async_db dependency
+    async def authenticate() -> None:
+        async with session_factory() as db:
+            await check(db)
+
+    await authenticate()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await authenticate()
+    return (time.perf_counter() - start) / requests
+
+
+def time_decode(token: str, requests: int) -> float:
+    decode_token(token)
+    start = time.perf_counter()
+    for _ in range(requests):
+        decode_token(token)
+    return (time.perf_counter() - start) / requests
+
+
+async def main(path: str, requests: int, rate: int) -> None:
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(sync_engine) as session:
+        employee = models.Employee(email="benchmark@example.com", name="Benchmark", organizationId="wo-benchmark")
+        admin = models.Admin(email="admin@example.com", name="Admin", organizationId="wo-benchmark")
+        session.add_all([employee, admin])
+        session.flush()
+        api_key, key = new_api_key(admin)
+        session.add(api_key)
+        session.commit()
+        token = create_access_token(employee.id)
+    sync_engine.dispose()
+
+    async def check_token(db: AsyncSession) -> None:
+        await get_current_user(db=db, token=token)
+
+    async def check_api_key(db: AsyncSession) -> None:
+        admin_id = await verify_opaque_api_key(db, key, "GET")
+        await load_principal(db, admin_id, (models.Admin,))
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    baseline = None
+    for name, token_cache, principal_cache in (
+        ("uncached", False, False),
+        ("tokens", True, False),
+        ("tokens + principals", True, True),
+    ):
+        configure(token_cache, principal_cache)
+        decode_seconds = time_decode(token, requests)
+        seconds = await run(session_factory, check_token, requests)
+        if baseline is None:
+            baseline = seconds
+        saved = (baseline - seconds) * rate * 1000
+        print(
+            f"{name:<20} {seconds * 1e6:8.1f} us/request ({decode_seconds * 1e6:5.1f} us decoding)"
+            f"   {saved:6.1f} ms saved per second at {rate} req/s"
+        )
+
+    for name, cached in (("api key", False), ("api key, cached", True)):
+        configure(token_cache=cached, principal_cache=cached, api_key_cache=cached)
+        seconds = await run(session_factory, check_api_key, requests)
+        print(f"{name:<20} {seconds * 1e6:8.1f} us/request")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rate", type=int, default=500, help="Authenticated requests per second per worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "auth.db"), args.requests, args.rate))
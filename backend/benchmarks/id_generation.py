@@ -0,0 +1,107 @@
+"""
+Compare screenshot inserts keyed by the old fully random IDs with the
+time-ordered IDs: generation speed, insert throughput and the size of the
+primary key indexes.
+
+Run from the backend directory:
+
+    python -m benchmarks.id_generation [--rows 200000] [--batch 100]
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.db.database import Base
+from app.utils.id_generator import generate_id, generate_ids
+
+
+def random_ids(prefix: str, count: int) -> List[str]:
+    # The previous generate_id(), one random.choice() per character
+    chars = string.ascii_lowercase + string.digits
+    return [
+        prefix + "".join(random.choice(chars) for _ in range(16 - len(prefix)))
+        for _ in range(count)
+    ]
+
+
+def ordered_ids(prefix: str, count: int) -> List[str]:
+    return [generate_id(prefix) for _ in range(count)]
+
+
+def screenshot_rows(ids: List[str], offset: int) -> List[dict]:
+    return [
+        {
+            "id": screenshot_id,
+            "employeeId": "we-benchmark",
+            "shiftId": "ws-benchmark",
+            "organizationId": "wo-benchmark",
+            "timestamp": 1700000000000 + (offset + index) * 1000,
+            "app": "Chrome",
+            "title": f"Page {offset + index}",
+            "active": True,
+            "processed": False,
+        }
+        for index, screenshot_id in enumerate(ids)
+    ]
+
+
+def index_pages(engine: Engine) -> str:
+    with engine.connect() as connection:
+        try:
+            pages, used = connection.execute(
+                text(
+                    "SELECT count(*), 1.0 - 1.0 * sum(unused) / sum(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'screenshots')"
+                )
+            ).one()
+        except OperationalError:
+            # SQLite built without the dbstat table
+            return "n/a"
+    return f"{pages} pages, {used:.0%} full"
+
+
+def run(name: str, make_ids: Callable[[str, int], List[str]], path: str, rows: int, batch: int) -> None:
+    start = time.perf_counter()
+    for _ in range(0, rows, batch):
+        make_ids("wsc", batch)
+    generate_seconds = time.perf_counter() - start
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(models.Screenshot),
+                screenshot_rows(make_ids("wsc", min(batch, rows - offset)), offset),
+            )
+    insert_seconds = time.perf_counter() - start
+    pages = index_pages(engine)
+    engine.dispose()
+
+    print(
+        f"{name:<10} {rows / generate_seconds:11.0f} ids/s {rows / insert_seconds:9.0f} rows/s"
+        f"   id indexes {pages:>20}   file {os.path.getsize(path) / 2 ** 20:7.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=100, help="Screenshots per transaction")
+    args = parser.parse_args()
+
+    print(f"{args.rows} screenshots, {args.batch} per transaction")
+    with tempfile.TemporaryDirectory() as directory:
+        run("random", random_ids, os.path.join(directory, "random.db"), args.rows, args.batch)
+        run("ordered", ordered_ids, os.path.join(directory, "ordered.db"), args.rows, args.batch)
+        run("batched", generate_ids, os.path.join(directory, "batched.db"), args.rows, args.batch)
@@ -0,0 +1,94 @@
+"""
+Compare the ORM + response_model list path with the column projection path.
+
+Run from the backend directory:
+
+    python -m benchmarks.list_projection [--rows 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.core.serialization import get_type_adapter
+from app.db.database import Base
+from app.db.projection import RowProjection, rows_response
+
+
+def populate(db: Session, rows: int) -> None:
+    db.execute(
+        models.Screenshot.__table__.insert(),
+        [
+            {
+                "id": f"wsc{index:013d}",
+                "employeeId": "we-benchmark",
+                "shiftId": "ws-benchmark",
+                "organizationId": "wo-benchmark",
+                "timestamp": 1700000000000 + index * 1000,
+                "app": "Chrome",
+                "title": f"Page {index}",
+                "url": f"https://example.com/{index}",
+                "systemPermissions": {"accessibility": "authorized"},
+                "active": True,
+                "processed": False,
+            }
+            for index in range(rows)
+        ],
+    )
+    db.commit()
+
+
+def orm_path(db: Session) -> bytes:
+    # What the list route did before: ORM objects validated by response_model
+    screenshots = db.query(models.Screenshot).filter(
+        models.Screenshot.organizationId == "wo-benchmark"
+    ).all()
+    adapter = get_type_adapter(List[schemas.Screenshot])
+    data = adapter.validate_python(screenshots, from_attributes=True)
+    body = json.dumps(adapter.dump_python(data, mode="json")).encode()
+    db.expunge_all()
+    return body
+
+
+def projection_path(db: Session) -> bytes:
+    projection = RowProjection(models.Screenshot, schemas.Screenshot)
+    statement = projection.select().where(models.Screenshot.organizationId == "wo-benchmark")
+    return rows_response(projection.rows(db, statement)).body
+
+
+def measure(name: str, path: Callable[[Session], bytes], db: Session, repeat: int) -> None:
+    path(db)  # Warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(db)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    path(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} best {min(timings) * 1000:8.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    populate(db, args.rows)
+
+    print(f"{args.rows} screenshots, best of {args.repeat}")
+    measure("orm", orm_path, db, args.repeat)
+    measure("projection", projection_path, db, args.repeat)
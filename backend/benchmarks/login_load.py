@@ -0,0 +1,127 @@
+"""
+Saturate the login route and measure what it does to other routes: login
+throughput and rejections, and the latency of an authenticated request
+made meanwhile, with bcrypt on the shared request threadpool (as before)
+and on the dedicated password hashing executor.
+
+Run from the backend directory:
+
+    python -m benchmarks.login_load [--logins 64] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Callable, List
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, get_password_hasher
+from app.core.security import create_access_token, get_password_hash
+from app.db.database import Base, get_async_db
+from app.main import app
+
+PASSWORD = "benchmark-password"
+
+
+class SharedThreadpoolHasher(PasswordHasher):
+    # What the routes did before: unbounded, on the request threadpool
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await run_in_threadpool(fn, *args)
+
+
+def provide(value: Any) -> Callable[[], Any]:
+    # Dependency override without arguments (a default one would become a
+    # query parameter)
+    return lambda: value
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(int(fraction * len(samples)), len(samples) - 1)] * 1000
+
+
+async def run(name: str, client: httpx.AsyncClient, admin_token: str, logins: int, seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    statuses: List[int] = []
+    latencies: List[float] = []
+
+    async def login_loop() -> None:
+        while time.monotonic() < deadline:
+            response = await client.post(
+                "/api/v1/auth/login",
+                data={"username": "employee@example.com", "password": PASSWORD},
+            )
+            statuses.append(response.status_code)
+            if response.status_code == 503:
+                await asyncio.sleep(float(response.headers["Retry-After"]))
+
+    async def probe_loop() -> None:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = await client.get(
+                "/api/v1/metrics/database", headers={"Authorization": f"Bearer {admin_token}"}
+            )
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(probe_loop(), *(login_loop() for _ in range(logins)))
+    print(
+        f"{name:<12} {statuses.count(200) / seconds:7.1f} logins/s {statuses.count(503):6d} rejected"
+        f"   other route p50 {percentile(latencies, 0.5):7.1f} ms  p99 {percentile(latencies, 0.99):7.1f} ms"
+    )
+
+
+async def main(path: str, logins: int, seconds: float) -> None:
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(sync_engine) as session:
+        admin = models.Admin(email="admin@example.com", name="Admin", organizationId="wo-benchmark")
+        employee = models.Employee(
+            email="employee@example.com",
+            name="Employee",
+            organizationId="wo-benchmark",
+            hashed_password=get_password_hash(PASSWORD),
+        )
+        session.add_all([admin, employee])
+        session.commit()
+        admin_token = create_access_token(admin.id)
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_benchmark_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_benchmark_db
+    print(f"{logins} concurrent logins for {seconds:.0f}s, bcrypt cost {settings.BCRYPT_ROUNDS}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for name, hasher in (
+            ("threadpool", SharedThreadpoolHasher(0, 0)),
+            ("executor", PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)),
+        ):
+            app.dependency_overrides[get_password_hasher] = provide(hasher)
+            await run(name, client, admin_token, logins, seconds)
+            hasher.shutdown()
+    app.dependency_overrides = {}
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "login.db"), args.logins, args.seconds))
@@ -0,0 +1,117 @@
+"""
+Compare concurrent screenshot inserts on SQLite with and without the
+performance profile (WAL, pragmas) and the group-committing writer thread.
+
+Run from the backend directory:
+
+    python -m benchmarks.sqlite_writes [--clients 32] [--rows 50]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db.database import Base, set_sqlite_pragmas
+from app.db.writer import IngestWriter, insert_rows
+
+
+def make_engine(path: str, clients: int, profile: bool) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{path}",
+        # Same lock wait as the profile's busy_timeout, so only the journal
+        # mode and commit path differ between runs
+        connect_args={"check_same_thread": False, "timeout": 5},
+        pool_size=clients,
+    )
+    if profile:
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def screenshot_row(client: int, index: int) -> dict:
+    return {
+        "id": f"wsc{client:05d}{index:08d}",
+        "employeeId": f"we-benchmark-{client}",
+        "shiftId": f"ws-benchmark-{client}",
+        "organizationId": "wo-benchmark",
+        "timestamp": 1700000000000 + index * 300000,
+        "app": "Chrome",
+        "title": f"Page {index}",
+        "active": True,
+        "processed": False,
+    }
+
+
+def per_request_commits(engine: Engine) -> Callable[[int, int], None]:
+    # What the routes did before: each insert commits its own transaction
+    session_factory = sessionmaker(bind=engine)
+
+    def write(client: int, index: int) -> None:
+        with session_factory() as session, session.begin():
+            insert_rows(session, models.Screenshot, [screenshot_row(client, index)])
+
+    return write
+
+
+def writer_commits(writer: IngestWriter) -> Callable[[int, int], None]:
+    def write(client: int, index: int) -> None:
+        writer.submit(insert_rows, models.Screenshot, [screenshot_row(client, index)]).result()
+
+    return write
+
+
+def run(name: str, write: Callable[[int, int], None], clients: int, rows: int) -> None:
+    errors: List[Exception] = []
+
+    def client_loop(client: int) -> None:
+        for index in range(rows):
+            try:
+                write(client, index)
+            except OperationalError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=client_loop, args=(client,)) for client in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    written = clients * rows - len(errors)
+    print(f"{name:<16} {written / elapsed:9.0f} rows/s   {len(errors):5d} locked errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.rows} screenshots")
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(os.path.join(directory, "default.db"), args.clients, profile=False)
+        run("default", per_request_commits(engine), args.clients, args.rows)
+        engine.dispose()
+
+        engine = make_engine(os.path.join(directory, "wal.db"), args.clients, profile=True)
+        run("wal", per_request_commits(engine), args.clients, args.rows)
+        engine.dispose()
+
+        engine = make_engine(os.path.join(directory, "writer.db"), args.clients, profile=True)
+        writer = IngestWriter(sessionmaker(bind=engine, expire_on_commit=False))
+        writer.start()
+        run("wal + writer", writer_commits(writer), args.clients, args.rows)
+        writer.stop()
+        stats = writer.stats()
+        print(f"{'':<16} {stats['averageBatchSize']:9.1f} inserts per commit")
+        print(f"{'':<16} {stats['commitLatencyMs']['p50']:9.1f} ms p50 until durable")
+        engine.dispose()
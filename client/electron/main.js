@@ -273,11 +273,8 @@ async function takeScreenshot() {
       url: ''
     };
 
-    // Take screenshot
+    // Take screenshot (JPEG buffer)
     const screenshotImg = await screenshot();
-    
-    // Convert to base64
-    const screenshotBase64 = screenshotImg.toString('base64');
 
     // Get system permissions status
     const systemPermissions = {
@@ -299,12 +296,14 @@ async function takeScreenshot() {
       title: activeWindow.title,
       url: activeWindow.url,
       active: Date.now() - lastActivity < 5 * 60 * 1000, // Active if activity in last 5 minutes
-      systemPermissions,
-      screenshot: screenshotBase64
+      systemPermissions
     };
 
-    // Upload screenshot
-    await axios.post(`${apiBaseUrl}/analytics/screenshot`, screenshotData, {
+    // Upload screenshot as multipart: JSON metadata plus the raw image bytes
+    const form = new FormData();
+    form.append('metadata', JSON.stringify(screenshotData));
+    form.append('file', new Blob([screenshotImg], { type: 'image/jpeg' }), 'screenshot.jpg');
+    await axios.post(`${apiBaseUrl}/analytics/screenshot/upload`, form, {
       headers: {
         'Authorization': `Bearer ${token}`
       }